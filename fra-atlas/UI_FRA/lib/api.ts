@@ -91,6 +91,43 @@ export const apiFetch = async <T = any>(endpoint: string, options: RequestInit =
   }
 };
 
+// Stream a claims listing as NDJSON and hand rows to `onRows` batch by batch,
+// so markers can render before the whole state-wide response has arrived.
+export const streamClaims = async (
+  params: { state?: string; district?: string; village?: string; status?: string } = {},
+  onRows: (rows: Array<any>) => void,
+): Promise<number> => {
+  const searchParams = new URLSearchParams({ format: "ndjson" });
+  Object.entries(params).forEach(([key, value]) => {
+    if (value) searchParams.append(key, value);
+  });
+  const token = getToken();
+  const response = await fetch(`${API_BASE}/api/claims?${searchParams.toString()}`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+  });
+  if (!response.ok || !response.body) {
+    throw new ApiError(response.status, "Claims stream failed");
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  let total = 0;
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += done ? decoder.decode() : decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = done ? "" : lines.pop() || "";
+    const rows = lines.filter((l) => l.trim()).map((l) => JSON.parse(l));
+    if (rows.length) {
+      total += rows.length;
+      onRows(rows);
+    }
+    if (done) break;
+  }
+  return total;
+};
+
 // API endpoints
 export const api = {
   // Authentication — uses the robust apiFetch (returns same shape as your backend)
@@ -106,6 +143,12 @@ export const api = {
       Array<{ id: string; state: string; district: string; block: string | null; village: string; lat: number | null; lon: number | null }>
     >("/api/villages"),
 
+  // Nearest known villages to a GPS point (great-circle km)
+  getNearestVillages: (lat: number, lon: number, k = 5) =>
+    apiFetch<{ villages: Array<{ village_id: number; village: string; district: string; state: string; lat: number; lon: number; distance_km: number }> }>(
+      `/api/villages/nearest?lat=${lat}&lon=${lon}&k=${k}`,
+    ),
+
   // Claims data
   getClaims: (params: { state?: string; district?: string; village?: string } = {}) => {
     const searchParams = new URLSearchParams();
@@ -116,10 +159,57 @@ export const api = {
     return apiFetch<Array<any>>(`/api/claims${qs ? `?${qs}` : ""}`);
   },
 
+  // Claim density grid per status for the viewport (bbox = "minLon,minLat,maxLon,maxLat")
+  getClaimHeatmap: (zoom: number, params: { bbox?: string; state?: string; district?: string; status?: string } = {}) => {
+    const searchParams = new URLSearchParams({ zoom: String(Math.round(zoom)) });
+    Object.entries(params).forEach(([key, value]) => {
+      if (value) searchParams.append(key, value);
+    });
+    return apiFetch<{
+      zoom: number;
+      width: number;
+      height: number;
+      bbox: [number, number, number, number];
+      cell_px: number;
+      total: number;
+      max: number;
+      grids: Record<string, number[]>;
+    }>(`/api/claims/heatmap?${searchParams.toString()}`);
+  },
+
   // Single claim details
   getClaim: (id: string) =>
     apiFetch<any>(`/api/claims/${id}`),
 
+  // Parcel polygon of a claim (GeoJSON, lon/lat); saving reports overlaps with stored parcels
+  getClaimParcel: (id: string | number) =>
+    apiFetch<{ type: "Feature"; id: number; properties: { area_ha: number; updated_at: string }; geometry: any }>(
+      `/api/claims/${id}/parcel`,
+    ),
+
+  saveClaimParcel: (id: string | number, geometry: any) =>
+    apiFetch<{
+      claim_id: number;
+      area_ha: number;
+      bbox: [number, number, number, number];
+      overlaps: Array<{ claim_id: number; status: string | null; village: string | null; overlap_ha: number; overlap_pct: number; titled: boolean }>;
+      titled_overlap: boolean;
+    }>(`/api/claims/${id}/parcel`, {
+      method: "PUT",
+      body: JSON.stringify({ geometry }),
+    }),
+
+  // Several claims in one round trip (single IN query on the backend)
+  getClaimsByIds: (ids: Array<string | number>) =>
+    apiFetch<{ claims: Array<any> }>(`/api/claims?ids=${ids.map(String).map(encodeURIComponent).join(",")}`),
+
+  // Several read ops (claim / claims / count / diagnostics) in one request
+  batch: (ops: Array<{ op: string; [key: string]: any }>) =>
+    apiFetch<{ results: Array<{ ok: boolean; data?: any; status?: number; error?: string }> }>("/api/batch", {
+      method: "POST",
+      body: JSON.stringify({ ops }),
+    }),
+
   // Claim actions (adjust endpoints to your backend naming)
   verifyClaim: (id: string, comment?: string) =>
     apiFetch(`/api/claims/${id}/verify`, {
@@ -1,13 +1,20 @@
 # backend/db.py
-from typing import Any, Dict, List, Optional, Generator
+from typing import Any, Dict, List, Optional, Generator, Tuple
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
 import os
+import json
+import math
 import datetime
 from pathlib import Path
 import logging
 
+from backend.utils import claim_events
+from backend.utils.fast_json import join_json_rows, json_object_sql
+from backend.utils.normalize_claims import AREA_PARSER_VERSION, typed_claim_columns
+from backend.utils.write_coalescer import get_coalescer
+
 # ----------------------------
 # DATABASE URL resolution (deterministic)
 # ----------------------------
@@ -30,6 +37,12 @@ try:
 except Exception:
     pass
 
+# Plain file path of the sqlite database (None for non-sqlite URLs); used by the
+# sqlite3-level helpers such as the write coalescer.
+SQLITE_DB_PATH: Optional[str] = None
+if isinstance(DATABASE_URL, str) and DATABASE_URL.startswith("sqlite"):
+    SQLITE_DB_PATH = str(Path(DATABASE_URL.split(":///")[-1]).resolve())
+
 # ----------------------------
 # Async engine + session factory
 # ----------------------------
@@ -68,7 +81,8 @@ def _row_to_dict(row) -> Dict[str, Any]:
 async def init_claims_table() -> None:
     """
     Create the claims table if it does not exist.
-    Ensure new fields (source, raw_ocr) exist.
+    Ensure new fields (source, raw_ocr) and the typed land_area_ha / date_iso
+    columns (with their indexes) exist.
     """
     sql = """
     CREATE TABLE IF NOT EXISTS claims (
@@ -86,6 +100,8 @@ async def init_claims_table() -> None:
         lon REAL,
         source TEXT DEFAULT 'manual',
         raw_ocr TEXT,
+        land_area_ha REAL,
+        date_iso TEXT,
         created_at TEXT DEFAULT (datetime('now'))
     );
     """
@@ -100,27 +116,137 @@ async def init_claims_table() -> None:
             await conn.execute(text("ALTER TABLE claims ADD COLUMN raw_ocr TEXT"))
         except Exception:
             pass
+        # typed columns parsed at ingest (hectares, ISO date) so range queries can use an index
+        try:
+            await conn.execute(text("ALTER TABLE claims ADD COLUMN land_area_ha REAL"))
+        except Exception:
+            pass
+        try:
+            await conn.execute(text("ALTER TABLE claims ADD COLUMN date_iso TEXT"))
+        except Exception:
+            pass
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_claims_land_area_ha ON claims (land_area_ha)"))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_claims_date_iso ON claims (date_iso)"))
+        # listings and exports are ordered by created_at; the index lets streamed responses
+        # walk it instead of sorting the whole filtered result before the first row
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_claims_created_at ON claims (created_at)"))
 
 
-async def insert_claim(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def rederive_land_area_ha(batch_size: int = 5000) -> int:
     """
-    Insert a claim and return the created row as a dict.
-    Payload may omit optional fields; created_at defaults to now when not provided.
+    Re-parse land_area_ha of every claim once per AREA_PARSER_VERSION (recorded in schema_meta),
+    so values stored by an older parser are corrected. Only rows whose value changes are written.
+    Returns the number of rows updated.
     """
-    insert_sql = text(
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"))
+        done = (await conn.execute(text("SELECT value FROM schema_meta WHERE key = 'area_parser'"))).scalar()
+    if done is not None and int(done) >= AREA_PARSER_VERSION:
+        return 0
+    select_sql = text(
         """
-        INSERT INTO claims (
-            state, district, block, village,
-            patta_holder, address, land_area, status, date,
-            lat, lon, source, raw_ocr, created_at
-        )
-        VALUES (
-            :state, :district, :block, :village,
-            :patta_holder, :address, :land_area, :status, :date,
-            :lat, :lon, :source, :raw_ocr, :created_at
+        SELECT id, land_area, land_area_ha FROM claims
+        WHERE id > :last_id AND land_area IS NOT NULL AND land_area != ''
+        ORDER BY id
+        LIMIT :batch
+        """
+    )
+    last_id = 0
+    updated = 0
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(select_sql, {"last_id": last_id, "batch": batch_size})).fetchall()
+            if not rows:
+                break
+            params = []
+            for r in rows:
+                ha = typed_claim_columns({"land_area": r[1]})["land_area_ha"]
+                if (ha is None) != (r[2] is None) or (ha is not None and abs(ha - float(r[2])) > 1e-9):
+                    params.append({"id": r[0], "land_area_ha": ha})
+            if params:
+                await conn.execute(text("UPDATE claims SET land_area_ha = :land_area_ha WHERE id = :id"), params)
+            updated += len(params)
+            last_id = rows[-1][0]
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('area_parser', :v)"), {"v": AREA_PARSER_VERSION}
         )
+    return updated
+
+
+async def backfill_typed_claim_columns(batch_size: int = 5000) -> int:
+    """
+    Fill land_area_ha / date_iso for rows written before those columns existed.
+    Walks the table by id in batches (one short transaction each) and returns the number of rows updated.
+    Rows whose raw value cannot be parsed stay NULL and are not written, so a restart over
+    unparseable rows does not bump table_versions or append to the change log.
+    """
+    select_sql = text(
         """
+        SELECT id, land_area, date, land_area_ha, date_iso FROM claims
+        WHERE id > :last_id
+          AND ((land_area_ha IS NULL AND land_area IS NOT NULL AND land_area != '')
+            OR (date_iso IS NULL AND date IS NOT NULL AND date != ''))
+        ORDER BY id
+        LIMIT :batch
+        """
+    )
+    update_sql = text(
+        "UPDATE claims SET land_area_ha = :land_area_ha, date_iso = :date_iso WHERE id = :id"
+    )
+    last_id = 0
+    updated = 0
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(select_sql, {"last_id": last_id, "batch": batch_size})).fetchall()
+            if not rows:
+                break
+            params = []
+            for r in rows:
+                typed = typed_claim_columns({"land_area": r[1], "date": r[2]})
+                filled = {
+                    "land_area_ha": r[3] if r[3] is not None else typed["land_area_ha"],
+                    "date_iso": r[4] if r[4] is not None else typed["date_iso"],
+                }
+                if filled != {"land_area_ha": r[3], "date_iso": r[4]}:
+                    params.append({"id": r[0], **filled})
+            if params:
+                await conn.execute(update_sql, params)
+            updated += len(params)
+            last_id = rows[-1][0]
+    return updated
+
+
+_INSERT_CLAIM_SQL = """
+    INSERT INTO claims (
+        state, district, block, village,
+        patta_holder, address, land_area, status, date,
+        lat, lon, source, raw_ocr, land_area_ha, date_iso, created_at
+    )
+    VALUES (
+        :state, :district, :block, :village,
+        :patta_holder, :address, :land_area, :status, :date,
+        :lat, :lon, :source, :raw_ocr, :land_area_ha, :date_iso, :created_at
     )
+"""
+
+
+def _insert_claim_sync(conn, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Insert one claim on a sqlite3 connection (runs inside a coalesced transaction).
+    """
+    cur = conn.execute(_INSERT_CLAIM_SQL, params)
+    row = conn.execute("SELECT * FROM claims WHERE id = ?", (cur.lastrowid,)).fetchone()
+    return dict(row) if row else {}
+
+
+async def insert_claim(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Insert a claim and return the created row as a dict.
+    Payload may omit optional fields; created_at defaults to now when not provided.
+    For sqlite databases the insert is queued on the write coalescer so concurrent
+    inserts share one transaction (group commit).
+    """
     params = {
         "state": payload.get("state"),
         "district": payload.get("district"),
@@ -137,10 +263,18 @@ async def insert_claim(payload: Dict[str, Any]) -> Dict[str, Any]:
         "raw_ocr": payload.get("raw_ocr"),
         "created_at": payload.get("created_at", datetime.datetime.utcnow().isoformat()),
     }
+    # typed columns parsed at ingest ("1.2 ha" -> 1.2, "10-Sep-2025" -> "2025-09-10")
+    params.update(typed_claim_columns(params))
+
+    if SQLITE_DB_PATH:
+        created = await get_coalescer(SQLITE_DB_PATH).submit(_insert_claim_sync, params)
+        if created:
+            claim_events.publish("claims", "insert", row=created)
+        return created
 
     async with engine.begin() as conn:
         # Perform insert
-        await conn.execute(insert_sql, params)
+        await conn.execute(text(_INSERT_CLAIM_SQL), params)
 
         # Obtain last insert id in sqlite via last_insert_rowid()
         last_id_res = await conn.execute(text("SELECT last_insert_rowid() AS id"))
@@ -166,14 +300,18 @@ async def insert_claim(payload: Dict[str, Any]) -> Dict[str, Any]:
 
         row_res = await conn.execute(text("SELECT * FROM claims WHERE id = :id"), {"id": last_id})
         fetched = row_res.fetchone()
-        return _row_to_dict(fetched) if fetched else {}
+        created = _row_to_dict(fetched) if fetched else {}
+    if created:
+        claim_events.publish("claims", "insert", row=created)
+    return created
 
 
-async def query_claims(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+def build_claims_where(filters: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
     """
-    Query claims with optional filters.
+    Build the WHERE clause (named :params) shared by the list, export and stream paths,
+    so every claims read honours the same filters.
     """
-    sql = "SELECT * FROM claims WHERE 1=1"
+    sql = " WHERE 1=1"
     params: Dict[str, Any] = {}
 
     if filters.get("state"):
@@ -187,6 +325,76 @@ async def query_claims(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
     if filters.get("q"):
         sql += " AND (village LIKE :q OR patta_holder LIKE :q OR address LIKE :q)"
         params["q"] = f"%{filters['q']}%"
+    # typed (indexed) range filters
+    if filters.get("min_area") is not None:
+        sql += " AND land_area_ha >= :min_area"; params["min_area"] = float(filters["min_area"])
+    if filters.get("max_area") is not None:
+        sql += " AND land_area_ha <= :max_area"; params["max_area"] = float(filters["max_area"])
+    if filters.get("date_from"):
+        sql += " AND date_iso >= :date_from"; params["date_from"] = str(filters["date_from"])
+    if filters.get("date_to"):
+        sql += " AND date_iso <= :date_to"; params["date_to"] = str(filters["date_to"])
+    if filters.get("bbox"):
+        sql += bbox_where_sql("claims", filters["bbox"], params)
+    # multi-get: all ids travel in ONE bound JSON parameter, so no host-parameter limit applies
+    if filters.get("ids"):
+        sql += " AND id IN (SELECT value FROM json_each(:ids))"
+        params["ids"] = json.dumps(parse_id_list(filters["ids"]))
+    return sql, params
+
+
+def parse_bbox_value(bbox: Any) -> Tuple[float, float, float, float]:
+    """
+    (min_lon, min_lat, max_lon, max_lat) from a tuple or "minLon,minLat,maxLon,maxLat"; ValueError if invalid.
+    The one bbox parser: routes turn its ValueError into a 400.
+    """
+    try:
+        parts = [float(x) for x in (bbox.split(",") if isinstance(bbox, str) else bbox)]
+    except (TypeError, ValueError):
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    if len(parts) != 4 or not all(math.isfinite(p) for p in parts) or parts[0] > parts[2] or parts[1] > parts[3]:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    return parts[0], parts[1], parts[2], parts[3]
+
+
+def bbox_where_sql(table: str, bbox: Any, params: Dict[str, Any]) -> str:
+    """
+    " AND ..." restricting `table` (claims / villages) to points inside bbox.
+    Uses the {table}_rtree index once init_spatial_index() ran in this process; the exact
+    lat/lon range check stays because R*Tree stores 32-bit floats (boxes are rounded outwards).
+    """
+    min_lon, min_lat, max_lon, max_lat = parse_bbox_value(bbox)
+    params.update({"bb_min_lon": min_lon, "bb_min_lat": min_lat, "bb_max_lon": max_lon, "bb_max_lat": max_lat})
+    sql = ""
+    if table in SPATIAL_INDEXED:
+        sql += (
+            f" AND id IN (SELECT id FROM {table}_rtree WHERE min_lon <= :bb_max_lon AND max_lon >= :bb_min_lon"
+            f" AND min_lat <= :bb_max_lat AND max_lat >= :bb_min_lat)"
+        )
+    sql += " AND lon BETWEEN :bb_min_lon AND :bb_max_lon AND lat BETWEEN :bb_min_lat AND :bb_max_lat"
+    return sql
+
+
+def parse_id_list(ids: Any) -> List[int]:
+    """Accept [1, 2], "1,2,3" or a JSON array string; raises ValueError on junk (null, 1.5, true, ...)."""
+    if isinstance(ids, str):
+        ids = json.loads(ids) if ids.strip().startswith("[") else [x for x in ids.split(",") if x.strip()]
+    if not isinstance(ids, (list, tuple)):
+        raise ValueError("ids must be a list of integers")
+    out = []
+    for x in ids:
+        if isinstance(x, bool) or not isinstance(x, (int, str)):
+            raise ValueError(f"invalid id: {x!r}")
+        out.append(int(x))
+    return out
+
+
+async def query_claims(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Query claims with optional filters.
+    """
+    where, params = build_claims_where(filters)
+    sql = "SELECT * FROM claims" + where
 
     sql += " ORDER BY created_at DESC"
 
@@ -201,10 +409,59 @@ async def query_claims(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         return [_row_to_dict(r) for r in rows]
 
 
+# Column order of `SELECT * FROM claims` (kept identical for the JSON fast path)
+CLAIM_COLUMNS = [
+    "id", "state", "district", "block", "village", "patta_holder", "address",
+    "land_area", "status", "date", "lat", "lon", "created_at", "source", "raw_ocr",
+    "land_area_ha", "date_iso",
+]
+
+VILLAGE_COLUMNS = [
+    "id", "state", "district", "block", "village", "lat", "lon",
+    # ORM DateTime values are stored as "YYYY-MM-DD HH:MM:SS"; emit ISO like jsonable_encoder did
+    ("created_at", "replace(created_at, ' ', 'T')"),
+]
+
+
+async def query_claims_json(filters: Dict[str, Any], with_ids: bool = False):
+    """
+    Same rows as query_claims, but encoded to a JSON array by SQLite (json_object)
+    without building a Python dict per row. with_ids=True returns (body, [claim ids in body]).
+    """
+    where, params = build_claims_where(filters)
+    sql = f"SELECT {json_object_sql(CLAIM_COLUMNS)}, id FROM claims{where} ORDER BY created_at DESC"
+    if filters.get("limit") is not None:
+        params["limit"] = int(filters.get("limit"))
+        params["offset"] = int(filters.get("offset", 0))
+        sql += " LIMIT :limit OFFSET :offset"
+    async with engine.connect() as conn:
+        result = await conn.execute(text(sql), params)
+        rows = result.fetchall()
+    body = join_json_rows(rows)
+    return (body, [r[1] for r in rows]) if with_ids else body
+
+
+async def query_villages_json(bbox: Any = None) -> bytes:
+    """All villages (or those inside bbox) as a JSON array, encoded by SQLite."""
+    params: Dict[str, Any] = {}
+    sql = f"SELECT {json_object_sql(VILLAGE_COLUMNS)} FROM villages"
+    if bbox:
+        sql += " WHERE 1=1" + bbox_where_sql("villages", bbox, params)
+    async with engine.connect() as conn:
+        result = await conn.execute(text(sql), params)
+        return join_json_rows(result.fetchall())
+
+
 async def count_claims_by_village(village: str) -> int:
-    sql = "SELECT COUNT(*) AS cnt FROM claims WHERE village = :village"
+    # served from the trigger-maintained claim_stats table; plain COUNT(*) if it does not exist yet
+    sql = "SELECT COALESCE(SUM(claim_count), 0) AS cnt FROM claim_stats WHERE village = :village"
     async with engine.begin() as conn:
-        result = await conn.execute(text(sql), {"village": village})
+        try:
+            result = await conn.execute(text(sql), {"village": village})
+        except Exception:
+            result = await conn.execute(
+                text("SELECT COUNT(*) AS cnt FROM claims WHERE village = :village"), {"village": village}
+            )
         row = result.fetchone()
         if not row:
             return 0
@@ -279,7 +536,331 @@ async def insert_village(payload: Dict[str, Any]) -> Dict[str, Any]:
             return {}
         row_res = await conn.execute(text("SELECT * FROM villages WHERE id = :id"), {"id": last_id})
         r = row_res.fetchone()
-        return _row_to_dict(r) if r else {}
+        created = _row_to_dict(r) if r else {}
+    if created:
+        claim_events.publish("villages", "insert", row=created)
+    return created
+
+# ----------------------------
+# Per-table change counters (ETags / conditional GET)
+# ----------------------------
+VERSIONED_TABLES = ("claims", "villages")
+
+
+async def init_table_versions() -> None:
+    """
+    Create the table_versions counter table and the triggers that bump it on every
+    insert/update/delete of a versioned table. Because the triggers live in SQLite,
+    the counters stay correct across workers and for writes that bypass the API.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+        ))
+        for table in VERSIONED_TABLES:
+            await conn.execute(text("INSERT OR IGNORE INTO table_versions (name, version) VALUES (:name, 0)"), {"name": table})
+            for op in ("INSERT", "UPDATE", "DELETE"):
+                await conn.execute(text(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{op.lower()}
+                    AFTER {op} ON {table}
+                    BEGIN
+                        UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                    END
+                    """
+                ))
+
+
+async def get_table_versions(tables: List[str]) -> Dict[str, int]:
+    """Return {table: version} for the given tables (missing tables report 0)."""
+    names = list(tables)
+    params = {f"t{i}": t for i, t in enumerate(names)}
+    placeholders = ", ".join(f":t{i}" for i in range(len(names)))
+    async with engine.connect() as conn:
+        res = await conn.execute(text(f"SELECT name, version FROM table_versions WHERE name IN ({placeholders})"), params)
+        found = {r[0]: int(r[1]) for r in res.fetchall()}
+    return {t: found.get(t, 0) for t in names}
+
+
+# ----------------------------
+# R*Tree spatial index (claims_rtree, villages_rtree)
+# ----------------------------
+# Point rows get a degenerate box (min == max). Triggers keep the index in sync with
+# lat/lon, so rows without coordinates are simply absent from it.
+SPATIAL_TABLES = ("claims", "villages")
+# tables whose R*Tree exists (filled by init_spatial_index); bbox filters fall back to a plain range scan otherwise
+SPATIAL_INDEXED: set = set()
+
+
+async def init_spatial_index() -> None:
+    """Create {table}_rtree virtual tables and their sync triggers; fill them on first creation."""
+    async with engine.begin() as conn:
+        for table in SPATIAL_TABLES:
+            rtree = f"{table}_rtree"
+            exists = (await conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": rtree}
+            )).fetchone()
+            if not exists:
+                await conn.execute(text(f"CREATE VIRTUAL TABLE {rtree} USING rtree(id, min_lon, max_lon, min_lat, max_lat)"))
+                await conn.execute(text(
+                    f"INSERT INTO {rtree} (id, min_lon, max_lon, min_lat, max_lat)"
+                    f" SELECT id, lon, lon, lat, lat FROM {table} WHERE lat IS NOT NULL AND lon IS NOT NULL"
+                ))
+            insert_new = (
+                f"INSERT INTO {rtree} (id, min_lon, max_lon, min_lat, max_lat)"
+                f" SELECT NEW.id, NEW.lon, NEW.lon, NEW.lat, NEW.lat WHERE NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL;"
+            )
+            await conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rtree_insert AFTER INSERT ON {table} BEGIN {insert_new} END"
+            ))
+            await conn.execute(text(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_rtree_update AFTER UPDATE OF lat, lon ON {table}
+                BEGIN DELETE FROM {rtree} WHERE id = OLD.id; {insert_new} END
+                """
+            ))
+            await conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_rtree_delete AFTER DELETE ON {table}"
+                f" BEGIN DELETE FROM {rtree} WHERE id = OLD.id; END"
+            ))
+            SPATIAL_INDEXED.add(table)
+
+
+# ----------------------------
+# Pre-aggregated claim statistics (claim_stats)
+# ----------------------------
+# One row per (state, district, village, status) with the claim count and summed
+# land_area_ha, kept current by triggers so every write path (API, coalescer,
+# bulk SQL) is covered. NULL labels are stored as '' so they can be part of the key.
+STATS_LEVELS = ("state", "district", "village")
+
+_STATS_KEY = ("state", "district", "village", "status")
+
+
+def _stats_delta_sql(ref: str, sign: str) -> str:
+    key_values = ", ".join(f"COALESCE({ref}.{c}, '')" for c in _STATS_KEY)
+    key_match = " AND ".join(f"{c} = COALESCE({ref}.{c}, '')" for c in _STATS_KEY)
+    if sign == "+":
+        return f"""
+            INSERT INTO claim_stats (state, district, village, status, claim_count, total_area_ha)
+            VALUES ({key_values}, 1, COALESCE({ref}.land_area_ha, 0))
+            ON CONFLICT (state, district, village, status) DO UPDATE SET
+                claim_count = claim_count + 1,
+                total_area_ha = total_area_ha + excluded.total_area_ha;
+        """
+    return f"""
+            UPDATE claim_stats SET
+                claim_count = claim_count - 1,
+                total_area_ha = total_area_ha - COALESCE({ref}.land_area_ha, 0)
+            WHERE {key_match};
+            DELETE FROM claim_stats WHERE claim_count <= 0 AND {key_match};
+    """
+
+
+async def init_claim_stats() -> None:
+    """Create claim_stats and its triggers; (re)build it from claims when empty."""
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            """
+            CREATE TABLE IF NOT EXISTS claim_stats (
+                state TEXT NOT NULL,
+                district TEXT NOT NULL,
+                village TEXT NOT NULL,
+                status TEXT NOT NULL,
+                claim_count INTEGER NOT NULL DEFAULT 0,
+                total_area_ha REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (state, district, village, status)
+            )
+            """
+        ))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_claim_stats_village ON claim_stats (village)"))
+        empty = (await conn.execute(text("SELECT COUNT(*) FROM claim_stats"))).scalar() == 0
+        if empty:
+            await _rebuild_claim_stats(conn)
+
+        await conn.execute(text(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_claims_stats_insert AFTER INSERT ON claims
+            BEGIN {_stats_delta_sql("NEW", "+")} END
+            """
+        ))
+        await conn.execute(text(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_claims_stats_delete AFTER DELETE ON claims
+            BEGIN {_stats_delta_sql("OLD", "-")} END
+            """
+        ))
+        await conn.execute(text(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_claims_stats_update
+            AFTER UPDATE OF state, district, village, status, land_area_ha ON claims
+            BEGIN {_stats_delta_sql("OLD", "-")} {_stats_delta_sql("NEW", "+")} END
+            """
+        ))
+
+
+async def _rebuild_claim_stats(conn) -> None:
+    await conn.execute(text("DELETE FROM claim_stats"))
+    await conn.execute(text(
+        """
+        INSERT INTO claim_stats (state, district, village, status, claim_count, total_area_ha)
+        SELECT COALESCE(state, ''), COALESCE(district, ''), COALESCE(village, ''), COALESCE(status, ''),
+               COUNT(*), COALESCE(SUM(land_area_ha), 0)
+        FROM claims
+        GROUP BY 1, 2, 3, 4
+        """
+    ))
+
+
+def village_key(state: Optional[str], district: Optional[str], village: Optional[str]) -> str:
+    """Response key of one village: "state|district|village" (same-named villages stay apart)."""
+    return f"{state or ''}|{district or ''}|{village or ''}"
+
+
+async def count_claims_for_villages(
+    villages: Optional[List[str]] = None,
+    village_ids: Optional[List[int]] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    by_status: bool = False,
+) -> Dict[str, Any]:
+    """
+    Claim counts for many villages at once: exact names, ids from the villages table and/or
+    every village whose point lies in bbox=(min_lon, min_lat, max_lon, max_lat).
+    Villages are told apart by (state, district, village): a name matches every village of that
+    name, while ids and bbox resolve to the exact villages-table entries.
+    One grouped query over claim_stats (indexed by village), chunked for long lists.
+    Returns {"counts": {key: n}, "villages": [{state, district, village, count[, by_status]}],
+    "village_ids": {id: key}, ["by_status": {key: {...}}]} with keys from village_key().
+    """
+    names: List[str] = [v for v in (villages or []) if v]
+    # exact (state, district, village) entries from ids / bbox; '' stands for NULL as in claim_stats
+    places: Dict[Tuple[str, str, str], None] = {}
+    id_keys: Dict[int, str] = {}
+    chunk = 500
+
+    def place(state, district, village) -> Tuple[str, str, str]:
+        return (state or "", district or "", village or "")
+
+    async with engine.connect() as conn:
+        ids = [int(i) for i in (village_ids or [])]
+        for i in range(0, len(ids), chunk):
+            part = ids[i:i + chunk]
+            params = {f"id{j}": v for j, v in enumerate(part)}
+            placeholders = ", ".join(f":id{j}" for j in range(len(part)))
+            res = await conn.execute(
+                text(f"SELECT id, state, district, village FROM villages WHERE id IN ({placeholders})"), params
+            )
+            for vid, state, district, village in res.fetchall():
+                p = place(state, district, village)
+                places[p] = None
+                id_keys[int(vid)] = village_key(*p)
+
+        if bbox:
+            params = {}
+            sql = "SELECT state, district, village FROM villages WHERE 1=1" + bbox_where_sql("villages", bbox, params)
+            res = await conn.execute(text(sql), params)
+            for state, district, village in res.fetchall():
+                places[place(state, district, village)] = None
+
+        wanted_names = set(names)
+        lookup = list(dict.fromkeys(names + [p[2] for p in places]))
+        counts: Dict[Tuple[str, str, str], int] = {p: 0 for p in places}
+        statuses: Dict[Tuple[str, str, str], Dict[str, int]] = {p: {} for p in places}
+        for i in range(0, len(lookup), chunk):
+            part = lookup[i:i + chunk]
+            params = {f"v{j}": v for j, v in enumerate(part)}
+            placeholders = ", ".join(f":v{j}" for j in range(len(part)))
+            res = await conn.execute(
+                text(
+                    f"SELECT state, district, village, status, SUM(claim_count) FROM claim_stats"
+                    f" WHERE village IN ({placeholders}) GROUP BY state, district, village, status"
+                ),
+                params,
+            )
+            for state, district, village, status, cnt in res.fetchall():
+                p = (state, district, village)
+                if p not in places and village not in wanted_names:
+                    continue  # same name as a requested id / bbox village, but elsewhere
+                counts[p] = counts.get(p, 0) + int(cnt)
+                statuses.setdefault(p, {})[status or "Unknown"] = int(cnt)
+
+    groups = []
+    for p, n in counts.items():
+        group: Dict[str, Any] = {"state": p[0] or None, "district": p[1] or None, "village": p[2] or None, "count": n}
+        if by_status:
+            group["by_status"] = statuses[p]
+        groups.append(group)
+    out: Dict[str, Any] = {
+        "counts": {village_key(*p): n for p, n in counts.items()},
+        "villages": groups,
+        "village_ids": {str(k): v for k, v in id_keys.items()},
+    }
+    if by_status:
+        out["by_status"] = {village_key(*p): s for p, s in statuses.items()}
+    # requested names without any claim are still reported (count 0, no state/district)
+    found = {p[2] for p in counts}
+    for name in dict.fromkeys(names):
+        if name not in found:
+            out["counts"][village_key(None, None, name)] = 0
+            out["villages"].append({"state": None, "district": None, "village": name, "count": 0})
+            if by_status:
+                out["villages"][-1]["by_status"] = {}
+                out["by_status"][village_key(None, None, name)] = {}
+    return out
+
+
+async def rebuild_claim_stats() -> None:
+    """Recompute claim_stats from scratch (e.g. after restoring a database without triggers)."""
+    async with engine.begin() as conn:
+        await _rebuild_claim_stats(conn)
+
+
+async def query_claim_aggregates(level: Optional[str] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Roll claim_stats up to `level` (None = grand total, "state", "district" or "village").
+    Each row carries the group labels, claim_count, total_area_ha and a by_status breakdown.
+    Optional exact-match filters: state, district, village, status.
+    """
+    if level is not None and level not in STATS_LEVELS:
+        raise ValueError(f"level must be one of {', '.join(STATS_LEVELS)}")
+    group_cols = list(STATS_LEVELS[: STATS_LEVELS.index(level) + 1]) if level else []
+
+    where = " WHERE 1=1"
+    params: Dict[str, Any] = {}
+    for col in _STATS_KEY:
+        v = (filters or {}).get(col)
+        if v:
+            where += f" AND {col} = :{col}"
+            params[col] = v
+
+    select_cols = "".join(f"{c}, " for c in group_cols)
+    sql = (
+        f"SELECT {select_cols}status, SUM(claim_count), SUM(total_area_ha) FROM claim_stats{where}"
+        f" GROUP BY {select_cols}status ORDER BY {select_cols}status"
+    )
+    async with engine.connect() as conn:
+        res = await conn.execute(text(sql), params)
+        rows = res.fetchall()
+
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for r in rows:
+        labels = tuple(r[: len(group_cols)])
+        status, count, area = r[len(group_cols):]
+        g = groups.get(labels)
+        if g is None:
+            g = {c: (v or None) for c, v in zip(group_cols, labels)}
+            g.update({"claim_count": 0, "total_area_ha": 0.0, "by_status": {}})
+            groups[labels] = g
+        g["claim_count"] += int(count)
+        g["total_area_ha"] += float(area or 0)
+        g["by_status"][status or "Unknown"] = g["by_status"].get(status or "Unknown", 0) + int(count)
+    out = list(groups.values())
+    for g in out:
+        g["total_area_ha"] = round(g["total_area_ha"], 4)
+    if not group_cols and not out:
+        out = [{"claim_count": 0, "total_area_ha": 0.0, "by_status": {}}]
+    return out
+
 
 # ----------------------------
 # FastAPI dependency
@@ -2,12 +2,13 @@
 from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Body, Query, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from sqlalchemy import text
 from pathlib import Path
 import io
 import json
+import logging
 from typing import Optional, Dict, Any
 
 # added imports for debug endpoint
@@ -23,11 +24,54 @@ from backend.db import (
     get_db,
     engine,
     init_claims_table,
+    backfill_typed_claim_columns,
+    rederive_land_area_ha,
     insert_claim,
     query_claims,
+    query_claims_json,
+    query_villages_json,
     get_claim_by_id,
     init_villages_table,  # NEW: ensure village table is initialized
+    init_table_versions,
+    init_claim_stats,
+    parse_id_list,
+    parse_bbox_value,
+    init_spatial_index,
+    SQLITE_DB_PATH,
 )
+from backend.utils.export_stream import (
+    EXPORT_FORMATS,
+    LISTING_FORMATS,
+    export_claims_stream,
+    export_media_type,
+    stream_claims_listing,
+)
+from backend.utils.columnar_export import (
+    COLUMNAR_FORMATS,
+    ColumnarExportUnavailable,
+    arrow_stream,
+    columnar_filename,
+    iter_file,
+    write_parquet,
+)
+from backend.utils.write_coalescer import close_coalescers
+from backend.utils import claim_events
+from backend.utils.claims_snapshot import snapshot as claims_snapshot
+from backend.utils.claim_clusters import cluster_index
+from backend.utils.claim_heatmap import heatmap_index
+from backend.utils.claim_neighbourhood import neighbourhood_index
+from backend.utils.vector_tiles import tile_service
+from backend.utils import query_cache
+from backend.utils.query_cache import claims_cache, villages_cache
+from backend.utils.http_cache import choose_encoding, conditional_response
+from backend.utils.fast_json import FastJSONResponse
+from backend.utils import change_log
+from backend.utils import live_feed
+from backend.utils.bulk_ops import run_bulk
+from backend.utils.boundaries import reconcile_location
+from backend.utils.boundary_layers import boundary_layers
+from backend.utils.village_geocoder import geocode_claim, village_geocoder
+from backend.utils.village_knn import village_knn
 from backend.models import Base, Village  # removed FRADocument import because we no longer persist docs
 
 # --- register diagnostics router (assumes backend/routes/diagnostics.py exists) ---
@@ -36,6 +80,34 @@ from backend.routes.diagnostics import router as diagnostics_router
 # --- include auth router (assumes backend/routes/auth.py exists with `router`) ---
 from backend.routes.auth import router as auth_router
 
+# --- map/dashboard read endpoints served from the in-memory claims snapshot ---
+from backend.routes.dashboard import router as dashboard_router
+
+# --- incremental claim change feed (/api/claims/changes) ---
+from backend.routes.changes import router as changes_router
+
+# --- live push of claim changes (SSE /api/claims/live, WebSocket /api/claims/ws) ---
+from backend.routes.live import router as live_router
+
+# --- bulk status transitions / updates / deletes and per-claim verify/reject ---
+from backend.routes.bulk import router as bulk_router
+
+# --- POST /api/batch: several reads in one request over one connection ---
+from backend.routes.batch import router as batch_router
+
+# --- Mapbox Vector Tiles (/tiles/{layer}/{z}/{x}/{y}.mvt) ---
+from backend.routes.tiles import router as tiles_router
+
+# --- point-in-polygon state/district lookup and simplified boundary layers (/api/boundaries) ---
+from backend.routes.boundaries import router as boundaries_router
+
+# --- fuzzy village name -> coordinates (/api/villages/geocode), nearest villages (/api/villages/nearest) ---
+from backend.routes.villages import router as villages_router
+
+# --- claim parcel polygons and overlap checks (/api/claims/{id}/parcel, /api/parcels/overlaps) ---
+from backend.routes.parcels import router as parcels_router
+from backend.utils.claim_parcels import init_claim_parcels, parse_parcel, save_parcel
+
 app = FastAPI()
 
 # NOTE: We DO NOT include a separate claims router here because this file defines the /api/claims handlers inline.
@@ -50,6 +122,18 @@ app.include_router(diagnostics_router, prefix="/api")
 # include the auth router under /api (provides /api/login etc.)
 app.include_router(auth_router, prefix="/api")
 
+# snapshot-backed read endpoints (/api/claims/markers, /api/claims/summary).
+# Registered before the inline /api/claims/{claim_id} handler so those paths win.
+app.include_router(dashboard_router, prefix="/api")
+app.include_router(changes_router, prefix="/api")
+app.include_router(live_router, prefix="/api")
+app.include_router(bulk_router, prefix="/api")
+app.include_router(batch_router, prefix="/api")
+app.include_router(tiles_router)
+app.include_router(boundaries_router, prefix="/api")
+app.include_router(villages_router, prefix="/api")
+app.include_router(parcels_router, prefix="/api")
+
 # --------------------------
 # Debug echo endpoint
 # --------------------------
@@ -97,6 +181,8 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 from backend.db import DATABASE_URL  # we already import engine/get_db above, so this is safe
 print("DEBUG: backend.main sees DATABASE_URL =", DATABASE_URL, flush=True)
 
+logger = logging.getLogger(__name__)
+
 # --------------------------
 # Database setup: create tables + seed villages if empty
 # --------------------------
@@ -109,8 +195,38 @@ async def on_startup():
     # init claims + villages helper tables
     await init_claims_table()
     await init_villages_table()  # NEW
+    # change counters behind the ETags of the listing endpoints
+    await init_table_versions()
+    # trigger-maintained claim change log (+ compaction of superseded entries / old tombstones)
+    await change_log.init_change_log()
+    # pre-aggregated dashboard statistics, maintained by triggers
+    await init_claim_stats()
+    # R*Tree indexes behind the bbox filters
+    await init_spatial_index()
+    # parcel polygons beside the claims (WKB + R*Tree over their boxes)
+    await init_claim_parcels()
+    try:
+        await change_log.compact_change_log()
+    except Exception:
+        pass
 
-    # Optional: seed villages if DB empty
+    # parse land_area / date of older rows into the typed columns (rows that still don't parse are left untouched)
+    try:
+        filled = await backfill_typed_claim_columns()
+        if filled:
+            print(f"DEBUG: backfilled typed land_area_ha/date_iso for {filled} claims", flush=True)
+    except Exception:
+        pass
+    # values stored by an older land area parser are re-derived once per parser version
+    try:
+        fixed = await rederive_land_area_ha()
+        if fixed:
+            print(f"DEBUG: re-derived land_area_ha for {fixed} claims", flush=True)
+    except Exception:
+        logger.exception("land_area_ha re-derivation failed")
+
+    # Optional: seed villages if DB empty (before the village indexes below load,
+    # since this insert bypasses the write events that keep them current)
     # --- remove/guard demo village seeding ---
     # Previously the code inserted demo villages here on every startup.
     # We now skip seeding by default. If you need to seed for local dev,
@@ -145,6 +261,59 @@ async def on_startup():
         pass
     # --- end guarded seed ---
 
+    # load the columnar claims snapshot and keep it current from write events
+    if SQLITE_DB_PATH:
+        try:
+            loaded = await run_in_threadpool(claims_snapshot.load, SQLITE_DB_PATH)
+            print(f"DEBUG: claims snapshot loaded ({loaded} claims)", flush=True)
+            clustered = await run_in_threadpool(cluster_index.build, claims_snapshot)
+            print(f"DEBUG: claim cluster index built ({clustered} points)", flush=True)
+            gridded = await run_in_threadpool(heatmap_index.build, claims_snapshot)
+            print(f"DEBUG: claim heatmap grids built ({gridded} points, zooms 0..{heatmap_index.top})", flush=True)
+            counted = await run_in_threadpool(neighbourhood_index.build, claims_snapshot)
+            print(f"DEBUG: claim neighbourhood counts built ({counted} points)", flush=True)
+        except Exception as e:
+            print("DEBUG: claims snapshot load failed:", e, flush=True)
+        try:
+            indexed = await run_in_threadpool(village_geocoder.load, SQLITE_DB_PATH)
+            print(f"DEBUG: village geocoder index built ({indexed} villages)", flush=True)
+        except Exception as e:
+            print("DEBUG: village geocoder load failed:", e, flush=True)
+        try:
+            indexed = await run_in_threadpool(village_knn.load, SQLITE_DB_PATH)
+            print(f"DEBUG: village KD-tree built ({indexed} villages)", flush=True)
+        except Exception as e:
+            print("DEBUG: village KD-tree build failed:", e, flush=True)
+    # simplified / precompressed map boundary layers (static files, built once)
+    try:
+        built = await run_in_threadpool(boundary_layers.load)
+        print(f"DEBUG: boundary layers built ({built} layers)", flush=True)
+    except Exception as e:
+        print("DEBUG: boundary layers build failed:", e, flush=True)
+    claim_events.subscribe(claims_snapshot.apply_event)
+    # derived from the snapshot: fed its effective changes (also those caught up from other workers)
+    claims_snapshot.add_listener(cluster_index.apply_event)
+    claims_snapshot.add_listener(heatmap_index.apply_event)
+    claims_snapshot.add_listener(neighbourhood_index.apply_event)
+    # vector tiles: cleared in case the DB was replaced, then invalidated per changed point
+    tile_service.db_path = SQLITE_DB_PATH
+    tile_service.reset_point_layers()
+    claims_snapshot.add_listener(tile_service.on_claim_change)
+    claim_events.subscribe(tile_service.on_village_change)
+    # precise invalidation of cached claims/villages listings
+    claim_events.subscribe(query_cache.on_change)
+    claim_events.subscribe(change_log.on_change)
+    claim_events.subscribe(live_feed.on_change)
+    claim_events.subscribe(village_geocoder.on_change)
+    claim_events.subscribe(village_knn.on_change)
+
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # flush any claim writes still queued for group commit
+    await close_coalescers()
+
 # --------------------------
 # temporary debug endpoint — remove after debugging
 # --------------------------
@@ -226,6 +395,11 @@ def health():
 def ping():
     return {"message": "pong", "service": "FRA Atlas Backend"}
 
+@app.get("/api/cache/stats")
+def cache_stats():
+    """Hit/miss/eviction/invalidation counters of the listing caches."""
+    return query_cache.cache_stats()
+
 # --------------------------
 # FRA Document upload + OCR/NER -> create Claim (changed)
 # --------------------------
@@ -255,7 +429,8 @@ async def upload_fra(file: UploadFile = File(...), db: AsyncSession = Depends(ge
             "patta_holder": (entities.get("patta_holders") or [None])[0],
             "date": (entities.get("dates") or [None])[0],
             "land_area": entities.get("land_area") or entities.get("area") or None,
-            # coords left null — frontend can geocode or claim creation can be updated later by user
+            # coords filled in below when the village can be geocoded confidently; otherwise
+            # left null and the user sets them when editing the claim
             "lat": None,
             "lon": None,
             "status": "Pending",
@@ -270,6 +445,12 @@ async def upload_fra(file: UploadFile = File(...), db: AsyncSession = Depends(ge
             # still allow creation but frontend should let user edit village when claim is shown
             claim_payload["village"] = None
 
+        # coordinates from the villages table (fuzzy match of the OCR'd village / district / state)
+        geocode = await run_in_threadpool(geocode_claim, claim_payload)
+
+        # fill in state/district from the boundaries when coordinates are known
+        warnings = await run_in_threadpool(reconcile_location, claim_payload)
+
         # Insert claim into claims table using your helper
         created = await insert_claim(claim_payload)
 
@@ -280,6 +461,8 @@ async def upload_fra(file: UploadFile = File(...), db: AsyncSession = Depends(ge
             "entities": entities,
             "extracted_text": text,
             "claim": created,
+            "geocode": geocode,
+            "warnings": warnings,
         }
 
     except Exception as e:
@@ -289,24 +472,34 @@ async def upload_fra(file: UploadFile = File(...), db: AsyncSession = Depends(ge
 # --------------------------
 # Villages endpoint
 # --------------------------
+def _bbox_param(bbox: Optional[str]) -> Optional[str]:
+    """Validate ?bbox= and return it in canonical "minLon,minLat,maxLon,maxLat" form."""
+    if not bbox:
+        return None
+    try:
+        return ",".join(repr(v) for v in parse_bbox_value(bbox))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/api/villages")
-async def list_villages(db: AsyncSession = Depends(get_db)):
+async def list_villages(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Viewport filter minLon,minLat,maxLon,maxLat (R*Tree backed)"),
+):
+    bbox = _bbox_param(bbox)
+    filters = {"bbox": bbox} if bbox else None
+
+    async def build_body(versions: Optional[Dict[str, int]]) -> bytes:
+        query_cache.sync_villages(versions["villages"] if versions else None)
+        body = villages_cache.get(filters)
+        if body is None:
+            generation = villages_cache.generation
+            body = villages_cache.set(filters, await query_villages_json(bbox), generation)
+        return body
+
     try:
-        result = await db.execute(select(Village))
-        villages = result.scalars().all()
-        return [
-            {
-                "id": v.id,
-                "state": v.state,
-                "district": v.district,
-                "block": v.block,
-                "village": v.village,
-                "lat": v.lat,
-                "lon": v.lon,
-                "created_at": v.created_at,
-            }
-            for v in villages
-        ]
+        return await conditional_response(request, ["villages"], build_body)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -315,37 +508,108 @@ async def list_villages(db: AsyncSession = Depends(get_db)):
 # --------------------------
 @app.post("/api/claims")
 async def create_claim(payload: dict, db: AsyncSession = Depends(get_db)):
+    # state/district may be omitted (or "Unknown") when lat/lon fall inside a known boundary;
+    # values that contradict the coordinates are kept but reported as warnings
+    warnings = await run_in_threadpool(reconcile_location, payload)
     required = ["state", "district", "village"]
     for r in required:
         if not payload.get(r):
             raise HTTPException(status_code=400, detail=f"{r} is required")
+    # optional parcel polygon (GeoJSON); stored beside the claim and checked for overlaps
+    parcel = None
+    if payload.get("parcel") is not None:
+        try:
+            parcel = parse_parcel(payload["parcel"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"parcel: {e}")
     try:
         created = await insert_claim(payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return {"success": True, "claim": created}
+    response = {"success": True, "claim": created}
+    if parcel is not None and created.get("id") is not None:
+        # the claim is committed either way; the client is told whether its parcel was kept
+        try:
+            response["parcel"] = await save_parcel(created["id"], parcel)
+            response["parcel_stored"] = True
+        except Exception as e:
+            logger.exception("storing parcel for new claim %s failed", created["id"])
+            response["parcel_stored"] = False
+            warnings.append(f"parcel not stored: {e}")
+    if warnings:
+        response["warnings"] = warnings
+    return response
+
+# upper bound for GET /api/claims?ids=... (keeps the URL and the response bounded)
+MAX_MULTI_GET_IDS = 1000
+
 
 @app.get("/api/claims")
 async def list_claims(
+    request: Request,
     state: Optional[str] = None,
     district: Optional[str] = None,
     village: Optional[str] = None,
     status: Optional[str] = None,
+    min_area: Optional[float] = Query(None, description="Minimum land area (hectares)"),
+    max_area: Optional[float] = Query(None, description="Maximum land area (hectares)"),
+    date_from: Optional[str] = Query(None, description="Earliest claim date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Latest claim date (YYYY-MM-DD)"),
+    ids: Optional[str] = Query(None, description="Multi-get: comma separated claim ids, e.g. ?ids=1,2,3"),
+    format: str = Query("json", description="json (buffered, cached), ndjson or json-stream (streamed in batches)"),
+    bbox: Optional[str] = Query(None, description="Viewport filter minLon,minLat,maxLon,maxLat (R*Tree backed)"),
 ):
+    bbox = _bbox_param(bbox)
+    if format != "json" and format not in LISTING_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be json, {' or '.join(LISTING_FORMATS)}")
+    if ids:
+        try:
+            id_list = parse_id_list(ids)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma separated integers")
+        if len(id_list) > MAX_MULTI_GET_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_MULTI_GET_IDS} ids per request")
+        ids = ",".join(str(i) for i in dict.fromkeys(id_list))
     try:
-        filters = {k: v for k, v in {"state": state, "district": district, "village": village, "status": status}.items() if v}
-        claims = await query_claims(filters)
-        return {"claims": claims}
+        filters = {k: v for k, v in {"state": state, "district": district, "village": village, "status": status,
+                                     "min_area": min_area, "max_area": max_area,
+                                     "date_from": date_from, "date_to": date_to, "ids": ids, "bbox": bbox}.items() if v is not None and v != ""}
+
+
+        if format in LISTING_FORMATS and SQLITE_DB_PATH:
+            # rows flow from a cursor in batches; the sync generator runs in the threadpool and
+            # the client socket applies backpressure, so memory stays bounded for state-wide queries
+            gz = choose_encoding(request.headers.get("accept-encoding"), offered=("gzip",)) == "gzip"
+            headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Vary": "Accept-Encoding"}
+            if gz:
+                headers["Content-Encoding"] = "gzip"
+            return StreamingResponse(
+                stream_claims_listing(SQLITE_DB_PATH, filters, format, gzip=gz),
+                media_type=LISTING_FORMATS[format],
+                headers=headers,
+            )
+
+        async def build_body(versions: Optional[Dict[str, int]]) -> bytes:
+            # cached value is the pre-encoded JSON array of the filtered claims
+            await query_cache.sync_claims(versions["claims"] if versions else None)
+            body = claims_cache.get(filters)
+            if body is None:
+                generation = claims_cache.generation
+                body, ids = await query_claims_json(filters, with_ids=True)
+                claims_cache.set(filters, body, generation, ids)
+            return b'{"claims":' + body + b"}"
+
+        return await conditional_response(request, ["claims"], build_body)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/claims/{claim_id}")
+@app.get("/api/claims/{claim_id}", response_class=FastJSONResponse)
 async def get_claim(claim_id: int):
     try:
         claim = await get_claim_by_id(claim_id)
         if not claim:
             raise HTTPException(status_code=404, detail="Claim not found")
-        return {"claim": claim}
+        return FastJSONResponse({"claim": claim})
     except HTTPException:
         raise
     except Exception as e:
@@ -354,11 +618,12 @@ async def get_claim(claim_id: int):
 @app.delete("/api/claims/{claim_id}")
 async def delete_claim(claim_id: int):
     async with engine.begin() as conn:
-        row_res = await conn.execute(text("SELECT id FROM claims WHERE id = :id"), {"id": claim_id})
+        row_res = await conn.execute(text("SELECT * FROM claims WHERE id = :id"), {"id": claim_id})
         found = row_res.fetchone()
         if not found:
             raise HTTPException(status_code=404, detail="Claim not found")
         await conn.execute(text("DELETE FROM claims WHERE id = :id"), {"id": claim_id})
+    claim_events.publish("claims", "delete", old=dict(found._mapping), record_id=claim_id)
     return Response(status_code=204)
 
 @app.delete("/api/claims")
@@ -373,28 +638,84 @@ async def bulk_delete_claims(
             detail="Bulk delete not confirmed. Use ?confirm=true and provide ids as ?ids=1,2,3 or JSON body {ids:[...]}",
         )
 
-    id_list = []
-    if ids:
-        id_list = [int(x) for x in ids.split(",") if x.strip()]
-    elif payload and isinstance(payload.get("ids"), list):
-        id_list = [int(x) for x in payload.get("ids")]
+    raw = ids if ids else (payload or {}).get("ids")
+    try:
+        id_list = parse_id_list(raw) if raw else []
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a list of integers (?ids=1,2,3 or {\"ids\": [1, 2, 3]})")
 
     if not id_list:
         raise HTTPException(status_code=400, detail="No ids provided for bulk delete")
 
-    id_csv = ",".join(str(i) for i in id_list)
-    async with engine.begin() as conn:
-        await conn.execute(text(f"DELETE FROM claims WHERE id IN ({id_csv})"))
-    return {"deleted": len(id_list)}
-
-@app.get("/api/export/claims.csv")
-async def export_claims_csv():
-    async def iter_csv():
-        header = ["id","state","district","block","village","patta_holder","address","land_area","status","date","lat","lon","created_at"]
-        yield ",".join(header) + "\n"
-        rows = await query_claims({})
-        for r in rows:
-            vals = [str(r.get(h,"") or "") for h in header]
-            safe = [v.replace(",", " ") for v in vals]
-            yield ",".join(safe) + "\n"
-    return StreamingResponse(iter_csv(), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=claims.csv"})
+    # chunked, parameterized transactions through bulk_ops.iter_bulk (see backend/utils/bulk_ops.py)
+    result = await run_bulk("delete", list(dict.fromkeys(id_list)))
+    return {"deleted": result["affected"], "chunks": len(result["chunks"])}
+
+async def _columnar_export(table: str, fmt: str, filters: Optional[Dict[str, Any]] = None, geo: bool = False):
+    """
+    Build a Parquet (optionally GeoParquet) or Arrow IPC stream response for `table`.
+    """
+    if not SQLITE_DB_PATH:
+        raise HTTPException(status_code=500, detail="Columnar export requires a sqlite DATABASE_URL")
+    try:
+        if fmt == "parquet":
+            fh = await run_in_threadpool(write_parquet, SQLITE_DB_PATH, table, filters, geo)
+            body = iter_file(fh)
+        else:
+            body = arrow_stream(SQLITE_DB_PATH, table, filters, geo)
+    except ColumnarExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return StreamingResponse(
+        body,
+        media_type=COLUMNAR_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={columnar_filename(table, fmt, geo)}"},
+    )
+
+
+@app.get("/api/export/claims.{fmt}")
+async def export_claims(
+    fmt: str,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    village: Optional[str] = None,
+    status: Optional[str] = None,
+    q: Optional[str] = None,
+    min_area: Optional[float] = Query(None, description="Minimum land area (hectares)"),
+    max_area: Optional[float] = Query(None, description="Maximum land area (hectares)"),
+    date_from: Optional[str] = Query(None, description="Earliest claim date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Latest claim date (YYYY-MM-DD)"),
+    gzip: bool = Query(False, description="Compress the export on the fly (text formats)"),
+    geo: bool = Query(False, description="Add a WKB point geometry column (GeoParquet / Arrow)"),
+    bbox: Optional[str] = Query(None, description="Viewport filter minLon,minLat,maxLon,maxLat"),
+):
+    """
+    Stream claims as csv, ndjson or geojson straight from a sqlite cursor, or as
+    typed columnar parquet / arrow (IPC stream) built in record batches.
+    Honours the same filters as GET /api/claims (plus free-text `q`).
+    """
+    filters = {k: v for k, v in {"state": state, "district": district, "village": village, "status": status, "q": q,
+                                 "min_area": min_area, "max_area": max_area,
+                                 "date_from": date_from, "date_to": date_to,
+                                 "bbox": _bbox_param(bbox)}.items() if v is not None and v != ""}
+    if fmt in COLUMNAR_FORMATS:
+        return await _columnar_export("claims", fmt, filters, geo)
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unsupported export format: {fmt}")
+    if not SQLITE_DB_PATH:
+        raise HTTPException(status_code=500, detail="Streaming export requires a sqlite DATABASE_URL")
+    media_type, filename = export_media_type(fmt, gzip)
+    return StreamingResponse(
+        export_claims_stream(SQLITE_DB_PATH, filters, fmt=fmt, gzip=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@app.get("/api/export/villages.{fmt}")
+async def export_villages(fmt: str, geo: bool = Query(False, description="Add a WKB point geometry column")):
+    """
+    Typed columnar export of the villages gazetteer (parquet or arrow).
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unsupported export format: {fmt}")
+    return await _columnar_export("villages", fmt, None, geo)
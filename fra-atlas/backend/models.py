@@ -29,6 +29,10 @@ class Claim(Base):
     source = Column(String, default="manual")   # e.g. "manual" or "uploaded"
     raw_ocr = Column(Text, nullable=True)       # JSON/text dump of OCR+NER results if uploaded
 
+    # Typed copies parsed at ingest (indexed for range queries / date buckets)
+    land_area_ha = Column(Float, nullable=True)   # hectares
+    date_iso = Column(String, nullable=True)      # "YYYY-MM-DD"
+
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
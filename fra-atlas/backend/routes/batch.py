@@ -0,0 +1,135 @@
+# backend/routes/batch.py
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from sqlalchemy import text
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from backend.db import engine, _row_to_dict, parse_id_list
+from backend.routes.diagnostics import DiagnosticsRequest, run_diagnostics
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_OPS = 100
+MAX_BATCH_IDS = 1000
+
+
+class BatchOp(BaseModel):
+    op: str                              # claim | claims | count | diagnostics
+    id: Optional[int] = None             # claim, diagnostics (claim_id)
+    ids: Optional[List[int]] = None      # claims
+    village: Optional[str] = None        # count
+    state: Optional[str] = None          # count: scope for village names shared across states
+    district: Optional[str] = None
+    lat: Optional[float] = None          # diagnostics
+    lon: Optional[float] = None
+    land_area: Optional[float] = None
+
+
+class BatchRequest(BaseModel):
+    ops: List[BatchOp]
+
+
+class _OpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _fetch_claim(conn, claim_id: Optional[int]) -> Dict[str, Any]:
+    if claim_id is None:
+        raise _OpError(400, "id is required")
+    row = (await conn.execute(text("SELECT * FROM claims WHERE id = :id"), {"id": claim_id})).fetchone()
+    if not row:
+        raise _OpError(404, "Claim not found")
+    return _row_to_dict(row)
+
+
+async def _op_claim(conn, op: BatchOp) -> Any:
+    return await _fetch_claim(conn, op.id)
+
+
+async def _op_claims(conn, op: BatchOp) -> Any:
+    ids = parse_id_list(op.ids or [])
+    if not ids:
+        raise _OpError(400, "ids is required")
+    if len(ids) > MAX_BATCH_IDS:
+        raise _OpError(400, f"At most {MAX_BATCH_IDS} ids per op")
+    res = await conn.execute(
+        text("SELECT * FROM claims WHERE id IN (SELECT value FROM json_each(:ids))"),
+        {"ids": "[" + ",".join(str(i) for i in ids) + "]"},
+    )
+    by_id = {r._mapping["id"]: _row_to_dict(r) for r in res.fetchall()}
+    # keep the requested order; unknown ids are listed separately
+    return {"claims": [by_id[i] for i in ids if i in by_id], "missing": [i for i in ids if i not in by_id]}
+
+
+async def _op_count(conn, op: BatchOp) -> Any:
+    if not op.village:
+        raise _OpError(400, "village is required")
+    sql = "SELECT COALESCE(SUM(claim_count), 0) FROM claim_stats WHERE village = :village"
+    params = {"village": op.village}
+    for col in ("state", "district"):
+        if getattr(op, col):
+            sql += f" AND {col} = :{col}"
+            params[col] = getattr(op, col)
+    res = await conn.execute(text(sql), params)
+    return {"count": int(res.scalar() or 0)}
+
+
+async def _op_diagnostics(conn, op: BatchOp) -> Any:
+    lat, lon, land_area = op.lat, op.lon, op.land_area
+    if op.id is not None and (lat is None or lon is None or land_area is None):
+        # prefer the stored claim over the demo/seed fallbacks of run_diagnostics
+        claim = await _fetch_claim(conn, op.id)
+        lat = lat if lat is not None else claim.get("lat")
+        lon = lon if lon is not None else claim.get("lon")
+        land_area = land_area if land_area is not None else claim.get("land_area_ha")
+    req = DiagnosticsRequest(claim_id=op.id, lat=lat, lon=lon, land_area=land_area)
+    try:
+        return run_diagnostics(req)
+    except HTTPException as e:
+        raise _OpError(e.status_code, str(e.detail))
+
+
+_OPS: Dict[str, Callable] = {
+    "claim": _op_claim,
+    "claims": _op_claims,
+    "count": _op_count,
+    "diagnostics": _op_diagnostics,
+}
+
+
+@router.post("/batch", tags=["claims"])
+async def batch(req: BatchRequest):
+    """
+    Run several read operations in one request over one shared DB connection.
+    Ops: {"op":"claim","id":1}, {"op":"claims","ids":[1,2]},
+    {"op":"count","village":"..."} (optionally "state" / "district", as village names repeat across them),
+    {"op":"diagnostics","id":1} (or lat/lon/land_area).
+    Each result is {"ok": true, "data": ...} or {"ok": false, "status": <http code>, "error": "..."},
+    in the same order as the ops; one failing op does not fail the batch.
+    """
+    if not req.ops:
+        raise HTTPException(status_code=400, detail="No ops given")
+    if len(req.ops) > MAX_BATCH_OPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_OPS} ops per batch")
+
+    results: List[Dict[str, Any]] = []
+    async with engine.connect() as conn:
+        for op in req.ops:
+            handler = _OPS.get(op.op)
+            if handler is None:
+                results.append({"ok": False, "status": 400, "error": f"Unknown op '{op.op}'"})
+                continue
+            try:
+                results.append({"ok": True, "data": await handler(conn, op)})
+            except _OpError as e:
+                results.append({"ok": False, "status": e.status, "error": str(e)})
+            except ValueError as e:
+                results.append({"ok": False, "status": 400, "error": str(e)})
+            except Exception as e:
+                logger.exception("batch op %s failed", op.op)
+                results.append({"ok": False, "status": 500, "error": str(e)})
+    return {"results": results}
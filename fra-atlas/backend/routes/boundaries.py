@@ -0,0 +1,125 @@
+# backend/routes/boundaries.py
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+import logging
+
+from backend.utils.boundaries import boundary_index, canonical_district, canonical_state, is_unknown
+from backend.utils.boundary_layers import LEVELS, TIERS, boundary_layers, tier_for_zoom
+from backend.utils.http_cache import choose_encoding, etag_matches
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_LOCATE_POINTS = 100_000
+# revalidation window for unversioned layer URLs; ?v=<version> URLs are immutable
+LAYER_MAX_AGE = 3600
+
+
+class LocatePoint(BaseModel):
+    lat: float
+    lon: float
+    # optional: when given, the response says whether they agree with the boundaries
+    state: Optional[str] = None
+    district: Optional[str] = None
+
+
+class LocateRequest(BaseModel):
+    points: List[LocatePoint]
+
+
+def _locate(points: List[LocatePoint]) -> List[dict]:
+    states, districts = boundary_index.locate([p.lon for p in points], [p.lat for p in points])
+    out = []
+    for p, state, district in zip(points, states, districts):
+        item = {"lat": p.lat, "lon": p.lon, "state": state, "district": district}
+        mismatches = []
+        if state and not is_unknown(p.state) and canonical_state(p.state).lower() != state.lower():
+            mismatches.append("state")
+        if district and not is_unknown(p.district) and canonical_district(p.district).lower() != district.lower():
+            mismatches.append("district")
+        if p.state is not None or p.district is not None:
+            item["valid"] = not mismatches
+            item["mismatches"] = mismatches
+        out.append(item)
+    return out
+
+
+@router.post("/boundaries/locate", tags=["boundaries"])
+async def locate_points(req: LocateRequest):
+    """
+    State / district containing each point (null outside the loaded boundaries).
+    Points carrying state/district are also validated against the polygons.
+    """
+    if len(req.points) > MAX_LOCATE_POINTS:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_LOCATE_POINTS} points per request")
+    if not boundary_index.available:
+        raise HTTPException(status_code=503, detail="Boundary data unavailable")
+    try:
+        results = await run_in_threadpool(_locate, req.points)
+    except Exception as e:
+        logger.exception("boundary lookup failed")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"count": len(results), "results": results}
+
+
+@router.get("/boundaries/locate", tags=["boundaries"])
+async def locate_point(lat: float, lon: float):
+    """Single-point form of POST /api/boundaries/locate."""
+    return await locate_points(LocateRequest(points=[LocatePoint(lat=lat, lon=lon)]))
+
+
+@router.get("/boundaries", tags=["boundaries"])
+async def boundary_layers_index():
+    """
+    Available boundary layers: detail tiers with their zoom ranges, per-layer sizes and
+    the data version to append as ?v= for immutable caching.
+    """
+    try:
+        return await run_in_threadpool(boundary_layers.stats)
+    except Exception as e:
+        logger.exception("boundary layers unavailable")
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/boundaries/{level}.geojson", tags=["boundaries"])
+async def boundary_geojson(
+    level: str,
+    request: Request,
+    zoom: Optional[float] = None,
+    tier: Optional[int] = None,
+    v: Optional[str] = None,
+):
+    """
+    State or district boundaries simplified for the given map zoom (or an explicit
+    tier), as quantized GeoJSON. Precompressed; honours If-None-Match.
+    """
+    if level not in LEVELS:
+        raise HTTPException(status_code=404, detail=f"unknown boundary level '{level}' (expected one of {', '.join(LEVELS)})")
+    if tier is None:
+        tier = tier_for_zoom(zoom) if zoom is not None else len(TIERS) - 1
+    if not 0 <= tier < len(TIERS):
+        raise HTTPException(status_code=400, detail=f"tier must be between 0 and {len(TIERS) - 1}")
+    if not boundary_layers.available:
+        raise HTTPException(status_code=503, detail="Boundary data unavailable")
+    layer = boundary_layers.get(level, tier)
+    if layer is None:
+        raise HTTPException(status_code=404, detail=f"no {level} boundaries loaded")
+
+    body, encoding = layer.body(choose_encoding(request.headers.get("accept-encoding")))
+    cache_control = (
+        "public, max-age=31536000, immutable" if v and v == boundary_layers.version
+        else f"public, max-age={LAYER_MAX_AGE}"
+    )
+    headers = {
+        "ETag": f'"{layer.etag}{"" if encoding == "identity" else "-" + encoding}"',
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+        "X-Boundary-Tier": str(tier),
+    }
+    if etag_matches(request.headers.get("if-none-match"), layer.etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/geo+json", headers=headers)
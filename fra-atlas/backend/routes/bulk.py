@@ -0,0 +1,116 @@
+# backend/routes/bulk.py
+from fastapi import APIRouter, HTTPException, Body, Path
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+import logging
+
+from backend.db import get_claim_by_id, parse_bbox_value
+from backend.utils.bulk_ops import (
+    BULK_ACTIONS,
+    BULK_CHUNK_SIZE,
+    STATUS_VERIFIED,
+    STATUS_REJECTED,
+    iter_bulk,
+    prepare_updates,
+    resolve_claim_ids,
+    run_bulk,
+)
+from backend.utils.fast_json import dumps
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# filter keys accepted by the bulk endpoint (same as GET /api/claims)
+_FILTER_KEYS = {"state", "district", "village", "status", "q", "min_area", "max_area", "date_from", "date_to", "bbox"}
+
+
+class BulkRequest(BaseModel):
+    action: str
+    ids: Optional[List[int]] = None
+    filter: Optional[Dict[str, Any]] = None
+    status: Optional[str] = None          # for action=set_status
+    fields: Optional[Dict[str, Any]] = None  # for action=update
+    chunk_size: int = BULK_CHUNK_SIZE
+    confirm: bool = False                 # required for action=delete
+    stream: bool = False                  # NDJSON progress, one line per chunk
+
+
+@router.post("/claims/bulk", tags=["claims"])
+async def bulk_claims(req: BulkRequest):
+    """
+    Apply a status transition, field update or delete to many claims: explicit `ids` or every claim
+    matching `filter` (same keys as GET /api/claims). Runs in chunked transactions and returns
+    per-chunk progress (or streams it as NDJSON with stream=true).
+    """
+    if req.action not in BULK_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"action must be one of {', '.join(BULK_ACTIONS)}")
+    filters = {k: v for k, v in (req.filter or {}).items() if k in _FILTER_KEYS and v not in (None, "")}
+    if not req.ids and not filters:
+        raise HTTPException(status_code=400, detail="Provide ids or a non-empty filter")
+    # malformed filter values are the client's error, not a failure inside resolve_claim_ids
+    if "bbox" in filters:
+        try:
+            filters["bbox"] = parse_bbox_value(filters["bbox"])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="filter.bbox must be minLon,minLat,maxLon,maxLat")
+    for key in ("min_area", "max_area"):
+        if key in filters:
+            try:
+                filters[key] = float(filters[key])
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail=f"filter.{key} must be a number")
+    if req.action == "delete" and not req.confirm:
+        raise HTTPException(status_code=400, detail="Bulk delete not confirmed. Set confirm=true")
+
+    updates: Dict[str, Any] = {}
+    if req.action == "set_status":
+        if not req.status:
+            raise HTTPException(status_code=400, detail="status is required for set_status")
+        updates = {"status": req.status}
+    elif req.action == "update":
+        updates = prepare_updates(req.fields or {})
+        if not updates:
+            raise HTTPException(status_code=400, detail="No updatable fields given")
+
+    try:
+        ids = await resolve_claim_ids(req.ids, filters)
+    except Exception as e:
+        logger.exception("bulk_claims: resolving ids failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if req.stream:
+        async def progress():
+            try:
+                async for p in iter_bulk(req.action, ids, updates, req.chunk_size):
+                    yield dumps(p) + b"\n"
+            except Exception as e:
+                logger.exception("bulk_claims stream failed")
+                yield dumps({"error": str(e)}) + b"\n"
+        return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+    try:
+        return await run_bulk(req.action, ids, updates, req.chunk_size)
+    except Exception as e:
+        logger.exception("bulk_claims failed action=%s", req.action)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _transition(claim_id: int, status: str, note: Optional[str]):
+    logger.info("claim %s -> %s (%s)", claim_id, status, note or "no comment")
+    result = await run_bulk("set_status", [claim_id], {"status": status})
+    if not result["affected"]:
+        raise HTTPException(status_code=404, detail="Claim not found")
+    return await get_claim_by_id(claim_id)
+
+
+@router.post("/claims/{claim_id}/verify", tags=["claims"])
+async def verify_claim(claim_id: int = Path(..., ge=1), payload: Optional[Dict[str, Any]] = Body(None)):
+    """Mark a claim as Verified (optional {"comment": ...} is logged; there is no notes column)."""
+    return await _transition(claim_id, STATUS_VERIFIED, (payload or {}).get("comment"))
+
+
+@router.post("/claims/{claim_id}/reject", tags=["claims"])
+async def reject_claim(claim_id: int = Path(..., ge=1), payload: Optional[Dict[str, Any]] = Body(None)):
+    """Mark a claim as Rejected (optional {"reason": ...} is logged; there is no notes column)."""
+    return await _transition(claim_id, STATUS_REJECTED, (payload or {}).get("reason"))
@@ -0,0 +1,25 @@
+# backend/routes/changes.py
+from fastapi import APIRouter, HTTPException, Query
+import logging
+
+from backend.utils.change_log import get_changes
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/claims/changes", tags=["claims"])
+async def claim_changes(
+    since: int = Query(0, ge=0, description="Cursor returned by the previous call (0 = full sync)"),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Incremental sync: claims inserted/updated since `since` (full rows) and ids deleted since then.
+    Keep calling with the returned `cursor` while `has_more` is true. When `reset` is true the
+    cursor is too old (tombstones were compacted) and the client must resync from since=0.
+    """
+    try:
+        return await get_changes(since, limit)
+    except Exception as e:
+        logger.exception("claim_changes failed since=%s limit=%s", since, limit)
+        raise HTTPException(status_code=500, detail=str(e))
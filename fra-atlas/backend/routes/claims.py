@@ -3,6 +3,9 @@ from fastapi import APIRouter, Query, HTTPException, Path, status, Body
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
 from backend import db
+from backend.utils import claim_events
+from backend.utils.normalize_claims import typed_claim_columns
+from backend.utils.write_coalescer import get_coalescer
 import sqlite3
 from starlette.concurrency import run_in_threadpool
 import pathlib
@@ -86,22 +89,22 @@ async def _sqlite_get_claim_by_id(db_path: str, claim_id: int) -> Optional[Dict[
     return await run_in_threadpool(_fn)
 
 
+def _update_claim_sync(conn, claim_id: int, updates: Dict[str, Any]) -> int:
+    # Build SET clause safely (keys are filtered against the allowed column set by the caller)
+    sets = ", ".join([f"{k} = ?" for k in updates.keys()])
+    params = list(updates.values())
+    params.append(claim_id)
+    cur = conn.execute(f"UPDATE claims SET {sets} WHERE id = ?", params)
+    return cur.rowcount
+
+
 async def _sqlite_update_claim(db_path: str, claim_id: int, updates: Dict[str, Any]) -> None:
-    def _fn():
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        if not updates:
-            conn.close()
-            return
-        # Build SET clause safely
-        sets = ", ".join([f"{k} = ?" for k in updates.keys()])
-        params = list(updates.values())
-        params.append(claim_id)
-        sql = f"UPDATE claims SET {sets} WHERE id = ?"
-        cur.execute(sql, params)
-        conn.commit()
-        conn.close()
-    return await run_in_threadpool(_fn)
+    """
+    Queue the UPDATE on the write coalescer; concurrent updates share one commit.
+    """
+    if not updates:
+        return
+    await get_coalescer(db_path).submit(_update_claim_sync, claim_id, updates)
 
 
 def _get_default_db_path() -> str:
@@ -142,6 +145,9 @@ async def update_claim(claim_id: int = Path(..., ge=1), payload: ClaimUpdate = B
         # Nothing to change — return existing record
         return existing
 
+    # keep the typed columns in sync with land_area / date
+    updates.update(typed_claim_columns(updates))
+
     # Perform update
     try:
         await _sqlite_update_claim(db_path, claim_id, updates)
@@ -160,6 +166,7 @@ async def update_claim(claim_id: int = Path(..., ge=1), payload: ClaimUpdate = B
         # This is unexpected: we updated something but can't find the row
         raise HTTPException(status_code=500, detail="Claim updated but could not be retrieved")
 
+    claim_events.publish("claims", "update", row=updated, old=existing)
     logger.info("update_claim succeeded id=%s", claim_id)
     return updated
 
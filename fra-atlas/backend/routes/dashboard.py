@@ -0,0 +1,211 @@
+# backend/routes/dashboard.py
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+
+from backend.utils.claims_snapshot import snapshot
+from backend.utils.claim_clusters import cluster_index, CLUSTER_MAX_ZOOM
+from backend.utils.claim_heatmap import heatmap_index, HEATMAP_MAX_ZOOM
+from backend.utils.http_cache import conditional_response
+from backend.db import query_claim_aggregates, count_claims_for_villages, parse_bbox_value, STATS_LEVELS
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """db.parse_bbox_value for a ?bbox= parameter: None when not given, 400 when invalid."""
+    if not bbox:
+        return None
+    try:
+        return parse_bbox_value(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _require_snapshot():
+    """503 until the snapshot is loaded; then fold in claim writes made outside this process."""
+    if not snapshot.loaded:
+        raise HTTPException(status_code=503, detail="Claims snapshot not loaded yet")
+    await run_in_threadpool(snapshot.catch_up)
+
+
+def _json_bytes(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+@router.get("/claims/markers", tags=["claims"])
+async def claim_markers(
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    village: Optional[str] = None,
+    status: Optional[str] = None,
+    bbox: Optional[str] = None,
+):
+    """
+    Map markers [{id, lat, lon, status, village}, ...] for claims with coordinates,
+    served from the in-memory columnar snapshot (no SQLite read).
+    """
+    await _require_snapshot()
+    box = parse_bbox(bbox)
+    # filtering and encoding scan the whole snapshot; keep them off the event loop
+    body = await run_in_threadpool(
+        snapshot.markers, state=state, district=district, village=village, status=status, bbox=box
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/claims/summary", tags=["claims"])
+async def claim_summary(
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    village: Optional[str] = None,
+    status: Optional[str] = None,
+    bbox: Optional[str] = None,
+):
+    """
+    Dashboard tiles: total / geocoded counts, per-status counts and total hectares,
+    computed vectorized over the snapshot.
+    """
+    await _require_snapshot()
+    box = parse_bbox(bbox)
+
+    def build() -> bytes:
+        return _json_bytes(snapshot.summary(state=state, district=district, village=village, status=status, bbox=box))
+
+    return Response(content=await run_in_threadpool(build), media_type="application/json")
+
+
+@router.get("/claims/clusters", tags=["claims"])
+async def claim_clusters(
+    zoom: int = Query(..., ge=0, le=CLUSTER_MAX_ZOOM),
+    bbox: Optional[str] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """
+    Grid clusters for the map viewport at `zoom`: [{lat, lon, count, by_status[, id]}, ...].
+    Low zooms come from the precomputed, incrementally maintained cluster index; high zooms
+    and filtered requests are aggregated on the fly from the snapshot.
+    """
+    await _require_snapshot()
+    box = parse_bbox(bbox)
+
+    def build() -> bytes:
+        return _json_bytes(
+            cluster_index.clusters(snapshot, zoom, box, state=state, district=district, status=status)
+        )
+
+    return Response(content=await run_in_threadpool(build), media_type="application/json")
+
+
+@router.get("/claims/heatmap", tags=["claims"])
+async def claim_heatmap(
+    request: Request,
+    zoom: int = Query(..., ge=0, le=HEATMAP_MAX_ZOOM),
+    bbox: Optional[str] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """
+    Claim density grid for the viewport at `zoom` (default: the extent of the matching claims):
+    {width, height, bbox, cell_px, total, max, grids: {status: [row-major counts, north to south]}}.
+    Low zooms are sliced from the precomputed, incrementally maintained grids; high zooms and
+    state/district filters are histogrammed on the fly from the snapshot. ETag / 304 aware.
+    """
+    await _require_snapshot()
+    box = parse_bbox(bbox)
+
+    def build() -> bytes:
+        # caught up again after the ETag versions were read, so the body is at least that fresh
+        snapshot.catch_up()
+        return _json_bytes(heatmap_index.heatmap(snapshot, zoom, box, state=state, district=district, status=status))
+
+    async def build_body(versions: Optional[Dict[str, int]]) -> bytes:
+        try:
+            return await run_in_threadpool(build)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await conditional_response(request, ["claims"], build_body)
+
+
+@router.get("/claims/aggregates", tags=["claims"])
+async def claim_aggregates(
+    level: Optional[str] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    village: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """
+    Claim counts and total hectares from the pre-aggregated claim_stats table, rolled up to
+    `level` (omit for the grand total; state, district or village), each with a by_status breakdown.
+    """
+    if level is not None and level not in STATS_LEVELS:
+        raise HTTPException(status_code=400, detail=f"level must be one of {', '.join(STATS_LEVELS)}")
+    try:
+        groups = await query_claim_aggregates(
+            level, {"state": state, "district": district, "village": village, "status": status}
+        )
+    except Exception as e:
+        logger.exception("claim_aggregates failed")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"level": level, "groups": groups}
+
+
+# -------------------------
+# Batched per-village counts (replaces one /claims/count request per marker)
+# -------------------------
+class VillageCountsRequest(BaseModel):
+    villages: Optional[List[str]] = None
+    village_ids: Optional[List[int]] = None
+    bbox: Optional[str] = None
+    by_status: bool = False
+
+
+async def _village_counts(req: VillageCountsRequest):
+    if not (req.villages or req.village_ids or req.bbox):
+        raise HTTPException(status_code=400, detail="Provide villages, village_ids or bbox")
+    try:
+        return await count_claims_for_villages(
+            villages=req.villages, village_ids=req.village_ids, bbox=parse_bbox(req.bbox), by_status=req.by_status
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("village counts failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/claims/counts", tags=["claims"])
+async def claim_counts(
+    villages: Optional[str] = None,
+    village_ids: Optional[str] = None,
+    bbox: Optional[str] = None,
+    by_status: bool = False,
+):
+    """
+    Claim counts for many villages in one call:
+    ?villages=A,B (exact names) and/or ?village_ids=1,2 and/or ?bbox=minLon,minLat,maxLon,maxLat.
+    Counts are per (state, district, village), keyed "state|district|village", so a name shared
+    by villages in different districts yields one entry each.
+    Use POST with a JSON body for long lists or names containing commas.
+    """
+    try:
+        ids = [int(x) for x in village_ids.split(",") if x.strip()] if village_ids else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="village_ids must be comma-separated integers")
+    names = [v.strip() for v in villages.split(",") if v.strip()] if villages else None
+    return await _village_counts(VillageCountsRequest(villages=names, village_ids=ids, bbox=bbox, by_status=by_status))
+
+
+@router.post("/claims/counts", tags=["claims"])
+async def claim_counts_post(req: VillageCountsRequest):
+    """JSON-body variant of GET /claims/counts."""
+    return await _village_counts(req)
@@ -7,6 +7,9 @@ import math
 import json
 import os
 
+from backend.utils.claim_neighbourhood import neighbourhood_index, DEFAULT_PENDING_RATIO
+from backend.utils.village_knn import village_knn
+
 router = APIRouter()
 
 
@@ -15,6 +18,7 @@ class DiagnosticsRequest(BaseModel):
     lat: Optional[float] = Field(None, description="Latitude (if sending coords directly)")
     lon: Optional[float] = Field(None, description="Longitude (if sending coords directly)")
     land_area: Optional[float] = Field(None, description="Land area in hectares (optional)")
+    radius_km: Optional[float] = Field(None, gt=0, le=200, description="Neighbourhood radius for pendingClaimRatio (km)")
 
 class SchemeResult(BaseModel):
     name: str
@@ -26,6 +30,7 @@ class DiagnosticsResponse(BaseModel):
     input: Dict[str, Any]
     metrics: Dict[str, Any]
     recommendations: List[SchemeResult]
+    nearest_village: Optional[Dict[str, Any]] = None
 
 
 # --- Helper: attempt to load claim from demo JSON (optional, best-effort) ---
@@ -63,10 +68,13 @@ def try_load_claim_from_demo(claim_id: int) -> Optional[Dict[str, Any]]:
 
 
 # --- Deterministic metrics (mirrors frontend logic) ---
-def compute_metrics_from_values(lat: float, lon: float, land_area: float):
+def compute_metrics_from_values(lat: float, lon: float, land_area: float, radius_km: Optional[float] = None,
+                                coords_known: bool = True):
     """
     Deterministic, repeatable computation of pseudo-metrics from lat/lon and land_area.
-    Returns a dict with seed, soilIndex, gwIndex, distanceToWaterKm, pendingClaimRatio, land_area, lat, lon
+    Returns a dict with seed, soilIndex, gwIndex, distanceToWaterKm, pendingClaimRatio, nearbyClaims, land_area, lat, lon
+    (pendingClaimRatio: share of pending claims within radius_km; DEFAULT_PENDING_RATIO where there are none
+    or when coords_known is False, i.e. lat/lon are demo placeholders rather than a real location)
     """
     try:
         lat_n = float(lat or 0.0)
@@ -84,7 +92,11 @@ def compute_metrics_from_values(lat: float, lon: float, land_area: float):
     soilIndex = (seed % 61) / 60.0  # 0 - 1
     gwIndex = ((seed * 7) % 97) / 96.0  # 0 - 1
     distanceToWaterKm = round((100 - (seed % 100)) / 10.0, 1)  # 0.0 - 10.0
-    pendingClaimRatio = 0.5  # demo fixed value
+    if coords_known:
+        nearby = neighbourhood_index.pending_ratio(lat_n, lon_n, radius_km)
+    else:
+        nearby = {"ratio": DEFAULT_PENDING_RATIO, "claims": 0}
+    pendingClaimRatio = nearby["ratio"]
 
     return {
         "seed": int(seed),
@@ -94,6 +106,7 @@ def compute_metrics_from_values(lat: float, lon: float, land_area: float):
         "gwIndex": round(gwIndex, 4),
         "distanceToWaterKm": distanceToWaterKm,
         "pendingClaimRatio": round(pendingClaimRatio, 3),
+        "nearbyClaims": nearby["claims"],
         "land_area": round(la, 4),
     }
 
@@ -107,7 +120,8 @@ def score_schemes(metrics: Dict[str, Any], claim: Optional[Dict[str, Any]] = Non
     soilIndex = float(metrics.get("soilIndex") or 0.0)
     gwIndex = float(metrics.get("gwIndex") or 0.0)
     distance = float(metrics.get("distanceToWaterKm") or 0.0)
-    pendingClaimRatio = float(metrics.get("pendingClaimRatio") or 0.5)
+    ratio = metrics.get("pendingClaimRatio")
+    pendingClaimRatio = float(ratio if ratio is not None else DEFAULT_PENDING_RATIO)
 
     # clamp helper (allow raw sums up to 2 before normalization)
     def clamp(v, lo=0.0, hi=2.0):
@@ -127,7 +141,10 @@ def score_schemes(metrics: Dict[str, Any], claim: Optional[Dict[str, Any]] = Non
         mReasons.append("Larger land area (>1.5 ha) → more scope for MGNREGA interventions (+0.05)")
     if pendingClaimRatio > 0.5:
         mScore += 0.05
-        mReasons.append("Higher pending claims in area (demo) → targeted employment programs (+0.05)")
+        mReasons.append(
+            f"Most claims nearby still pending ({pendingClaimRatio:.0%} of {metrics.get('nearbyClaims') or 0})"
+            " → targeted employment programs (+0.05)"
+        )
 
     # JJM
     jScore = 0.20
@@ -202,6 +219,9 @@ def run_diagnostics(req: DiagnosticsRequest):
             # ignore and continue
             claim_data = None
 
+    # real coordinates (request or claim) as opposed to the demo fallbacks below
+    coords_known = lat is not None and lon is not None
+
     # If coords not provided, but claim_id present, use deterministic seed derived from claim_id to produce pseudo coords.
     if (lat is None or lon is None):
         if req.claim_id is not None:
@@ -232,7 +252,7 @@ def run_diagnostics(req: DiagnosticsRequest):
         land_area = 0.0
 
     # compute deterministic metrics and scoring
-    metrics = compute_metrics_from_values(lat, lon, land_area)
+    metrics = compute_metrics_from_values(lat, lon, land_area, req.radius_km, coords_known)
     recommendations = score_schemes(metrics, claim_data or {"land_area": land_area})
 
     result = {
@@ -242,6 +262,14 @@ def run_diagnostics(req: DiagnosticsRequest):
         "recommendations": recommendations,
     }
 
+    # closest known village (KD-tree, see backend/utils/village_knn.py)
+    if coords_known and village_knn.loaded:
+        try:
+            nearest = village_knn.nearest(lat, lon, 1)
+            result["nearest_village"] = nearest[0] if nearest else None
+        except Exception:
+            result["nearest_village"] = None
+
     return result
 
 
@@ -0,0 +1,90 @@
+# backend/routes/live.py
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import logging
+
+from backend.db import parse_bbox_value
+from backend.utils.live_feed import live_feed, LIVE_HEARTBEAT_SECONDS
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/claims/live", tags=["claims"])
+async def claims_live_sse(
+    request: Request,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    bbox: Optional[str] = None,
+):
+    """
+    Server-Sent Events stream of claim changes ({"table","op","id","row"} per `data:` line),
+    optionally filtered by state, district and bbox=minLon,minLat,maxLon,maxLat.
+    The stream ends if the client falls too far behind; reconnect and catch up via /api/claims/changes.
+    """
+    try:
+        box = parse_bbox_value(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sub = live_feed.subscribe(state=state, district=district, bbox=box)
+
+    async def events():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": ping\n\n"
+                    continue
+                if message is None:  # dropped as a slow consumer
+                    yield b"event: dropped\ndata: {}\n\n"
+                    break
+                yield b"data: " + message + b"\n\n"
+        finally:
+            live_feed.unsubscribe(sub)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.websocket("/claims/ws")
+async def claims_live_ws(
+    websocket: WebSocket,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    bbox: Optional[str] = None,
+):
+    """WebSocket variant of /api/claims/live: one JSON text message per claim change."""
+    try:
+        box = parse_bbox_value(bbox) if bbox else None
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    await websocket.accept()
+    sub = live_feed.subscribe(state=state, district=district, bbox=box)
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), timeout=LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                await websocket.send_text('{"type":"ping"}')
+                continue
+            if message is None:
+                await websocket.close(code=1013, reason="client too slow")
+                break
+            await websocket.send_text(message.decode("utf-8"))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        live_feed.unsubscribe(sub)
+
+
+@router.get("/claims/live/stats", tags=["claims"])
+async def claims_live_stats():
+    """Connected live subscribers in this worker and delivered / dropped counters."""
+    return live_feed.stats()
@@ -0,0 +1,112 @@
+# backend/routes/parcels.py
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+import logging
+
+from backend.utils.claim_parcels import (
+    MAX_PARCEL_BATCH,
+    delete_parcel,
+    find_overlaps,
+    load_parcel,
+    parse_parcel,
+    save_parcel,
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class ParcelRequest(BaseModel):
+    # GeoJSON Polygon / MultiPolygon in lon/lat (a whole GeoJSON Feature is accepted too)
+    geometry: Dict[str, Any]
+
+
+class ParcelCheck(BaseModel):
+    geometry: Dict[str, Any]
+    # claim the parcel belongs to, when re-checking an existing claim (its stored parcel is skipped)
+    claim_id: Optional[int] = None
+
+
+class ParcelCheckRequest(BaseModel):
+    parcels: List[ParcelCheck]
+
+
+def _parse(geometry: Dict[str, Any]):
+    try:
+        return parse_parcel(geometry)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/claims/{claim_id}/parcel", tags=["parcels"])
+async def put_claim_parcel(claim_id: int, req: ParcelRequest):
+    """
+    Store (or replace) the parcel polygon of a claim. The response carries the geodesic area
+    and every stored parcel it overlaps; `titled_overlap` is true when one of them already has a title.
+    """
+    geom = _parse(req.geometry)
+    try:
+        return await save_parcel(claim_id, geom)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Claim not found")
+    except Exception as e:
+        logger.exception("saving parcel for claim %s failed", claim_id)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/claims/{claim_id}/parcel", tags=["parcels"])
+async def get_claim_parcel(claim_id: int):
+    """The claim's parcel as a GeoJSON Feature (404 when none is stored)."""
+    from shapely.geometry import mapping
+
+    found = await load_parcel(claim_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="No parcel stored for this claim")
+    geom, row = found
+    return {"type": "Feature", "id": claim_id, "properties": row, "geometry": mapping(geom)}
+
+
+@router.delete("/claims/{claim_id}/parcel", tags=["parcels"])
+async def delete_claim_parcel(claim_id: int):
+    if not await delete_parcel(claim_id):
+        raise HTTPException(status_code=404, detail="No parcel stored for this claim")
+    return Response(status_code=204)
+
+
+@router.get("/claims/{claim_id}/parcel/overlaps", tags=["parcels"])
+async def claim_parcel_overlaps(claim_id: int):
+    """Stored parcels that currently overlap this claim's parcel."""
+    found = await load_parcel(claim_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="No parcel stored for this claim")
+    overlaps = (await find_overlaps([found[0]], [claim_id]))[0]
+    return {"claim_id": claim_id, "overlaps": overlaps, "titled_overlap": any(o.get("titled") for o in overlaps)}
+
+
+@router.post("/parcels/overlaps", tags=["parcels"])
+async def check_parcel_overlaps(req: ParcelCheckRequest):
+    """
+    Overlap check for a batch of parcels without storing them (ingest pre-check): per parcel,
+    the stored parcels it overlaps and the other parcels of the batch it overlaps ({batch_index}).
+    """
+    if len(req.parcels) > MAX_PARCEL_BATCH:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_PARCEL_BATCH} parcels per request")
+    geoms = []
+    for i, p in enumerate(req.parcels):
+        try:
+            geoms.append(parse_parcel(p.geometry))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"parcels[{i}]: {e}")
+    try:
+        results = await find_overlaps(geoms, [p.claim_id for p in req.parcels])
+    except Exception as e:
+        logger.exception("parcel overlap check failed")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "count": len(results),
+        "results": [
+            {"index": i, "claim_id": p.claim_id, "overlaps": hits, "titled_overlap": any(h.get("titled") for h in hits)}
+            for i, (p, hits) in enumerate(zip(req.parcels, results))
+        ],
+    }
@@ -0,0 +1,43 @@
+# backend/routes/tiles.py
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+import hashlib
+import logging
+
+from backend.utils.vector_tiles import TILE_LAYERS, TILE_MAX_ZOOM, POINT_LAYERS, tile_service
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+@router.get("/tiles/{layer}/{z}/{x}/{y}.mvt", tags=["tiles"])
+async def vector_tile(layer: str, z: int, x: int, y: int, request: Request):
+    """
+    Mapbox Vector Tile for claims, villages, districts or states (layer name inside the tile = `layer`).
+    Served from the tile cache; rendered on demand on a miss.
+    """
+    if layer not in TILE_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown layer; use one of {', '.join(TILE_LAYERS)}")
+    if not (0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    try:
+        body = await run_in_threadpool(tile_service.get_tile, layer, z, x, y)
+    except Exception as e:
+        logger.exception("tile render failed %s/%s/%s/%s", layer, z, x, y)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    # point layers change with claims and must be revalidated; boundaries are static
+    cache_control = "no-cache" if layer in POINT_LAYERS else "public, max-age=86400"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=MVT_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/api/tiles/stats", tags=["tiles"])
+async def tile_stats():
+    """Tile cache counters for this worker."""
+    return tile_service.cache.stats()
@@ -0,0 +1,107 @@
+# backend/routes/villages.py
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+import logging
+
+from backend.utils.village_geocoder import GEOCODE_MIN_CONFIDENCE, village_geocoder
+from backend.utils.village_knn import village_knn
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_NEAREST_K = 100
+MAX_NEAREST_POINTS = 50_000
+
+
+class NearestPoint(BaseModel):
+    lat: float
+    lon: float
+
+
+class NearestRequest(BaseModel):
+    points: List[NearestPoint]
+    k: int = 1
+    max_km: Optional[float] = None
+
+
+@router.get("/villages/geocode", tags=["villages"])
+async def geocode_village(
+    village: str = Query(..., description="Village name as read from the document (misspellings tolerated)"),
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=50),
+):
+    """
+    Villages matching a (possibly misspelled / differently transliterated) name, best first,
+    with coordinates and a 0..1 confidence. `accepted` tells whether ingestion would use the
+    best match's coordinates without review.
+    """
+    if not village_geocoder.loaded:
+        raise HTTPException(status_code=503, detail="Village index not loaded")
+    try:
+        matches = village_geocoder.geocode(village, district, state, limit=limit)
+    except Exception as e:
+        logger.exception("geocode failed for %r", village)
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "query": {"village": village, "district": district, "state": state},
+        "accepted": bool(matches) and matches[0]["confidence"] >= GEOCODE_MIN_CONFIDENCE,
+        "min_confidence": GEOCODE_MIN_CONFIDENCE,
+        "matches": matches,
+    }
+
+
+@router.get("/villages/geocode/stats", tags=["villages"])
+async def geocoder_stats():
+    return village_geocoder.stats()
+
+
+def _check_point(lat: float, lon: float) -> None:
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise HTTPException(status_code=400, detail="lat must be within [-90, 90] and lon within [-180, 180]")
+
+
+@router.get("/villages/nearest", tags=["villages"])
+async def nearest_villages(
+    lat: float,
+    lon: float,
+    k: int = Query(5, ge=1, le=MAX_NEAREST_K),
+    max_km: Optional[float] = Query(None, gt=0, description="Drop villages farther than this (great-circle km)"),
+):
+    """The k villages closest to a point, nearest first, with great-circle distances."""
+    _check_point(lat, lon)
+    if not village_knn.loaded:
+        raise HTTPException(status_code=503, detail="Village index not loaded")
+    villages = await run_in_threadpool(village_knn.nearest, lat, lon, k, max_km)
+    return {"lat": lat, "lon": lon, "k": k, "villages": villages}
+
+
+@router.post("/villages/nearest", tags=["villages"])
+async def nearest_villages_batch(req: NearestRequest):
+    """
+    Batch form: snaps every point to its k nearest villages in one vectorized pass.
+    results[i] belongs to points[i].
+    """
+    if not 1 <= req.k <= MAX_NEAREST_K:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_NEAREST_K}")
+    if len(req.points) > MAX_NEAREST_POINTS:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_NEAREST_POINTS} points per request")
+    for p in req.points:
+        _check_point(p.lat, p.lon)
+    if not village_knn.loaded:
+        raise HTTPException(status_code=503, detail="Village index not loaded")
+    try:
+        results = await run_in_threadpool(
+            village_knn.nearest_many, [p.lat for p in req.points], [p.lon for p in req.points], req.k, req.max_km,
+        )
+    except Exception as e:
+        logger.exception("nearest-village batch failed")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"count": len(results), "k": req.k, "results": results}
+
+
+@router.get("/villages/nearest/stats", tags=["villages"])
+async def nearest_stats():
+    return village_knn.stats()
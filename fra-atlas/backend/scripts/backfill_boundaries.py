@@ -0,0 +1,104 @@
+# backend/scripts/backfill_boundaries.py
+"""
+Assign state / district to existing claims from their coordinates (point-in-polygon
+against the GeoJSON boundaries, see backend/utils/boundaries.py).
+
+Claims are read in id order in batches of --batch-size (keyset pagination, so the
+updates never disturb the read cursor). Each batch is located with one vectorized
+BoundaryIndex.locate call and written with a single executemany in its own
+transaction. Points outside every boundary are left untouched.
+
+By default only missing values (NULL, '', "Unknown") are filled in. --overwrite
+replaces every value that disagrees with the polygons; --check writes nothing and
+just reports how many claims would change and how many disagree.
+
+The claim_stats / change-log / rtree triggers see the updates, but a running server's
+in-memory snapshot does not: restart it (or reload the snapshot) afterwards.
+
+Usage (from the fra-atlas/ directory):
+  python -m backend.scripts.backfill_boundaries --check
+  python -m backend.scripts.backfill_boundaries [--overwrite] [--batch-size 50000]
+"""
+import argparse
+import sqlite3
+import time
+
+from backend.db import SQLITE_DB_PATH
+from backend.utils.boundaries import boundary_index, canonical_district, canonical_state, is_unknown
+
+
+def _differs(current, found, canon) -> bool:
+    return not is_unknown(current) and canon(current).lower() != found.lower()
+
+
+def backfill(db_path: str, batch_size: int = 50000, overwrite: bool = False, check: bool = False) -> dict:
+    if not boundary_index.available:
+        raise SystemExit("no boundary data found (set BOUNDARIES_DIR)")
+    conn = sqlite3.connect(db_path)
+    stats = {"scanned": 0, "located": 0, "filled": 0, "mismatched": 0, "updated": 0}
+    last_id = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            rows = conn.execute(
+                "SELECT id, state, district, lat, lon FROM claims "
+                "WHERE id > ? AND lat IS NOT NULL AND lon IS NOT NULL ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            stats["scanned"] += len(rows)
+            states, districts = boundary_index.locate([r[4] for r in rows], [r[3] for r in rows])
+
+            updates = []
+            for (cid, cur_state, cur_district, _, _), state, district in zip(rows, states, districts):
+                if state is None:
+                    continue
+                stats["located"] += 1
+                new_state, new_district = cur_state, cur_district
+                mismatch = _differs(cur_state, state, canonical_state) or (
+                    district is not None and _differs(cur_district, district, canonical_district)
+                )
+                if mismatch:
+                    stats["mismatched"] += 1
+                if is_unknown(cur_state) or (overwrite and cur_state != state):
+                    new_state = state
+                if district is not None and (is_unknown(cur_district) or (overwrite and cur_district != district)):
+                    new_district = district
+                if (new_state, new_district) != (cur_state, cur_district):
+                    if not mismatch:
+                        stats["filled"] += 1
+                    updates.append((new_state, new_district, cid))
+
+            stats["updated"] += len(updates)
+            if updates and not check:
+                with conn:
+                    conn.executemany("UPDATE claims SET state = ?, district = ? WHERE id = ?", updates)
+    finally:
+        conn.close()
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default=SQLITE_DB_PATH, help="sqlite file (default: the app database)")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--overwrite", action="store_true", help="replace values that disagree with the boundaries")
+    parser.add_argument("--check", action="store_true", help="report only, do not write")
+    args = parser.parse_args()
+    if not args.db:
+        raise SystemExit("not a sqlite database; pass --db")
+
+    stats = backfill(args.db, args.batch_size, overwrite=args.overwrite, check=args.check)
+    verb = "would update" if args.check else "updated"
+    print(
+        f"scanned {stats['scanned']} claims with coordinates in {stats['seconds']}s: "
+        f"{stats['located']} inside a boundary, {stats['filled']} missing filled, "
+        f"{stats['mismatched']} disagree with the boundaries; {verb} {stats['updated']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
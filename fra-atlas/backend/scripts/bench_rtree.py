@@ -0,0 +1,108 @@
+# backend/scripts/bench_rtree.py
+"""
+Benchmark: viewport (bbox) queries over N synthetic claims.
+
+Builds a throwaway sqlite file with N claims spread over central/eastern India,
+then times random viewport queries with the predicate GET /api/claims uses
+(db.bbox_where_sql):
+  rtree    claims_rtree subquery + exact range check (what the API uses)
+  btree    composite (lon, lat) b-tree index only
+  scan     no spatial index at all
+
+Viewports are "district" (~0.5 deg) and "state" (~3 deg) sized. Each query
+fetches (id, village) like a listing does, so every plan pays the same row lookups.
+
+Usage (from the fra-atlas/ directory):
+  python -m backend.scripts.bench_rtree --n 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from backend.db import SPATIAL_INDEXED, bbox_where_sql
+
+# roughly MP .. Tripura
+LON_RANGE = (74.0, 92.0)
+LAT_RANGE = (17.0, 26.5)
+
+
+def make_db(path: str, n: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE claims (id INTEGER PRIMARY KEY, village TEXT, status TEXT, lat REAL, lon REAL)")
+    conn.execute("CREATE VIRTUAL TABLE claims_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat)")
+    rnd = random.Random(7)
+    # clustered like real villages: points around 2000 centres
+    centres = [(rnd.uniform(*LON_RANGE), rnd.uniform(*LAT_RANGE)) for _ in range(2000)]
+
+    def rows():
+        for i in range(1, n + 1):
+            cx, cy = centres[i % len(centres)]
+            yield i, f"Village {i % 5000}", "Pending", cy + rnd.gauss(0, 0.05), cx + rnd.gauss(0, 0.05)
+
+    conn.executemany("INSERT INTO claims VALUES (?, ?, ?, ?, ?)", rows())
+    conn.execute("INSERT INTO claims_rtree SELECT id, lon, lon, lat, lat FROM claims")
+    conn.commit()
+    conn.close()
+
+
+def viewports(count: int, size: float, seed: int):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        x = rnd.uniform(LON_RANGE[0], LON_RANGE[1] - size)
+        y = rnd.uniform(LAT_RANGE[0], LAT_RANGE[1] - size)
+        yield x, y, x + size, y + size
+
+
+def run(conn: sqlite3.Connection, mode: str, boxes) -> tuple:
+    if mode == "rtree":
+        SPATIAL_INDEXED.add("claims")
+    else:
+        SPATIAL_INDEXED.discard("claims")
+    times, hits = [], 0
+    for box in boxes:
+        params = {}
+        sql = "SELECT id, village FROM claims WHERE 1=1" + bbox_where_sql("claims", box, params)
+        if mode == "scan":
+            sql = sql.replace("FROM claims WHERE", "FROM claims NOT INDEXED WHERE")
+        t = time.perf_counter()
+        hits += len(conn.execute(sql, params).fetchall())
+        times.append((time.perf_counter() - t) * 1000)
+    return statistics.median(times), sorted(times)[int(len(times) * 0.95) - 1], hits // max(1, len(times))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--skip-scan", action="store_true", help="skip the (slow) no-index baseline")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_rtree_")
+    path = os.path.join(tmp, "claims.db")
+    t = time.perf_counter()
+    make_db(path, args.n)
+    print(f"built {args.n:,} claims in {time.perf_counter() - t:.1f}s")
+
+    conn = sqlite3.connect(path)
+    modes = ["rtree", "btree"] + ([] if args.skip_scan else ["scan"])
+    for label, size in (("district", 0.5), ("state", 3.0)):
+        boxes = list(viewports(args.queries, size, seed=int(size * 10)))
+        for mode in modes:
+            if mode == "btree":
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_bench_lon_lat ON claims (lon, lat)")
+            n_q = len(boxes) if mode != "scan" else min(len(boxes), 10)
+            p50, p95, avg_hits = run(conn, mode, boxes[:n_q])
+            print(f"{label:8s} {mode:6s} p50 {p50:8.2f} ms  p95 {p95:8.2f} ms  ~{avg_hits:,} rows/viewport")
+            if mode == "btree":
+                conn.execute("DROP INDEX idx_bench_lon_lat")
+    conn.close()
+    os.remove(path)
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# backend/scripts/bench_serialization.py
+"""
+Micro-benchmark: claims rows -> JSON bytes.
+
+Compares, on a throwaway sqlite file with N synthetic claims:
+  legacy     sqlite3.Row -> dict -> jsonable_encoder -> json.dumps (the old /api/claims path)
+  row_tuple  RowEncoder over plain row tuples (no per-row dict)
+  sqlite     json_object() in SQL + join (what /api/claims uses now)
+
+Usage (from the fra-atlas/ directory):
+  python -m backend.scripts.bench_serialization --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from backend.db import CLAIM_COLUMNS
+from backend.utils.fast_json import RowEncoder, join_json_rows, json_object_sql
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:  # benchmark still runs without fastapi
+    def jsonable_encoder(obj):
+        return obj
+
+
+def make_db(path: str, n: int) -> None:
+    conn = sqlite3.connect(path)
+    cols = ", ".join(f"{c} {'INTEGER PRIMARY KEY' if c == 'id' else ''}" for c in CLAIM_COLUMNS)
+    conn.execute(f"CREATE TABLE claims ({cols})")
+    states = ["Madhya Pradesh", "Odisha", "Telangana", "Tripura"]
+    rnd = random.Random(42)
+
+    def rows():
+        for i in range(1, n + 1):
+            area = round(rnd.uniform(0.1, 5), 2)
+            yield (
+                i, rnd.choice(states), f"District {i % 40}", None, f"Village {i % 5000}",
+                f"Holder {i}", f"Address {i}, \"quoted\"", f"{area} ha", rnd.choice(["Pending", "Granted"]),
+                "2025-09-10", rnd.uniform(17, 26), rnd.uniform(77, 92), "2025-09-13T14:54:04.761431",
+                "manual", None, area, "2025-09-10",
+            )
+
+    conn.executemany(f"INSERT INTO claims VALUES ({', '.join('?' for _ in CLAIM_COLUMNS)})", rows())
+    conn.commit()
+    conn.close()
+
+
+def bench_legacy(path: str) -> bytes:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT * FROM claims").fetchall()
+    conn.close()
+    payload = {"claims": [dict(r) for r in rows]}
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def bench_row_tuple(path: str) -> bytes:
+    conn = sqlite3.connect(path)
+    rows = conn.execute(f"SELECT {', '.join(CLAIM_COLUMNS)} FROM claims").fetchall()
+    conn.close()
+    return b'{"claims":' + RowEncoder(CLAIM_COLUMNS).encode(rows) + b"}"
+
+
+def bench_sqlite(path: str) -> bytes:
+    conn = sqlite3.connect(path)
+    rows = conn.execute(f"SELECT {json_object_sql(CLAIM_COLUMNS)} FROM claims").fetchall()
+    conn.close()
+    return b'{"claims":' + join_json_rows(rows) + b"}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    strategies = [("legacy", bench_legacy), ("row_tuple", bench_row_tuple), ("sqlite", bench_sqlite)]
+    print(f"{'rows':>10} {'strategy':>10} {'best_s':>9} {'MB':>8} {'speedup':>8}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            make_db(path, n)
+            baseline = None
+            for name, fn in strategies:
+                best = float("inf")
+                size = 0
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    body = fn(path)
+                    best = min(best, time.perf_counter() - t0)
+                    size = len(body)
+                json.loads(body)  # sanity: output must be valid JSON
+                baseline = baseline or best
+                print(f"{n:>10} {name:>10} {best:>9.3f} {size / 1e6:>8.1f} {baseline / best:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# backend/utils/boundaries.py
+"""
+State and district boundary polygons, loaded once from the GeoJSON files the
+frontend ships (frontend/src/geojson/*.json and geojson/districts/*.json).
+
+The files disagree on names (the MP/Odisha/Telangana/Tripura state files use
+simplemaps names such as "Orissa"; the Telangana district files still say
+ST_NM "Andhra Pradesh"), so every boundary is labelled with a canonical state
+name derived from the file prefix, falling back to STATE_ALIASES, and district
+names are mapped to the spelling used in the claims table (DISTRICT_ALIASES).
+
+`BoundaryIndex` puts the polygons into one shapely STRtree per level and
+assigns state/district to whole batches of points with vectorized shapely
+calls (no per-point Python geometry work); `reconcile_location` uses it
+to fill in or validate the state/district of a claim from its coordinates.
+"""
+
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GEOJSON_DIR = Path(os.getenv("BOUNDARIES_DIR") or Path(__file__).resolve().parents[2] / "frontend" / "src" / "geojson")
+
+# file prefix -> canonical state name (as stored in claims.state)
+STATE_FILE_PREFIXES = {
+    "mp": "Madhya Pradesh",
+    "odisha": "Odisha",
+    "telangana": "Telangana",
+    "tripura": "Tripura",
+}
+
+# lower-cased spelling variants -> canonical state name
+STATE_ALIASES = {
+    "orissa": "Odisha",
+    "odisha": "Odisha",
+    "madhya pradesh": "Madhya Pradesh",
+    "mp": "Madhya Pradesh",
+    "telangana": "Telangana",
+    "tripura": "Tripura",
+}
+
+
+# boundary-file district name (lower-cased) -> name used in claims / villages
+DISTRICT_ALIASES = {
+    "west tripura": "West",
+}
+
+# state / district values that mean "not known" (upload_fra falls back to "Unknown")
+UNKNOWN_VALUES = {"", "unknown", "none", "null", "n/a"}
+
+
+def canonical_state(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    return STATE_ALIASES.get(str(name).strip().lower(), str(name).strip())
+
+
+def canonical_district(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    return DISTRICT_ALIASES.get(str(name).strip().lower(), str(name).strip())
+
+
+def is_unknown(value: Any) -> bool:
+    return value is None or str(value).strip().lower() in UNKNOWN_VALUES
+
+
+def _features(path: Path) -> List[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except Exception:
+        logger.exception("could not read boundary file %s", path)
+        return []
+    if not isinstance(data, dict) or data.get("type") != "FeatureCollection":
+        return []  # e.g. village_records.json
+    return [f for f in data.get("features") or [] if f and f.get("geometry")]
+
+
+@lru_cache(maxsize=1)
+def load_boundaries() -> List[Dict[str, Any]]:
+    """
+    [{"level": "state" | "district", "state": str, "district": str | None, "name": str,
+      "code": str | None, "geometry": shapely geometry (lon/lat)}, ...]
+    """
+    from shapely.geometry import shape  # optional at import time (listed in requirements.txt)
+
+    out: List[Dict[str, Any]] = []
+    for path in sorted(GEOJSON_DIR.glob("*.json")):
+        for f in _features(path):
+            props = f.get("properties") or {}
+            state = STATE_FILE_PREFIXES.get(path.stem) or canonical_state(props.get("name"))
+            out.append({
+                "level": "state", "state": state, "district": None, "name": state,
+                "code": props.get("id"), "geometry": shape(f["geometry"]),
+            })
+    for path in sorted((GEOJSON_DIR / "districts").glob("*.json")):
+        prefix = path.stem.split("_", 1)[0]
+        for f in _features(path):
+            props = f.get("properties") or {}
+            state = STATE_FILE_PREFIXES.get(prefix) or canonical_state(props.get("ST_NM"))
+            district = canonical_district(props.get("DISTRICT"))
+            code = props.get("censuscode")
+            out.append({
+                "level": "district", "state": state, "district": district, "name": district,
+                "code": str(code) if code is not None else None, "geometry": shape(f["geometry"]),
+            })
+    logger.info("loaded %d boundaries from %s", len(out), GEOJSON_DIR)
+    return out
+
+
+class BoundaryIndex:
+    """
+    STRtree per level over load_boundaries(); built lazily on first use.
+
+    `tree.query(points, predicate=...)` prepares the query points rather than the
+    polygons, which is slow for large batches, so lookups run in two vectorized steps:
+    an envelope-only tree query for candidate (point, polygon) pairs, then one
+    `intersects_xy` call per prepared polygon over its candidates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels: Optional[Dict[str, Tuple[List[Dict[str, Any]], Any]]] = None
+
+    def _ensure(self) -> Dict[str, Tuple[List[Dict[str, Any]], Any]]:
+        with self._lock:
+            if self._levels is None:
+                import shapely
+                from shapely.strtree import STRtree
+
+                levels = {}
+                for level in ("state", "district"):
+                    items = [b for b in load_boundaries() if b["level"] == level]
+                    for b in items:
+                        shapely.prepare(b["geometry"])
+                    tree = STRtree([b["geometry"] for b in items]) if items else None
+                    levels[level] = (items, tree)
+                self._levels = levels
+            return self._levels
+
+    @property
+    def available(self) -> bool:
+        try:
+            return any(tree is not None for _, tree in self._ensure().values())
+        except Exception:
+            logger.debug("boundary index unavailable", exc_info=True)
+            return False
+
+    def _match(self, level: str, points, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Index into the level's items for each point (-1 = outside every polygon)."""
+        import shapely
+
+        items, tree = self._ensure()[level]
+        out = np.full(len(xs), -1, dtype=np.int64)
+        if tree is None:
+            return out
+        point_idx, geom_idx = tree.query(points)
+        order = np.argsort(geom_idx, kind="stable")
+        point_idx, geom_idx = point_idx[order], geom_idx[order]
+        bounds = np.searchsorted(geom_idx, np.arange(len(items) + 1))
+        # reversed so the first polygon wins where boundaries share an edge
+        for g in range(len(items) - 1, -1, -1):
+            cand = point_idx[bounds[g]:bounds[g + 1]]
+            if len(cand):
+                hit = shapely.intersects_xy(items[g]["geometry"], xs[cand], ys[cand])
+                out[cand[hit]] = g
+        return out
+
+    def locate(self, lons: Sequence[float], lats: Sequence[float]) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """
+        (states, districts) for each point; None where a point lies outside every polygon
+        or has no coordinates. A district hit also determines the state.
+        """
+        import shapely
+
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        n = len(lons)
+        states: List[Optional[str]] = [None] * n
+        districts: List[Optional[str]] = [None] * n
+        valid = np.flatnonzero(~(np.isnan(lons) | np.isnan(lats)))
+        if not len(valid):
+            return states, districts
+        xs, ys = lons[valid], lats[valid]
+        points = shapely.points(xs, ys)
+
+        levels = self._ensure()
+        state_items, district_items = levels["state"][0], levels["district"][0]
+        for i, g in zip(valid.tolist(), self._match("state", points, xs, ys).tolist()):
+            if g >= 0:
+                states[i] = state_items[g]["state"]
+        for i, g in zip(valid.tolist(), self._match("district", points, xs, ys).tolist()):
+            if g >= 0:
+                districts[i] = district_items[g]["district"]
+                states[i] = district_items[g]["state"]
+        return states, districts
+
+
+# Process-wide index
+boundary_index = BoundaryIndex()
+
+
+def _float(v: Any) -> Optional[float]:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(f) else f
+
+
+def reconcile_location(values: Dict[str, Any], overwrite: bool = False) -> List[str]:
+    """
+    Fill in state / district of a claim dict from its lat/lon when they are missing or "Unknown"
+    (or always, with overwrite=True), and return warnings for values that contradict the
+    coordinates. No-op without coordinates or when the boundary data is unavailable.
+    """
+    lat, lon = _float(values.get("lat")), _float(values.get("lon"))
+    if lat is None or lon is None or not boundary_index.available:
+        return []
+    states, districts = boundary_index.locate([lon], [lat])
+    state, district = states[0], districts[0]
+    warnings: List[str] = []
+    for field, found, canon in (("state", state, canonical_state), ("district", district, canonical_district)):
+        if found is None:
+            continue
+        given = values.get(field)
+        if overwrite or is_unknown(given):
+            values[field] = found
+        elif canon(given).lower() != found.lower():
+            warnings.append(f"{field} '{given}' does not match the coordinates ({found})")
+    return warnings
@@ -0,0 +1,176 @@
+# backend/utils/boundary_layers.py
+"""
+State / district boundary layers for the map, precomputed at a few zoom-dependent
+levels of detail (GET /api/boundaries/{level}.geojson).
+
+The frontend used to bundle the full-resolution GeoJSON files (~590 KB of
+pretty-printed JSON with 15-digit coordinates) and parse them on every load.
+The same polygons (backend/utils/boundaries.load_boundaries) are instead
+served per level ("state" / "district") and per detail tier:
+
+- each tier simplifies with shapely.simplify(preserve_topology=True) at a
+  tolerance of about half a screen pixel at its highest zoom, so no change
+  is visible while that tier is shown;
+- coordinates are snapped to a grid a fraction of that pixel wide
+  (shapely.set_precision keeps the rings valid) and written with only the
+  digits the grid needs, in compact JSON;
+- each body is encoded once with brotli / gzip at maximum compression and
+  kept, with a strong ETag derived from its content.
+
+The files never change while the server runs, so everything is built once
+(`load`, at startup or on first request) and responses are plain lookups.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.boundaries import load_boundaries
+from backend.utils.http_cache import brotli, compress
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("state", "district")
+
+# (highest zoom served by the tier, simplification tolerance in degrees, decimals kept).
+# One Web Mercator pixel is ~1.4 / 2**zoom degrees, so tier 0 (zoom <= 5) may
+# move a vertex by 0.02 deg (~0.45 px) and keeps 0.01 deg (~0.2 px) steps;
+# the last tier only quantizes (~1 m).
+TIERS: List[Tuple[Optional[int], float, int]] = [
+    (5, 0.02, 2),
+    (7, 0.005, 3),
+    (9, 0.0012, 4),
+    (None, 0.0, 5),
+]
+
+
+def tier_for_zoom(zoom: float) -> int:
+    for tier, (max_zoom, _, _) in enumerate(TIERS):
+        if max_zoom is None or zoom <= max_zoom:
+            return tier
+    return len(TIERS) - 1
+
+
+def tier_info() -> List[Dict[str, Any]]:
+    out, min_zoom = [], 0
+    for tier, (max_zoom, tolerance, decimals) in enumerate(TIERS):
+        out.append({"tier": tier, "min_zoom": min_zoom, "max_zoom": max_zoom, "tolerance": tolerance, "decimals": decimals})
+        min_zoom = (max_zoom or 0) + 1
+    return out
+
+
+def _reduce(geoms: np.ndarray, tolerance: float, decimals: int) -> np.ndarray:
+    import shapely
+
+    simplified = shapely.simplify(geoms, tolerance, preserve_topology=True) if tolerance else geoms
+    snapped = shapely.set_precision(simplified, 10.0 ** -decimals)
+    # a polygon narrower than the grid collapses; keep its simplified shape instead
+    snapped = np.where(shapely.is_empty(snapped), simplified, snapped)
+    # grid snapping leaves float noise (77.12000000000001); round for the shortest repr
+    return shapely.transform(snapped, lambda coords: np.round(coords, decimals))
+
+
+def _feature(item: Dict[str, Any], geom) -> Dict[str, Any]:
+    from shapely.geometry import mapping
+
+    return {
+        "type": "Feature",
+        "properties": {
+            "level": item["level"], "name": item["name"], "state": item["state"],
+            "district": item["district"], "code": item["code"],
+        },
+        "geometry": mapping(geom),
+    }
+
+
+class BoundaryLayer:
+    """One (level, tier) body in every supported encoding."""
+
+    def __init__(self, level: str, tier: int, body: bytes, features: int, vertices: int):
+        self.level = level
+        self.tier = tier
+        self.features = features
+        self.vertices = vertices
+        self.etag = hashlib.sha1(body).hexdigest()[:24]
+        self.encoded: Dict[str, bytes] = {"identity": body, "gzip": compress(body, "gzip", best=True)}
+        if brotli is not None:
+            self.encoded["br"] = compress(body, "br", best=True)
+
+    def body(self, encoding: str) -> Tuple[bytes, str]:
+        """(bytes, encoding actually used)."""
+        if encoding in self.encoded:
+            return self.encoded[encoding], encoding
+        return self.encoded["identity"], "identity"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "level": self.level, "tier": self.tier, "features": self.features, "vertices": self.vertices,
+            "etag": self.etag, "bytes": {enc: len(b) for enc, b in self.encoded.items()},
+        }
+
+
+class BoundaryLayers:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._layers: Optional[Dict[Tuple[str, int], BoundaryLayer]] = None
+        self.version: Optional[str] = None
+
+    def load(self) -> int:
+        """Build every (level, tier) layer; returns the number of layers."""
+        import shapely
+
+        started = time.perf_counter()
+        boundaries = load_boundaries()
+        layers: Dict[Tuple[str, int], BoundaryLayer] = {}
+        for level in LEVELS:
+            items = [b for b in boundaries if b["level"] == level]
+            if not items:
+                continue
+            geoms = np.array([b["geometry"] for b in items], dtype=object)
+            for tier, (_, tolerance, decimals) in enumerate(TIERS):
+                reduced = _reduce(geoms, tolerance, decimals)
+                doc = {"type": "FeatureCollection", "features": [_feature(b, g) for b, g in zip(items, reduced)]}
+                body = json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+                layers[(level, tier)] = BoundaryLayer(
+                    level, tier, body, len(items), int(shapely.get_num_coordinates(reduced).sum())
+                )
+        version = hashlib.sha1(",".join(layers[k].etag for k in sorted(layers)).encode()).hexdigest()[:12]
+        with self._lock:
+            self._layers = layers
+            self.version = version
+        logger.info("built %d boundary layers in %.2fs", len(layers), time.perf_counter() - started)
+        return len(layers)
+
+    def _ensure(self) -> Dict[Tuple[str, int], BoundaryLayer]:
+        if self._layers is None:
+            self.load()
+        return self._layers
+
+    @property
+    def available(self) -> bool:
+        try:
+            return bool(self._ensure())
+        except Exception:
+            logger.debug("boundary layers unavailable", exc_info=True)
+            return False
+
+    def get(self, level: str, tier: int) -> Optional[BoundaryLayer]:
+        return self._ensure().get((level, tier))
+
+    def stats(self) -> Dict[str, Any]:
+        layers = self._ensure()
+        return {
+            "version": self.version,
+            "levels": sorted({level for level, _ in layers}),
+            "tiers": tier_info(),
+            "layers": [layers[k].stats() for k in sorted(layers)],
+        }
+
+
+# Process-wide layers
+boundary_layers = BoundaryLayers()
@@ -0,0 +1,120 @@
+# backend/utils/bulk_ops.py
+"""
+Bulk claim operations (status transitions, field updates, deletes) over
+thousands of ids or every row matching a list filter.
+
+Ids are processed in chunks of BULK_CHUNK_SIZE, each chunk in its own
+transaction with bound parameters only (no ids formatted into SQL), which keeps
+every statement under SQLite's host-parameter limit (999 on older builds) and
+keeps write locks short so other writers interleave between chunks.
+`iter_bulk` yields one progress dict per committed chunk; change events are
+published per row after each commit, like the single-row handlers.
+"""
+
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import text
+
+from backend.db import engine, build_claims_where
+from backend.utils import claim_events
+from backend.utils.normalize_claims import typed_claim_columns
+
+logger = logging.getLogger(__name__)
+
+BULK_ACTIONS = ("set_status", "update", "delete")
+BULK_CHUNK_SIZE = 500
+# same column set the PUT /claims/{id} handler accepts
+UPDATABLE_COLUMNS = {"state", "district", "block", "village", "patta_holder", "address", "land_area", "status", "date", "lat", "lon"}
+
+# status values set by the verify / reject shortcuts (see UI_FRA/lib/constants.ts)
+STATUS_VERIFIED = "Verified"
+STATUS_REJECTED = "Rejected"
+
+
+def prepare_updates(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep updatable columns only and add the typed land_area_ha / date_iso columns."""
+    updates = {k: v for k, v in (fields or {}).items() if k in UPDATABLE_COLUMNS}
+    updates.update(typed_claim_columns(updates))
+    return updates
+
+
+async def resolve_claim_ids(ids: Optional[List[int]] = None, filters: Optional[Dict[str, Any]] = None) -> List[int]:
+    """Explicit ids (deduplicated, order kept), or the ids of every claim matching `filters`."""
+    if ids:
+        return list(dict.fromkeys(int(i) for i in ids))
+    where, params = build_claims_where(filters or {})
+    async with engine.connect() as conn:
+        res = await conn.execute(text("SELECT id FROM claims" + where + " ORDER BY id"), params)
+        return [int(r[0]) for r in res.fetchall()]
+
+
+async def iter_bulk(
+    action: str,
+    ids: List[int],
+    updates: Optional[Dict[str, Any]] = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Apply `action` to `ids` chunk by chunk, yielding progress after each committed chunk."""
+    if action not in BULK_ACTIONS:
+        raise ValueError(f"action must be one of {', '.join(BULK_ACTIONS)}")
+    if action != "delete" and not updates:
+        raise ValueError("no updatable fields given")
+    chunk_size = max(1, min(int(chunk_size), BULK_CHUNK_SIZE))
+
+    total = len(ids)
+    processed = 0
+    affected_total = 0
+    set_sql = ", ".join(f"{k} = :u_{k}" for k in (updates or {}))
+    set_params = {f"u_{k}": v for k, v in (updates or {}).items()}
+
+    for n, start in enumerate(range(0, total, chunk_size)):
+        chunk = ids[start:start + chunk_size]
+        params = {f"id{j}": v for j, v in enumerate(chunk)}
+        in_sql = "(" + ", ".join(f":id{j}" for j in range(len(chunk))) + ")"
+
+        async with engine.begin() as conn:
+            res = await conn.execute(text(f"SELECT * FROM claims WHERE id IN {in_sql}"), params)
+            old_rows = {r._mapping["id"]: dict(r._mapping) for r in res.fetchall()}
+            if action == "delete":
+                res = await conn.execute(text(f"DELETE FROM claims WHERE id IN {in_sql}"), params)
+                new_rows: Dict[int, Dict[str, Any]] = {}
+            else:
+                res = await conn.execute(text(f"UPDATE claims SET {set_sql} WHERE id IN {in_sql}"), {**params, **set_params})
+                sel = await conn.execute(text(f"SELECT * FROM claims WHERE id IN {in_sql}"), params)
+                new_rows = {r._mapping["id"]: dict(r._mapping) for r in sel.fetchall()}
+            affected = res.rowcount or 0
+
+        for claim_id, old in old_rows.items():
+            if action == "delete":
+                claim_events.publish("claims", "delete", old=old, record_id=claim_id)
+            else:
+                claim_events.publish("claims", "update", row=new_rows.get(claim_id), old=old)
+
+        processed += len(chunk)
+        affected_total += affected
+        yield {
+            "chunk": n,
+            "chunk_ids": len(chunk),
+            "affected": affected,
+            "missing": len(chunk) - len(old_rows),
+            "processed": processed,
+            "affected_total": affected_total,
+            "total": total,
+        }
+
+
+async def run_bulk(
+    action: str,
+    ids: List[int],
+    updates: Optional[Dict[str, Any]] = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Run iter_bulk to completion and return a summary with the per-chunk progress."""
+    chunks = [p async for p in iter_bulk(action, ids, updates, chunk_size)]
+    return {
+        "action": action,
+        "total": len(ids),
+        "affected": chunks[-1]["affected_total"] if chunks else 0,
+        "chunks": chunks,
+    }
@@ -0,0 +1,181 @@
+# backend/utils/change_log.py
+"""
+Incremental change feed for claims.
+
+Triggers on `claims` append one row per insert/update/delete to `claim_changes`
+(seq is monotonically increasing), so every write path - the API handlers, the
+write coalescer, bulk operations and manual SQL - is captured, including
+deletes as tombstones. Clients keep the last `cursor` they saw and call
+GET /api/claims/changes?since=<cursor> to receive only rows modified since.
+
+Compaction keeps the log bounded:
+- only the latest entry per claim is kept (a client only needs the final state),
+  so the log never holds more than one entry per claim plus recent tombstones;
+- tombstones older than CHANGE_LOG_TOMBSTONE_DAYS are dropped and the highest
+  dropped seq is remembered as `min_cursor`; a client whose cursor is older than
+  that gets `reset: true` and must do a full resync (since=0).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from backend.db import engine, _row_to_dict
+
+logger = logging.getLogger(__name__)
+
+CHANGE_LOG_TOMBSTONE_DAYS = int(os.getenv("CHANGE_LOG_TOMBSTONE_DAYS", "30"))
+# compact after this many writes seen by this process
+CHANGE_LOG_COMPACT_EVERY = int(os.getenv("CHANGE_LOG_COMPACT_EVERY", "5000"))
+# SQLite's default max host parameters is 999 on older builds
+_IN_CHUNK = 500
+
+
+async def init_change_log() -> None:
+    """Create claim_changes, its triggers and meta table; seed it with existing claims once."""
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            """
+            CREATE TABLE IF NOT EXISTS claim_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                claim_id INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TEXT DEFAULT (datetime('now'))
+            )
+            """
+        ))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_claim_changes_claim_id ON claim_changes (claim_id)"))
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS change_log_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        ))
+        await conn.execute(text("INSERT OR IGNORE INTO change_log_meta (key, value) VALUES ('min_cursor', 0)"))
+
+        # seed before the triggers exist so pre-existing claims are visible to since=0
+        seeded = (await conn.execute(text("SELECT value FROM change_log_meta WHERE key = 'seeded'"))).fetchone()
+        if not seeded:
+            await conn.execute(text("INSERT INTO claim_changes (claim_id, op) SELECT id, 'insert' FROM claims ORDER BY id"))
+            await conn.execute(text("INSERT INTO change_log_meta (key, value) VALUES ('seeded', 1)"))
+
+        for op, ref in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+            await conn.execute(text(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_claims_changelog_{op}
+                AFTER {op.upper()} ON claims
+                BEGIN
+                    INSERT INTO claim_changes (claim_id, op) VALUES ({ref}.id, '{op}');
+                END
+                """
+            ))
+
+
+async def get_changes(since: int = 0, limit: int = 1000) -> Dict[str, Any]:
+    """
+    Claims changed after cursor `since`: current rows for inserts/updates and ids for deletes.
+    Returns {"cursor", "changes", "deleted", "has_more", "reset"}.
+    """
+    since = max(0, int(since))
+    limit = max(1, min(int(limit), 10_000))
+    async with engine.connect() as conn:
+        min_cursor = (await conn.execute(text("SELECT value FROM change_log_meta WHERE key = 'min_cursor'"))).scalar() or 0
+        if since and since < min_cursor:
+            # tombstones this client never saw were compacted away
+            latest = (await conn.execute(text("SELECT COALESCE(MAX(seq), 0) FROM claim_changes"))).scalar()
+            return {"cursor": since, "latest": latest, "changes": [], "deleted": [], "has_more": False, "reset": True}
+
+        entries = (await conn.execute(
+            text("SELECT seq, claim_id, op FROM claim_changes WHERE seq > :since ORDER BY seq LIMIT :limit"),
+            {"since": since, "limit": limit},
+        )).fetchall()
+
+        last_op: Dict[int, str] = {}
+        for _, claim_id, op in entries:
+            last_op[claim_id] = op
+        upsert_ids = [cid for cid, op in last_op.items() if op != "delete"]
+
+        rows: List[Dict[str, Any]] = []
+        for i in range(0, len(upsert_ids), _IN_CHUNK):
+            chunk = upsert_ids[i:i + _IN_CHUNK]
+            params = {f"id{j}": cid for j, cid in enumerate(chunk)}
+            placeholders = ", ".join(f":id{j}" for j in range(len(chunk)))
+            res = await conn.execute(text(f"SELECT * FROM claims WHERE id IN ({placeholders})"), params)
+            rows.extend(_row_to_dict(r) for r in res.fetchall())
+
+    found = {r["id"] for r in rows}
+    # rows gone by now were deleted after this page; report them as tombstones too
+    deleted = [cid for cid, op in last_op.items() if op == "delete" or cid not in found]
+    return {
+        "cursor": entries[-1][0] if entries else since,
+        "changes": rows,
+        "deleted": deleted,
+        "has_more": len(entries) == limit,
+        "reset": False,
+    }
+
+
+async def latest_seq() -> int:
+    """Highest seq in the log (0 when empty): the cursor of a reader that has seen everything."""
+    async with engine.connect() as conn:
+        return int((await conn.execute(text("SELECT COALESCE(MAX(seq), 0) FROM claim_changes"))).scalar() or 0)
+
+
+async def compact_change_log(tombstone_days: int = CHANGE_LOG_TOMBSTONE_DAYS) -> Dict[str, int]:
+    """Drop superseded entries and expired tombstones; returns counts."""
+    async with engine.begin() as conn:
+        superseded = await conn.execute(text(
+            """
+            DELETE FROM claim_changes
+            WHERE seq NOT IN (SELECT MAX(seq) FROM claim_changes GROUP BY claim_id)
+            """
+        ))
+        cutoff = f"-{int(tombstone_days)} days"
+        expired_max = (await conn.execute(
+            text("SELECT MAX(seq) FROM claim_changes WHERE op = 'delete' AND changed_at < datetime('now', :cutoff)"),
+            {"cutoff": cutoff},
+        )).scalar()
+        expired = 0
+        if expired_max:
+            res = await conn.execute(
+                text("DELETE FROM claim_changes WHERE op = 'delete' AND seq <= :max_seq"), {"max_seq": expired_max}
+            )
+            expired = res.rowcount or 0
+            await conn.execute(
+                text("UPDATE change_log_meta SET value = MAX(value, :max_seq) WHERE key = 'min_cursor'"),
+                {"max_seq": expired_max},
+            )
+    return {"superseded": superseded.rowcount or 0, "tombstones_expired": expired}
+
+
+# ----------------------------
+# Periodic compaction driven by write events
+# ----------------------------
+_writes_since_compaction = 0
+_compaction_task: Optional[asyncio.Task] = None
+
+
+async def _run_compaction() -> None:
+    try:
+        result = await compact_change_log()
+        logger.info("claim change log compacted: %s", result)
+    except Exception:
+        logger.exception("claim change log compaction failed")
+
+
+def on_change(event: Dict[str, Any]) -> None:
+    """claim_events listener: schedule a compaction every CHANGE_LOG_COMPACT_EVERY claim writes."""
+    global _writes_since_compaction, _compaction_task
+    if event.get("table") != "claims":
+        return
+    _writes_since_compaction += 1
+    if _writes_since_compaction < CHANGE_LOG_COMPACT_EVERY:
+        return
+    if _compaction_task is not None and not _compaction_task.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _writes_since_compaction = 0
+    _compaction_task = loop.create_task(_run_compaction())
@@ -0,0 +1,206 @@
+# backend/utils/claim_clusters.py
+"""
+Zoom-aware grid clustering of claims for the map.
+
+At every zoom level the world is cut into square cells of CLUSTER_CELL_PX
+screen pixels (Web Mercator, see geo_grid.py); all claims in a cell form one
+cluster positioned at their centroid, with a count and a per-status breakdown.
+
+- Zooms 0..CLUSTER_INDEX_MAX_ZOOM are precomputed once from the columnar
+  claims snapshot (vectorized) and kept current from claim change events: an
+  insert adds the point to one cell per level, a delete subtracts it, an update
+  does both. Cost per change is O(levels), independent of the number of claims.
+- Higher zooms show small areas, so they are aggregated on the fly from the
+  snapshot for the requested bbox only.
+- Single-claim clusters carry the claim id on both paths; the precomputed cells
+  keep the sum of their claim ids, which is that id whenever the count is 1.
+- Requests with state / district / status filters also use the on-the-fly path
+  (the precomputed levels are unfiltered).
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.geo_grid import (
+    bbox_to_world,
+    cell_keys,
+    cell_size,
+    cells_per_axis,
+    lonlat_to_world,
+    world_to_lonlat,
+)
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_CELL_PX = 60
+CLUSTER_INDEX_MAX_ZOOM = 10
+CLUSTER_MAX_ZOOM = 22
+
+
+def _aggregate(x: np.ndarray, y: np.ndarray, status_codes: np.ndarray, statuses: List[str], size: float, axis: int, ids: np.ndarray):
+    """Group points by cell: returns (keys, counts, sum_x, sum_y, status matrix [cell, code+1], sum of ids)."""
+    keys = cell_keys(x, y, size, axis)
+    uniq, inv = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inv, minlength=len(uniq))
+    sx = np.bincount(inv, weights=x, minlength=len(uniq))
+    sy = np.bincount(inv, weights=y, minlength=len(uniq))
+    width = len(statuses) + 1
+    st = np.bincount(inv * width + (status_codes + 1), minlength=len(uniq) * width).reshape(len(uniq), width)
+    # float sums of integer ids are exact below 2**53
+    id_sums = np.bincount(inv, weights=ids.astype(np.float64), minlength=len(uniq)).astype(np.int64)
+    return uniq, counts, sx, sy, st, id_sums
+
+
+def _status_dict(row: List[int], statuses: List[str]) -> Dict[str, int]:
+    return {(statuses[c - 1] if c else "Unknown"): v for c, v in enumerate(row) if v}
+
+
+def _cluster(count: int, sx: float, sy: float, by_status: Dict[str, int], id_sum: int) -> Dict[str, Any]:
+    lon, lat = world_to_lonlat(sx / count, sy / count)
+    out = {"lat": round(float(lat), 6), "lon": round(float(lon), 6), "count": int(count), "by_status": by_status}
+    if count == 1:
+        out["id"] = int(id_sum)
+    return out
+
+
+class ClusterIndex:
+    def __init__(self, cell_px: float = CLUSTER_CELL_PX, max_zoom: int = CLUSTER_INDEX_MAX_ZOOM):
+        self.cell_px = cell_px
+        self.max_zoom = max_zoom
+        self._lock = threading.Lock()
+        # per zoom: cell key -> [count, sum_x, sum_y, {status: count}, sum of claim ids]
+        self.levels: List[Dict[int, list]] = []
+        self.loaded = False
+
+    # ---- build / incremental maintenance ----
+    def build(self, snap) -> int:
+        """(Re)build the precomputed levels from a loaded ClaimsSnapshot. Returns the number of points."""
+        with snap._lock:
+            n = snap.n
+            m = snap.mask(with_coords=True)
+            ids = snap.ids[:n][m]
+            lat = snap.floats["lat"][:n][m]
+            lon = snap.floats["lon"][:n][m]
+            codes = snap.codes["status"][:n][m]
+            statuses = list(snap.dicts["status"].values)
+        x, y = lonlat_to_world(lon, lat)
+
+        levels: List[Dict[int, list]] = []
+        for z in range(self.max_zoom + 1):
+            size, axis = cell_size(z, self.cell_px), cells_per_axis(z, self.cell_px)
+            keys, counts, sx, sy, st, id_sums = _aggregate(x, y, codes, statuses, size, axis, ids)
+            level: Dict[int, list] = {}
+            for k, c, a, b, row, i in zip(keys.tolist(), counts.tolist(), sx.tolist(), sy.tolist(), st.tolist(), id_sums.tolist()):
+                level[k] = [c, a, b, _status_dict(row, statuses), i]
+            levels.append(level)
+        with self._lock:
+            self.levels = levels
+            self.loaded = True
+        return int(len(x))
+
+    def _apply(self, row: Optional[Dict[str, Any]], sign: int) -> None:
+        if not row:
+            return
+        try:
+            lat, lon = float(row.get("lat")), float(row.get("lon"))
+        except (TypeError, ValueError):
+            return
+        x, y = lonlat_to_world(lon, lat)
+        x, y = float(x), float(y)
+        status = row.get("status") or "Unknown"
+        claim_id = int(row.get("id") or 0)
+        for z, level in enumerate(self.levels):
+            size, axis = cell_size(z, self.cell_px), cells_per_axis(z, self.cell_px)
+            key = min(int(x / size), axis - 1) * axis + min(int(y / size), axis - 1)
+            entry = level.get(key)
+            if entry is None:
+                if sign < 0:
+                    continue
+                entry = level[key] = [0, 0.0, 0.0, {}, 0]
+            entry[0] += sign
+            entry[1] += sign * x
+            entry[2] += sign * y
+            entry[4] += sign * claim_id
+            entry[3][status] = entry[3].get(status, 0) + sign
+            if entry[3][status] <= 0:
+                del entry[3][status]
+            if entry[0] <= 0:
+                del level[key]
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """claim_events listener: move the changed claim between cells."""
+        if event.get("table") != "claims" or not self.loaded:
+            return
+        with self._lock:
+            self._apply(event.get("old"), -1)
+            if event.get("op") != "delete":
+                self._apply(event.get("row"), +1)
+
+    # ---- queries ----
+    def clusters(
+        self,
+        snap,
+        zoom: int,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """Clusters intersecting bbox at zoom; filters (state, district, status) force the on-the-fly path."""
+        zoom = max(0, min(int(zoom), CLUSTER_MAX_ZOOM))
+        filters = {k: v for k, v in filters.items() if v}
+        if self.loaded and zoom <= self.max_zoom and not filters:
+            out = self._from_index(zoom, bbox)
+            source = "index"
+        else:
+            out = self._from_snapshot(snap, zoom, bbox, filters)
+            source = "snapshot"
+        return {"zoom": zoom, "source": source, "total": sum(c["count"] for c in out), "clusters": out}
+
+    def _from_index(self, zoom: int, bbox) -> List[Dict[str, Any]]:
+        size, axis = cell_size(zoom, self.cell_px), cells_per_axis(zoom, self.cell_px)
+        if bbox:
+            x0, y0, x1, y1 = bbox_to_world(bbox)
+        else:
+            x0, y0, x1, y1 = 0.0, 0.0, 1.0, 1.0
+        cx0, cy0 = int(x0 / size), int(y0 / size)
+        cx1, cy1 = min(int(x1 / size), axis - 1), min(int(y1 / size), axis - 1)
+        out = []
+        with self._lock:
+            level = self.levels[zoom]
+            if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) < len(level):
+                for cx in range(cx0, cx1 + 1):
+                    for cy in range(cy0, cy1 + 1):
+                        e = level.get(cx * axis + cy)
+                        if e is not None:
+                            out.append(_cluster(e[0], e[1], e[2], dict(e[3]), e[4]))
+            else:
+                for key, e in level.items():
+                    cx, cy = divmod(key, axis)
+                    if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                        out.append(_cluster(e[0], e[1], e[2], dict(e[3]), e[4]))
+        return out
+
+    def _from_snapshot(self, snap, zoom: int, bbox, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with snap._lock:
+            m = snap.mask(with_coords=True, bbox=bbox, **filters)
+            idx = np.flatnonzero(m)
+            ids = snap.ids[idx]
+            lat = snap.floats["lat"][idx]
+            lon = snap.floats["lon"][idx]
+            codes = snap.codes["status"][idx]
+            statuses = list(snap.dicts["status"].values)
+        if not len(idx):
+            return []
+        x, y = lonlat_to_world(lon, lat)
+        size, axis = cell_size(zoom, self.cell_px), cells_per_axis(zoom, self.cell_px)
+        _, counts, sx, sy, st, id_sums = _aggregate(x, y, codes, statuses, size, axis, ids)
+        return [
+            _cluster(c, a, b, _status_dict(row, statuses), i)
+            for c, a, b, row, i in zip(counts.tolist(), sx.tolist(), sy.tolist(), st.tolist(), id_sums.tolist())
+        ]
+
+
+# Process-wide index used by /api/claims/clusters
+cluster_index = ClusterIndex()
@@ -0,0 +1,65 @@
+# backend/utils/claim_events.py
+"""
+In-process change notifications for the claims and villages tables.
+
+Every write path (insert_claim, the PUT update handler, the delete handlers,
+insert_village) calls `publish(...)` after its transaction commits. Read-side
+structures that keep derived state in memory (the columnar snapshot, caches,
+live push, ...) `subscribe` a callback and update themselves incrementally
+instead of re-reading SQLite.
+
+An event is a plain dict:
+    {
+      "table": "claims" | "villages",
+      "op": "insert" | "update" | "delete",
+      "id": int,
+      "row": dict | None,   # row after the change (None for deletes)
+      "old": dict | None,   # row before the change (None for inserts)
+    }
+
+Listeners run synchronously in the publisher's thread (the event loop for all
+request handlers), so they must be quick; a failing listener is logged and
+never breaks the write.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Listener = Callable[[Dict[str, Any]], None]
+
+_listeners: List[Listener] = []
+
+
+def subscribe(listener: Listener) -> Listener:
+    """Register a listener (idempotent). Returns it so it can be used as a decorator."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+    return listener
+
+
+def unsubscribe(listener: Listener) -> None:
+    try:
+        _listeners.remove(listener)
+    except ValueError:
+        pass
+
+
+def publish(
+    table: str,
+    op: str,
+    row: Optional[Dict[str, Any]] = None,
+    old: Optional[Dict[str, Any]] = None,
+    record_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Notify all listeners of one committed change and return the event."""
+    if record_id is None:
+        record_id = (row or old or {}).get("id")
+    event = {"table": table, "op": op, "id": record_id, "row": row, "old": old}
+    for listener in list(_listeners):
+        try:
+            listener(event)
+        except Exception:
+            logger.exception("claim event listener %r failed for %s %s id=%s", listener, table, op, record_id)
+    return event
@@ -0,0 +1,348 @@
+# backend/utils/claim_heatmap.py
+"""
+Claim-density heatmap grids for the map, split by status.
+
+At zoom z the world is cut into square cells of HEATMAP_CELL_PX screen pixels
+(Web Mercator, see geo_grid.py) and every cell carries one claim count per
+status. Counts are 2-D histograms over integer cell indices, computed with a
+single np.bincount on the flattened (cell x, cell y, status) index (the same
+result as np.histogram2d on lattice-aligned edges, ~15x faster).
+
+- Zooms 0..HEATMAP_INDEX_MAX_ZOOM are kept as dense count arrays over a window
+  around the data. The finest indexed level is histogrammed once from the
+  columnar claims snapshot; every coarser level is its 2x2 block sum (cells
+  nest exactly across zooms). Claim change events add / subtract the claim in
+  one cell per level, growing a level's window when a claim lands outside it.
+  A level whose window would exceed HEATMAP_WINDOW_MAX_CELLS (claims spread
+  over a large part of the world) is dropped and served like a high zoom.
+- Higher zooms show small areas and are histogrammed on the fly from the
+  snapshot for the requested bbox only, as are state / district filtered
+  requests (a status filter is a slice of the precomputed levels).
+
+Responses are dense row-major grids (north to south, west to east) capped at
+HEATMAP_MAX_CELLS cells.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.geo_grid import (
+    bbox_to_world,
+    cell_size,
+    cells_per_axis,
+    lonlat_to_world,
+    world_to_lonlat,
+)
+
+logger = logging.getLogger(__name__)
+
+HEATMAP_CELL_PX = 16
+HEATMAP_INDEX_MAX_ZOOM = 9
+HEATMAP_MAX_ZOOM = 22
+# largest grid returned by one request (e.g. 256 x 256 cells = a 4096px viewport)
+HEATMAP_MAX_CELLS = 65536
+# largest window (cells) kept for one precomputed level
+HEATMAP_WINDOW_MAX_CELLS = 4_000_000
+
+
+def _status_layers(values: List[Optional[str]]) -> Tuple[List[str], np.ndarray]:
+    """Layer names and a lookup from snapshot status code + 1 (0 = no status) to layer index."""
+    names: List[str] = []
+    index: Dict[str, int] = {}
+
+    def layer(name: str) -> int:
+        if name not in index:
+            index[name] = len(names)
+            names.append(name)
+        return index[name]
+
+    lookup = [layer("Unknown")] + [layer(v or "Unknown") for v in values]
+    return names, np.asarray(lookup, dtype=np.int64)
+
+
+def _cells(x: np.ndarray, y: np.ndarray, size: float, axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    return (
+        np.minimum((x / size).astype(np.int64), axis - 1),
+        np.minimum((y / size).astype(np.int64), axis - 1),
+    )
+
+
+def _histogram(cx: np.ndarray, cy: np.ndarray, layers: np.ndarray, origin: Tuple[int, int], shape: Tuple[int, int, int]) -> np.ndarray:
+    """Counts [w, h, statuses] of the points in the window at `origin`; points outside are ignored."""
+    w, h, s = shape
+    ix, iy = cx - origin[0], cy - origin[1]
+    keep = (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+    flat = (ix[keep] * h + iy[keep]) * s + layers[keep]
+    return np.bincount(flat, minlength=w * h * s).reshape(w, h, s).astype(np.int32)
+
+
+class _Level:
+    """Dense counts [w, h, statuses] for the cells [ox, ox + w) x [oy, oy + h) of one zoom."""
+
+    def __init__(self, ox: int, oy: int, grid: np.ndarray):
+        self.ox = ox
+        self.oy = oy
+        self.grid = grid
+
+    @property
+    def cells(self) -> int:
+        return self.grid.shape[0] * self.grid.shape[1]
+
+    def coarsen(self) -> "_Level":
+        """The next lower zoom: 2x2 block sums (origin and size padded to even cell indices)."""
+        w, h, s = self.grid.shape
+        px, py = self.ox & 1, self.oy & 1
+        grid = np.pad(self.grid, ((px, (w + px) & 1), (py, (h + py) & 1), (0, 0)))
+        grid = grid.reshape(grid.shape[0] // 2, 2, grid.shape[1] // 2, 2, s).sum(axis=(1, 3), dtype=np.int32)
+        return _Level((self.ox - px) // 2, (self.oy - py) // 2, grid)
+
+    def grown(self, cx: int, cy: int, statuses: int, axis: int) -> Tuple[int, int, int, int, int]:
+        """Padding (left, right, top, bottom, extra statuses) needed to hold cell (cx, cy)."""
+        w, h, s = self.grid.shape
+        margin = max(8, max(w, h) // 4)  # amortize repeated growth
+        left = max(0, self.ox - cx + margin) if cx < self.ox else 0
+        right = max(0, cx - (self.ox + w - 1) + margin) if cx >= self.ox + w else 0
+        top = max(0, self.oy - cy + margin) if cy < self.oy else 0
+        bottom = max(0, cy - (self.oy + h - 1) + margin) if cy >= self.oy + h else 0
+        # never beyond the world
+        left, top = min(left, self.ox), min(top, self.oy)
+        right, bottom = min(right, axis - self.ox - w), min(bottom, axis - self.oy - h)
+        return left, right, top, bottom, max(0, statuses - s)
+
+    def window(self, cx0: int, cy0: int, cx1: int, cy1: int) -> np.ndarray:
+        """Counts for cells [cx0, cx1] x [cy0, cy1] (zeros outside the stored window)."""
+        out = np.zeros((cx1 - cx0 + 1, cy1 - cy0 + 1, self.grid.shape[2]), dtype=np.int32)
+        w, h, _ = self.grid.shape
+        ax0, ay0 = max(cx0, self.ox), max(cy0, self.oy)
+        ax1, ay1 = min(cx1, self.ox + w - 1), min(cy1, self.oy + h - 1)
+        if ax0 <= ax1 and ay0 <= ay1:
+            out[ax0 - cx0:ax1 - cx0 + 1, ay0 - cy0:ay1 - cy0 + 1] = self.grid[
+                ax0 - self.ox:ax1 - self.ox + 1, ay0 - self.oy:ay1 - self.oy + 1
+            ]
+        return out
+
+
+def _payload(
+    grid: np.ndarray, statuses: List[str], cx0: int, cy0: int, size: float, zoom: int, cell_px: float, source: str
+) -> Dict[str, Any]:
+    w, h, _ = grid.shape
+    min_lon, max_lat = world_to_lonlat(cx0 * size, cy0 * size)
+    max_lon, min_lat = world_to_lonlat((cx0 + w) * size, (cy0 + h) * size)
+    totals = grid.sum(axis=(0, 1))
+    # row-major, north to south (world y grows southwards)
+    grids = {statuses[s]: grid[:, :, s].T.ravel().tolist() for s in range(len(statuses)) if totals[s]}
+    return {
+        "zoom": zoom,
+        "source": source,
+        "cell_px": cell_px,
+        "width": int(w),
+        "height": int(h),
+        "bbox": [round(float(v), 6) for v in (min_lon, min_lat, max_lon, max_lat)],
+        "total": int(totals.sum()),
+        "max": int(grid.sum(axis=2).max()) if grid.size else 0,
+        "grids": grids,
+    }
+
+
+class HeatmapIndex:
+    def __init__(self, cell_px: float = HEATMAP_CELL_PX, max_zoom: int = HEATMAP_INDEX_MAX_ZOOM):
+        self.cell_px = cell_px
+        self.max_zoom = max_zoom
+        self._lock = threading.Lock()
+        # per zoom 0..top: dense window of counts
+        self.levels: List[_Level] = []
+        self.statuses: List[str] = []
+        self._status_index: Dict[str, int] = {}
+        self.loaded = False
+
+    @property
+    def top(self) -> int:
+        """Highest precomputed zoom (-1 when none)."""
+        return len(self.levels) - 1
+
+    # ---- build / incremental maintenance ----
+    def build(self, snap) -> int:
+        """(Re)build the precomputed levels from a loaded ClaimsSnapshot. Returns the number of points."""
+        with snap._lock:
+            n = snap.n
+            m = snap.mask(with_coords=True)
+            lat = snap.floats["lat"][:n][m]
+            lon = snap.floats["lon"][:n][m]
+            codes = snap.codes["status"][:n][m]
+            statuses, lookup = _status_layers(list(snap.dicts["status"].values))
+        x, y = lonlat_to_world(lon, lat)
+        layers = lookup[codes + 1]
+
+        # finest zoom whose data window fits the budget; coarser levels are block sums of it
+        top, level = -1, None
+        for z in range(self.max_zoom, -1, -1):
+            size, axis = cell_size(z, self.cell_px), cells_per_axis(z, self.cell_px)
+            if not len(x):
+                level = _Level(0, 0, np.zeros((0, 0, len(statuses)), dtype=np.int32))
+            else:
+                cx, cy = _cells(x, y, size, axis)
+                origin = (int(cx.min()), int(cy.min()))
+                shape = (int(cx.max()) - origin[0] + 1, int(cy.max()) - origin[1] + 1, len(statuses))
+                if shape[0] * shape[1] > HEATMAP_WINDOW_MAX_CELLS:
+                    continue
+                level = _Level(origin[0], origin[1], _histogram(cx, cy, layers, origin, shape))
+            top = z
+            break
+        levels: List[_Level] = []
+        if level is not None:
+            levels = [level]
+            for _ in range(top):
+                levels.append(levels[-1].coarsen())
+            levels.reverse()
+        with self._lock:
+            self.levels = levels
+            self.statuses = statuses
+            self._status_index = {name: i for i, name in enumerate(statuses)}
+            self.loaded = True
+        return int(len(x))
+
+    def _layer(self, status: str) -> int:
+        idx = self._status_index.get(status)
+        if idx is None:
+            idx = self._status_index[status] = len(self.statuses)
+            self.statuses.append(status)
+        return idx
+
+    def _apply(self, row: Optional[Dict[str, Any]], sign: int) -> None:
+        if not row:
+            return
+        try:
+            lat, lon = float(row.get("lat")), float(row.get("lon"))
+        except (TypeError, ValueError):
+            return
+        if np.isnan(lat) or np.isnan(lon):
+            return
+        x, y = lonlat_to_world(lon, lat)
+        x, y = float(x), float(y)
+        s = self._layer(row.get("status") or "Unknown")
+        for z, level in enumerate(self.levels):
+            size, axis = cell_size(z, self.cell_px), cells_per_axis(z, self.cell_px)
+            cx, cy = min(int(x / size), axis - 1), min(int(y / size), axis - 1)
+            w, h, _ = level.grid.shape
+            inside = level.ox <= cx < level.ox + w and level.oy <= cy < level.oy + h
+            if not inside or s >= level.grid.shape[2]:
+                if sign < 0:  # was never counted here
+                    continue
+                if not self._grow(z, cx, cy, axis):
+                    # too large to keep: this and every finer level fall back to the snapshot
+                    del self.levels[z:]
+                    logger.info("heatmap window too large at zoom %d; indexing zooms 0..%d", z, z - 1)
+                    return
+                level = self.levels[z]
+            level.grid[cx - level.ox, cy - level.oy, s] += sign
+
+    def _grow(self, z: int, cx: int, cy: int, axis: int) -> bool:
+        level = self.levels[z]
+        if not level.cells:  # first claim with coordinates
+            grid = np.zeros((1, 1, len(self.statuses)), dtype=np.int32)
+            self.levels[z] = _Level(cx, cy, grid)
+            return True
+        left, right, top, bottom, extra = level.grown(cx, cy, len(self.statuses), axis)
+        w, h, _ = level.grid.shape
+        if (w + left + right) * (h + top + bottom) > HEATMAP_WINDOW_MAX_CELLS:
+            return False
+        grid = np.pad(level.grid, ((left, right), (top, bottom), (0, extra)))
+        self.levels[z] = _Level(level.ox - left, level.oy - top, grid)
+        return True
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """claim_events listener: move the changed claim between cells."""
+        if event.get("table") != "claims" or not self.loaded:
+            return
+        with self._lock:
+            self._apply(event.get("old"), -1)
+            if event.get("op") != "delete":
+                self._apply(event.get("row"), +1)
+
+    # ---- queries ----
+    def heatmap(
+        self,
+        snap,
+        zoom: int,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """
+        Density grid over bbox (default: the extent of the matching claims) at zoom.
+        state / district filters force the on-the-fly path. Raises ValueError when the
+        grid would exceed HEATMAP_MAX_CELLS.
+        """
+        zoom = max(0, min(int(zoom), HEATMAP_MAX_ZOOM))
+        filters = {k: v for k, v in filters.items() if v}
+        size, axis = cell_size(zoom, self.cell_px), cells_per_axis(zoom, self.cell_px)
+        cell_range = None
+        if bbox:
+            x0, y0, x1, y1 = bbox_to_world(bbox)
+            cell_range = (int(x0 / size), int(y0 / size), min(int(x1 / size), axis - 1), min(int(y1 / size), axis - 1))
+            self._check_size(cell_range)
+
+        grid = None
+        with self._lock:
+            if self.loaded and zoom <= self.top and set(filters) <= {"status"}:
+                level = self.levels[zoom]
+                statuses = list(self.statuses)
+                status_layer = self._status_index.get(filters.get("status"), -1)
+                if cell_range is None:
+                    # the stored window is padded and never shrinks: fit the nonzero cells instead
+                    if not filters.get("status"):
+                        counts = level.grid.sum(axis=2)
+                    elif status_layer >= 0:
+                        counts = level.grid[:, :, status_layer]
+                    else:
+                        counts = np.zeros((0, 0), dtype=np.int32)
+                    xs, ys = np.flatnonzero(counts.any(axis=1)), np.flatnonzero(counts.any(axis=0))
+                    if not len(xs):
+                        empty = np.zeros((0, 0, len(statuses)), dtype=np.int32)
+                        return _payload(empty, statuses, 0, 0, size, zoom, self.cell_px, "index")
+                    cell_range = (level.ox + int(xs[0]), level.oy + int(ys[0]), level.ox + int(xs[-1]), level.oy + int(ys[-1]))
+                    self._check_size(cell_range)
+                grid = level.window(*cell_range)
+        if grid is None:
+            return self._from_snapshot(snap, zoom, size, axis, cell_range, filters)
+        if filters.get("status"):
+            keep = np.arange(grid.shape[2]) == status_layer
+            grid = grid * keep
+        return _payload(grid, statuses, cell_range[0], cell_range[1], size, zoom, self.cell_px, "index")
+
+    def _check_size(self, cell_range: Tuple[int, int, int, int]) -> None:
+        cx0, cy0, cx1, cy1 = cell_range
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > HEATMAP_MAX_CELLS:
+            raise ValueError(f"heatmap grid would exceed {HEATMAP_MAX_CELLS} cells; use a smaller bbox or a lower zoom")
+
+    def _from_snapshot(self, snap, zoom: int, size: float, axis: int, cell_range, filters: Dict[str, Any]) -> Dict[str, Any]:
+        mask_bbox = None
+        if cell_range is not None:
+            # whole cells, so edge cells count the claims just outside the requested bbox too
+            cx0, cy0, cx1, cy1 = cell_range
+            min_lon, max_lat = world_to_lonlat(cx0 * size, cy0 * size)
+            max_lon, min_lat = world_to_lonlat((cx1 + 1) * size, (cy1 + 1) * size)
+            mask_bbox = (float(min_lon), float(min_lat), float(max_lon), float(max_lat))
+        with snap._lock:
+            m = snap.mask(with_coords=True, bbox=mask_bbox, **filters)
+            idx = np.flatnonzero(m)
+            lat = snap.floats["lat"][idx]
+            lon = snap.floats["lon"][idx]
+            codes = snap.codes["status"][idx]
+            statuses, lookup = _status_layers(list(snap.dicts["status"].values))
+        x, y = lonlat_to_world(lon, lat)
+        cx, cy = _cells(x, y, size, axis)
+        if cell_range is None:
+            if not len(idx):
+                return _payload(np.zeros((0, 0, len(statuses)), dtype=np.int32), statuses, 0, 0, size, zoom, self.cell_px, "snapshot")
+            cell_range = (int(cx.min()), int(cy.min()), int(cx.max()), int(cy.max()))
+            self._check_size(cell_range)
+        cx0, cy0, cx1, cy1 = cell_range
+        grid = _histogram(cx, cy, lookup[codes + 1], (cx0, cy0), (cx1 - cx0 + 1, cy1 - cy0 + 1, len(statuses)))
+        return _payload(grid, statuses, cx0, cy0, size, zoom, self.cell_px, "snapshot")
+
+
+# Process-wide index used by /api/claims/heatmap
+heatmap_index = HeatmapIndex()
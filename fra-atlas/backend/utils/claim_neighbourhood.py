@@ -0,0 +1,218 @@
+# backend/utils/claim_neighbourhood.py
+"""
+Claim counts around a point (total and pending within a radius), for the
+pendingClaimRatio diagnostics metric.
+
+Claims are binned into lat/lon grid cells at a few resolutions
+(NEIGHBOURHOOD_CELL_DEG, ~140 m to ~35 km) with a cached total / pending
+count per occupied cell, so a query never touches individual claims:
+
+- a query picks the finest resolution at which the radius' bounding box spans
+  at most NEIGHBOURHOOD_MAX_CELLS cells (so the cells stay small against the
+  radius), keeps the cells whose centre lies within the radius (great-circle
+  distance, vectorized), and sums their counts;
+- per resolution the counts live in sorted NumPy arrays (cell key, total,
+  pending) looked up with one searchsorted, built vectorized from the columnar
+  claims snapshot;
+- claim change events go to a small per-resolution delta dict that queries
+  add on top; it is merged into the arrays once it exceeds _MAX_DELTA cells.
+
+Cells are counted whole, so claims up to half a cell diagonal beyond the
+radius may be included (and as many inside it left out); with the cell
+size chosen against the radius that is a few percent of the area.
+"""
+
+import logging
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.village_knn import chord_to_km, to_unit
+
+logger = logging.getLogger(__name__)
+
+NEIGHBOURHOOD_CELL_DEG = (0.00125, 0.005, 0.02, 0.08, 0.32)
+NEIGHBOURHOOD_MAX_CELLS = 4096
+# default radius of the pendingClaimRatio metric
+PENDING_RATIO_RADIUS_KM = float(os.getenv("PENDING_RATIO_RADIUS_KM", "5"))
+# ratio reported where there are no claims to measure
+DEFAULT_PENDING_RATIO = 0.5
+# status values counted as pending (compared lower-cased)
+PENDING_STATUSES = ("pending",)
+
+_KM_PER_DEG_LAT = 111.195
+_MAX_DELTA = 1024
+
+
+def _is_pending(status: Any) -> bool:
+    return str(status or "").strip().lower() in PENDING_STATUSES
+
+
+class _Grid:
+    """Occupied cells of one resolution: sorted keys with total / pending counts, plus pending changes."""
+
+    def __init__(self, deg: float):
+        self.deg = deg
+        self.rows = int(math.ceil(180.0 / deg)) + 1
+        self.keys = np.empty(0, dtype=np.int64)
+        self.total = np.empty(0, dtype=np.int64)
+        self.pending = np.empty(0, dtype=np.int64)
+        self.delta: Dict[int, List[int]] = {}
+
+    def cell(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        ix = np.floor((np.asarray(lon, dtype=np.float64) + 180.0) / self.deg).astype(np.int64)
+        iy = np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / self.deg).astype(np.int64)
+        return ix, np.clip(iy, 0, self.rows - 1)
+
+    def key(self, lat: float, lon: float) -> int:
+        iy = min(max(math.floor((lat + 90.0) / self.deg), 0), self.rows - 1)
+        return math.floor((lon + 180.0) / self.deg) * self.rows + iy
+
+    def fill(self, keys: np.ndarray, pending: np.ndarray) -> None:
+        self.keys, inv = np.unique(keys, return_inverse=True)
+        self.total = np.bincount(inv, minlength=len(self.keys)).astype(np.int64)
+        self.pending = np.bincount(inv, weights=pending, minlength=len(self.keys)).astype(np.int64)
+        self.delta = {}
+
+    def add(self, key: int, total: int, pending: int) -> None:
+        d = self.delta.setdefault(key, [0, 0])
+        d[0] += total
+        d[1] += pending
+        if len(self.delta) > _MAX_DELTA:
+            self.merge()
+
+    def merge(self) -> None:
+        """Fold the delta into the arrays: in-place adds for known cells, one sorted insert for new ones."""
+        if not self.delta:
+            return
+        dk = np.fromiter(self.delta.keys(), dtype=np.int64, count=len(self.delta))
+        dv = np.array(list(self.delta.values()), dtype=np.int64).reshape(-1, 2)
+        order = np.argsort(dk)
+        dk, dv = dk[order], dv[order]
+        self.delta = {}
+        idx = np.searchsorted(self.keys, dk)
+        found = np.zeros(len(dk), dtype=bool)
+        if len(self.keys):
+            found = self.keys[np.minimum(idx, len(self.keys) - 1)] == dk
+        self.total[idx[found]] += dv[found, 0]
+        self.pending[idx[found]] += dv[found, 1]
+        new = ~found & (dv[:, 0] > 0)
+        if new.any():
+            self.keys = np.insert(self.keys, idx[new], dk[new])
+            self.total = np.insert(self.total, idx[new], dv[new, 0])
+            self.pending = np.insert(self.pending, idx[new], dv[new, 1])
+        empty = self.total <= 0
+        if empty.any():
+            keep = ~empty
+            self.keys, self.total, self.pending = self.keys[keep], self.total[keep], self.pending[keep]
+
+    def sums(self, cand: np.ndarray) -> Tuple[int, int]:
+        """Summed (total, pending) over the cell keys `cand`."""
+        total = pending = 0
+        if len(self.keys) and len(cand):
+            idx = np.minimum(np.searchsorted(self.keys, cand), len(self.keys) - 1)
+            hit = idx[self.keys[idx] == cand]
+            total, pending = int(self.total[hit].sum()), int(self.pending[hit].sum())
+        if self.delta:
+            wanted = set(cand.tolist())
+            for key, (t, p) in self.delta.items():
+                if key in wanted:
+                    total += t
+                    pending += p
+        return total, pending
+
+
+class NeighbourhoodIndex:
+    def __init__(self, cell_degs: Tuple[float, ...] = NEIGHBOURHOOD_CELL_DEG):
+        self._lock = threading.Lock()
+        self.grids = [_Grid(d) for d in cell_degs]
+        self.loaded = False
+
+    # ---- build / incremental maintenance ----
+    def build(self, snap) -> int:
+        """(Re)build the cell counts from a loaded ClaimsSnapshot. Returns the number of claims counted."""
+        with snap._lock:
+            n = snap.n
+            m = snap.mask(with_coords=True)
+            lat = snap.floats["lat"][:n][m]
+            lon = snap.floats["lon"][:n][m]
+            codes = snap.codes["status"][:n][m]
+            pending_code = np.array([False] + [_is_pending(v) for v in snap.dicts["status"].values])
+        pending = pending_code[codes + 1].astype(np.float64)
+        grids = [_Grid(g.deg) for g in self.grids]
+        for g in grids:
+            ix, iy = g.cell(lat, lon)
+            g.fill(ix * g.rows + iy, pending)
+        with self._lock:
+            self.grids = grids
+            self.loaded = True
+        return int(len(lat))
+
+    def _apply(self, row: Optional[Dict[str, Any]], sign: int) -> None:
+        if not row:
+            return
+        try:
+            lat, lon = float(row.get("lat")), float(row.get("lon"))
+        except (TypeError, ValueError):
+            return
+        if math.isnan(lat) or math.isnan(lon):
+            return
+        pending = sign if _is_pending(row.get("status")) else 0
+        for g in self.grids:
+            g.add(g.key(lat, lon), sign, pending)
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """claim_events listener: move the changed claim between cells."""
+        if event.get("table") != "claims" or not self.loaded:
+            return
+        with self._lock:
+            self._apply(event.get("old"), -1)
+            if event.get("op") != "delete":
+                self._apply(event.get("row"), +1)
+
+    # ---- queries ----
+    def counts(self, lat: float, lon: float, radius_km: float) -> Tuple[int, int]:
+        """(claims, pending claims) with coordinates within radius_km of lat/lon."""
+        dlat = radius_km / _KM_PER_DEG_LAT
+        dlon = min(180.0, dlat / max(math.cos(math.radians(lat)), 0.01))
+        grid = self.grids[-1]
+        for g in self.grids:
+            if (2 * dlon / g.deg + 2) * (2 * dlat / g.deg + 2) <= NEIGHBOURHOOD_MAX_CELLS:
+                grid = g
+                break
+        (ix0, ix1), (iy0, iy1) = (
+            np.floor((np.array([lon - dlon, lon + dlon]) + 180.0) / grid.deg).astype(np.int64),
+            np.clip(np.floor((np.array([lat - dlat, lat + dlat]) + 90.0) / grid.deg).astype(np.int64), 0, grid.rows - 1),
+        )
+        ix, iy = np.meshgrid(np.arange(ix0, ix1 + 1), np.arange(iy0, iy1 + 1), indexing="ij")
+        ix, iy = ix.ravel(), iy.ravel()
+        centres = to_unit((iy + 0.5) * grid.deg - 90.0, (ix + 0.5) * grid.deg - 180.0)
+        d2 = ((centres - to_unit(lat, lon)) ** 2).sum(axis=1)
+        cand = (ix * grid.rows + iy)[chord_to_km(d2) <= radius_km]
+        with self._lock:
+            return grid.sums(cand)
+
+    def pending_ratio(self, lat: Any, lon: Any, radius_km: Optional[float] = None) -> Dict[str, Any]:
+        """
+        {"ratio", "claims", "pending", "radius_km"}; ratio falls back to DEFAULT_PENDING_RATIO
+        without coordinates, before the index is loaded or when no claim lies within the radius.
+        """
+        radius_km = float(radius_km or PENDING_RATIO_RADIUS_KM)
+        out = {"ratio": DEFAULT_PENDING_RATIO, "claims": 0, "pending": 0, "radius_km": radius_km}
+        try:
+            lat, lon = float(lat), float(lon)
+        except (TypeError, ValueError):
+            return out
+        if not self.loaded or math.isnan(lat) or math.isnan(lon):
+            return out
+        total, pending = self.counts(lat, lon, radius_km)
+        if total > 0:
+            out.update(ratio=pending / total, claims=total, pending=pending)
+        return out
+
+
+# Process-wide index used by the diagnostics metrics
+neighbourhood_index = NeighbourhoodIndex()
@@ -0,0 +1,310 @@
+# backend/utils/claim_parcels.py
+"""
+Optional parcel geometry per claim, with overlap detection against the
+parcels already on file.
+
+Claims stay single lat/lon points; a parcel polygon is stored beside the claim
+in claim_parcels (one row per claim: WKB geometry, geodesic area in hectares
+computed from the geometry with pyproj.Geod on WGS84, and the bounding box).
+claim_parcels_rtree, an SQLite R*Tree over those boxes kept in sync by
+triggers, is the candidate filter: an overlap check loads only the stored
+parcels whose boxes meet the new parcels' boxes (a few rows, whatever the
+table size), so it never scans millions of geometries or keeps them in memory.
+
+The candidates go into a shapely STRtree that is queried with all checked
+parcels at once (predicate="intersects"); each hit is then measured, and
+pairs sharing less than PARCEL_OVERLAP_MIN_HA (a common boundary, digitizing
+slivers) are ignored. Overlaps with claims whose status is in TITLE_STATUSES
+are flagged as conflicts with an existing title.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from backend.db import engine
+from backend.utils import claim_events
+
+logger = logging.getLogger(__name__)
+
+# intersections smaller than this (hectares) are shared boundaries, not overlaps
+PARCEL_OVERLAP_MIN_HA = 0.01
+# claim statuses that mean a title has been issued for the parcel
+TITLE_STATUSES = ("Granted",)
+# upper bound for one POST /api/parcels/overlaps batch
+MAX_PARCEL_BATCH = 5000
+
+_geod = None
+
+
+def _get_geod():
+    global _geod
+    if _geod is None:
+        from pyproj import Geod  # optional at import time (listed in requirements.txt)
+
+        _geod = Geod(ellps="WGS84")
+    return _geod
+
+
+def area_ha(geom) -> float:
+    """Geodesic area of a lon/lat polygon in hectares."""
+    area_m2, _ = _get_geod().geometry_area_perimeter(geom)
+    return abs(area_m2) / 10_000.0
+
+
+async def init_claim_parcels() -> None:
+    """Create claim_parcels, its R*Tree and the triggers keeping both in sync with claims."""
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            """
+            CREATE TABLE IF NOT EXISTS claim_parcels (
+                claim_id INTEGER PRIMARY KEY,
+                geom BLOB NOT NULL,
+                area_ha REAL NOT NULL,
+                min_lon REAL NOT NULL,
+                min_lat REAL NOT NULL,
+                max_lon REAL NOT NULL,
+                max_lat REAL NOT NULL,
+                updated_at TEXT DEFAULT (datetime('now'))
+            )
+            """
+        ))
+        exists = (await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'claim_parcels_rtree'")
+        )).fetchone()
+        if not exists:
+            await conn.execute(text(
+                "CREATE VIRTUAL TABLE claim_parcels_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat)"
+            ))
+            await conn.execute(text(
+                "INSERT INTO claim_parcels_rtree (id, min_lon, max_lon, min_lat, max_lat)"
+                " SELECT claim_id, min_lon, max_lon, min_lat, max_lat FROM claim_parcels"
+            ))
+        insert_new = (
+            "INSERT INTO claim_parcels_rtree (id, min_lon, max_lon, min_lat, max_lat)"
+            " VALUES (NEW.claim_id, NEW.min_lon, NEW.max_lon, NEW.min_lat, NEW.max_lat);"
+        )
+        await conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_claim_parcels_rtree_insert AFTER INSERT ON claim_parcels BEGIN {insert_new} END"
+        ))
+        await conn.execute(text(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_claim_parcels_rtree_update AFTER UPDATE ON claim_parcels
+            BEGIN DELETE FROM claim_parcels_rtree WHERE id = OLD.claim_id; {insert_new} END
+            """
+        ))
+        await conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS trg_claim_parcels_rtree_delete AFTER DELETE ON claim_parcels"
+            " BEGIN DELETE FROM claim_parcels_rtree WHERE id = OLD.claim_id; END"
+        ))
+        # a deleted claim takes its parcel with it (every delete path, including bulk SQL)
+        await conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS trg_claims_parcel_delete AFTER DELETE ON claims"
+            " BEGIN DELETE FROM claim_parcels WHERE claim_id = OLD.id; END"
+        ))
+
+
+def parse_parcel(geometry: Any):
+    """
+    Shapely (Multi)Polygon from a GeoJSON geometry dict (or a Feature wrapping one) in lon/lat.
+    Invalid rings are repaired (make_valid, polygonal parts kept). Raises ValueError when
+    nothing usable is left.
+    """
+    import shapely
+    from shapely.geometry import shape
+
+    if isinstance(geometry, dict) and geometry.get("type") == "Feature":
+        geometry = geometry.get("geometry")
+    if not isinstance(geometry, dict) or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+        raise ValueError("parcel must be a GeoJSON Polygon or MultiPolygon")
+    try:
+        geom = shape(geometry)
+    except Exception as e:
+        raise ValueError(f"invalid parcel geometry: {e}")
+    if geom.is_empty:
+        raise ValueError("parcel geometry is empty")
+    min_lon, min_lat, max_lon, max_lat = geom.bounds
+    if min_lon < -180 or max_lon > 180 or min_lat < -90 or max_lat > 90:
+        raise ValueError("parcel coordinates must be lon/lat degrees")
+    if not geom.is_valid:
+        geom = shapely.make_valid(geom)
+        parts = [g for g in shapely.get_parts(geom) if g.geom_type in ("Polygon", "MultiPolygon")]
+        geom = shapely.union_all(parts) if parts else None
+        if geom is None or geom.is_empty:
+            raise ValueError("parcel geometry is not a valid polygon")
+    return geom
+
+
+# ---- candidate pruning (R*Tree) ----
+_CANDIDATES_SQL = text(
+    """
+    SELECT p.claim_id, p.geom, p.area_ha, c.status, c.village, c.patta_holder
+    FROM claim_parcels_rtree r
+    JOIN claim_parcels p ON p.claim_id = r.id
+    LEFT JOIN claims c ON c.id = p.claim_id
+    WHERE r.min_lon <= :max_lon AND r.max_lon >= :min_lon
+      AND r.min_lat <= :max_lat AND r.max_lat >= :min_lat
+    """
+)
+
+
+async def _candidates(bounds: Iterable[Tuple[float, float, float, float]]) -> Dict[int, Dict[str, Any]]:
+    """Stored parcels whose boxes meet any of `bounds`, keyed by claim id (geometry still WKB)."""
+    found: Dict[int, Dict[str, Any]] = {}
+    async with engine.connect() as conn:
+        for min_lon, min_lat, max_lon, max_lat in bounds:
+            res = await conn.execute(
+                _CANDIDATES_SQL, {"min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat}
+            )
+            for r in res.fetchall():
+                m = r._mapping
+                if m["claim_id"] not in found:
+                    found[m["claim_id"]] = dict(m)
+    return found
+
+
+# ---- overlap detection (STRtree over the candidates) ----
+def _overlap(geom, other, geom_area: float) -> Optional[Tuple[float, float]]:
+    """(overlap ha, share of geom in percent), or None below the threshold."""
+    import shapely
+
+    inter = geom.intersection(other)
+    if inter.geom_type == "GeometryCollection":  # shared edges / corners next to an overlap
+        parts = [g for g in shapely.get_parts(inter) if g.geom_type in ("Polygon", "MultiPolygon")]
+        inter = shapely.union_all(parts) if parts else None
+    if inter is None or inter.is_empty or inter.geom_type not in ("Polygon", "MultiPolygon"):
+        return None
+    ha = area_ha(inter)
+    if ha < PARCEL_OVERLAP_MIN_HA:
+        return None
+    return round(ha, 4), round(100.0 * ha / geom_area, 2) if geom_area else 0.0
+
+
+def detect_overlaps(
+    geoms: Sequence[Any],
+    candidates: Dict[int, Dict[str, Any]],
+    exclude_ids: Sequence[Optional[int]] = (),
+) -> List[List[Dict[str, Any]]]:
+    """
+    For each geometry in `geoms`, the stored parcels (from `_candidates`) it overlaps, and the
+    other geometries of the same batch it overlaps ({"batch_index": j}). exclude_ids[i] is the
+    claim checked as geoms[i] (its own stored parcel is skipped).
+    """
+    import shapely
+    from shapely.strtree import STRtree
+
+    geoms = list(geoms)
+    exclude = list(exclude_ids) + [None] * (len(geoms) - len(exclude_ids))
+    areas = [area_ha(g) for g in geoms]
+    out: List[List[Dict[str, Any]]] = [[] for _ in geoms]
+    if not geoms:
+        return out
+    query = np.array(geoms, dtype=object)
+
+    ids = list(candidates)
+    if ids:
+        stored = shapely.from_wkb([candidates[i]["geom"] for i in ids])
+        tree = STRtree(stored)
+        for qi, si in zip(*tree.query(query, predicate="intersects")):
+            cid = ids[si]
+            if cid == exclude[qi]:
+                continue
+            hit = _overlap(geoms[qi], stored[si], areas[qi])
+            if hit is None:
+                continue
+            cand = candidates[cid]
+            out[qi].append({
+                "claim_id": cid,
+                "status": cand.get("status"),
+                "village": cand.get("village"),
+                "patta_holder": cand.get("patta_holder"),
+                "overlap_ha": hit[0],
+                "overlap_pct": hit[1],
+                "titled": cand.get("status") in TITLE_STATUSES,
+            })
+
+    if len(geoms) > 1:
+        tree = STRtree(query)
+        for qi, oj in zip(*tree.query(query, predicate="intersects")):
+            if qi == oj:
+                continue
+            hit = _overlap(geoms[qi], geoms[oj], areas[qi])
+            if hit is not None:
+                out[qi].append({"batch_index": int(oj), "overlap_ha": hit[0], "overlap_pct": hit[1]})
+
+    for hits in out:
+        hits.sort(key=lambda h: -h["overlap_ha"])
+    return out
+
+
+async def find_overlaps(geoms: Sequence[Any], exclude_ids: Sequence[Optional[int]] = ()) -> List[List[Dict[str, Any]]]:
+    """R*Tree candidate lookup + detect_overlaps (geometry work in the threadpool)."""
+    candidates = await _candidates(g.bounds for g in geoms)
+    return await run_in_threadpool(detect_overlaps, geoms, candidates, exclude_ids)
+
+
+# ---- storage ----
+def _parcel_summary(claim_id: int, geom, ha: float) -> Dict[str, Any]:
+    return {"claim_id": claim_id, "area_ha": round(ha, 4), "bbox": [round(v, 7) for v in geom.bounds]}
+
+
+async def save_parcel(claim_id: int, geom) -> Dict[str, Any]:
+    """
+    Store (replace) the parcel of a claim and report what it overlaps.
+    Returns {claim_id, area_ha, bbox, overlaps, titled_overlap}; raises LookupError for an unknown claim.
+    """
+    import shapely
+
+    async with engine.connect() as conn:
+        found = (await conn.execute(text("SELECT 1 FROM claims WHERE id = :id"), {"id": claim_id})).fetchone()
+    if not found:
+        raise LookupError("Claim not found")
+    overlaps = (await find_overlaps([geom], [claim_id]))[0]
+    ha = area_ha(geom)
+    min_lon, min_lat, max_lon, max_lat = geom.bounds
+    params = {
+        "claim_id": claim_id, "geom": shapely.to_wkb(geom), "area_ha": ha,
+        "min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat,
+    }
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            """
+            INSERT INTO claim_parcels (claim_id, geom, area_ha, min_lon, min_lat, max_lon, max_lat, updated_at)
+            VALUES (:claim_id, :geom, :area_ha, :min_lon, :min_lat, :max_lon, :max_lat, datetime('now'))
+            ON CONFLICT (claim_id) DO UPDATE SET
+                geom = excluded.geom, area_ha = excluded.area_ha,
+                min_lon = excluded.min_lon, min_lat = excluded.min_lat,
+                max_lon = excluded.max_lon, max_lat = excluded.max_lat,
+                updated_at = excluded.updated_at
+            """
+        ), params)
+    summary = _parcel_summary(claim_id, geom, ha)
+    claim_events.publish("claim_parcels", "upsert", row=summary, record_id=claim_id)
+    summary["overlaps"] = overlaps
+    summary["titled_overlap"] = any(o.get("titled") for o in overlaps)
+    return summary
+
+
+async def load_parcel(claim_id: int) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """(shapely geometry, row without the WKB) for a claim, or None."""
+    import shapely
+
+    async with engine.connect() as conn:
+        r = (await conn.execute(
+            text("SELECT claim_id, geom, area_ha, updated_at FROM claim_parcels WHERE claim_id = :id"), {"id": claim_id}
+        )).fetchone()
+    if not r:
+        return None
+    row = dict(r._mapping)
+    return shapely.from_wkb(row.pop("geom")), row
+
+
+async def delete_parcel(claim_id: int) -> bool:
+    async with engine.begin() as conn:
+        res = await conn.execute(text("DELETE FROM claim_parcels WHERE claim_id = :id"), {"id": claim_id})
+    if res.rowcount:
+        claim_events.publish("claim_parcels", "delete", record_id=claim_id)
+    return bool(res.rowcount)
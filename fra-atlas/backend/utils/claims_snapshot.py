@@ -0,0 +1,401 @@
+# backend/utils/claims_snapshot.py
+"""
+Read-optimized, in-process columnar snapshot of the hot claim columns.
+
+The map and dashboard only need a handful of columns (id, coords, area and the
+state/district/village/status labels), but used to re-read SQLite and build a
+dict per row on every request. The snapshot keeps those columns as NumPy arrays:
+
+- id (int64), lat/lon/land_area_ha (float64, NaN when missing)
+- state, district, village, status as int32 codes into per-column string
+  dictionaries (code -1 = NULL)
+
+It is loaded once at startup and kept current incrementally from the claim
+change events (backend/utils/claim_events.py): inserts append, updates
+overwrite in place and deletes clear an `alive` flag (compacted lazily).
+Filtering, counting and marker serialization are vectorized over the arrays.
+
+Those events only cover this process' writes. `catch_up()` (called by the read
+routes) folds in everything else - other workers, scripts, manual SQL - from
+the trigger-fed claim_changes log (backend/utils/change_log.py), reading the
+current row of every claim logged after the last seq it has seen.
+
+Structures derived from the snapshot (clusters, heatmap, neighbourhood counts)
+`add_listener` instead of subscribing to claim_events: they receive an event
+only when a snapshot row actually changes, with `old` taken from the snapshot,
+so a write seen both as an event and through catch_up() is applied once.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STRING_COLUMNS = ("state", "district", "village", "status")
+FLOAT_COLUMNS = ("lat", "lon", "land_area_ha")
+
+_INITIAL_CAPACITY = 1024
+_LOAD_BATCH = 100_000
+# SQLite's default max host parameters is 999 on older builds
+_IN_CHUNK = 500
+
+
+class _Dictionary:
+    """String <-> int32 code mapping for one dictionary-encoded column."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: Any) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Exact-match code, or -2 (matches nothing) when the value was never seen."""
+        return self.codes.get(str(value), -2)
+
+    def matching(self, substring: str) -> np.ndarray:
+        """Codes whose value contains `substring` (ASCII case-insensitive, like SQLite LIKE)."""
+        needle = str(substring).lower()
+        return np.array([c for c, v in enumerate(self.values) if needle in v.lower()], dtype=np.int32)
+
+    def decode(self, codes: np.ndarray) -> List[Optional[str]]:
+        lut = self.values
+        return [lut[c] if c >= 0 else None for c in codes.tolist()]
+
+
+class ClaimsSnapshot:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.loaded = False
+        self.db_path: Optional[str] = None
+        # last claim_changes seq reflected in the snapshot
+        self.seq = 0
+        self._reset(_INITIAL_CAPACITY)
+
+    # ---- storage ----
+    def _reset(self, capacity: int) -> None:
+        self.n = 0
+        self.dead = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.floats = {c: np.full(capacity, np.nan, dtype=np.float64) for c in FLOAT_COLUMNS}
+        self.codes = {c: np.full(capacity, -1, dtype=np.int32) for c in STRING_COLUMNS}
+        self.dicts = {c: _Dictionary() for c in STRING_COLUMNS}
+        self.index: Dict[int, int] = {}
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        new_cap = max(needed, capacity * 2)
+
+        def grow(arr: np.ndarray, fill) -> np.ndarray:
+            out = np.full(new_cap, fill, dtype=arr.dtype)
+            out[: self.n] = arr[: self.n]
+            return out
+
+        self.ids = grow(self.ids, 0)
+        self.alive = grow(self.alive, False)
+        self.floats = {c: grow(a, np.nan) for c, a in self.floats.items()}
+        self.codes = {c: grow(a, -1) for c, a in self.codes.items()}
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self.alive[: self.n])
+        m = len(keep)
+        self.ids[:m] = self.ids[keep]
+        self.alive[:m] = True
+        self.alive[m: self.n] = False
+        for c in FLOAT_COLUMNS:
+            self.floats[c][:m] = self.floats[c][keep]
+        for c in STRING_COLUMNS:
+            self.codes[c][:m] = self.codes[c][keep]
+        self.n = m
+        self.dead = 0
+        self.index = {int(i): pos for pos, i in enumerate(self.ids[:m].tolist())}
+
+    @staticmethod
+    def _float(v: Any) -> float:
+        if v is None or v == "":
+            return np.nan
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def _row(self, pos: int) -> Dict[str, Any]:
+        """Snapshot columns of the claim at `pos` as a row dict."""
+        out: Dict[str, Any] = {"id": int(self.ids[pos])}
+        for c in FLOAT_COLUMNS:
+            v = float(self.floats[c][pos])
+            out[c] = None if np.isnan(v) else v
+        for c in STRING_COLUMNS:
+            code = int(self.codes[c][pos])
+            out[c] = self.dicts[c].values[code] if code >= 0 else None
+        return out
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """`row` reduced to the snapshot columns, normalized like _row()."""
+        out: Dict[str, Any] = {"id": int(row["id"])}
+        for c in FLOAT_COLUMNS:
+            v = self._float(row.get(c))
+            out[c] = None if np.isnan(v) else v
+        for c in STRING_COLUMNS:
+            out[c] = None if row.get(c) is None else str(row.get(c))
+        return out
+
+    def _write(self, pos: int, row: Dict[str, Any]) -> None:
+        self.ids[pos] = int(row["id"])
+        self.alive[pos] = True
+        for c in FLOAT_COLUMNS:
+            self.floats[c][pos] = self._float(row.get(c))
+        for c in STRING_COLUMNS:
+            self.codes[c][pos] = self.dicts[c].encode(row.get(c))
+
+    # ---- loading / incremental maintenance ----
+    def load(self, db_path: str) -> int:
+        """(Re)build the snapshot from SQLite. Returns the number of claims loaded."""
+        cols = ["id", *STRING_COLUMNS, *FLOAT_COLUMNS]
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            # read before the rows: changes in between are re-read (as no-ops) by catch_up()
+            seq = _max_change_seq(conn)
+            total = conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+            with self._lock:
+                self.db_path = db_path
+                self.seq = seq
+                self._reset(max(_INITIAL_CAPACITY, int(total * 1.25)))
+                cur = conn.execute(f"SELECT {', '.join(cols)} FROM claims ORDER BY id")
+                while True:
+                    rows = cur.fetchmany(_LOAD_BATCH)
+                    if not rows:
+                        break
+                    self._append_rows([dict(r) for r in rows])
+                self.loaded = True
+                return self.n
+        finally:
+            conn.close()
+
+    def _append_rows(self, rows: Sequence[Dict[str, Any]]) -> None:
+        start = self.n
+        self._grow(start + len(rows))
+        k = len(rows)
+        self.ids[start:start + k] = [int(r["id"]) for r in rows]
+        self.alive[start:start + k] = True
+        for c in FLOAT_COLUMNS:
+            self.floats[c][start:start + k] = [self._float(r.get(c)) for r in rows]
+        for c in STRING_COLUMNS:
+            enc = self.dicts[c].encode
+            self.codes[c][start:start + k] = [enc(r.get(c)) for r in rows]
+        for off, r in enumerate(rows):
+            self.index[int(r["id"])] = start + off
+        self.n = start + k
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        if not row or row.get("id") is None:
+            return
+        with self._lock:
+            pos = self.index.get(int(row["id"]))
+            if pos is None:
+                self._append_rows([row])
+            else:
+                self._write(pos, row)
+
+    def remove(self, claim_id: int) -> None:
+        with self._lock:
+            pos = self.index.pop(int(claim_id), None)
+            if pos is None:
+                return
+            self.alive[pos] = False
+            self.dead += 1
+            if self.dead > 1024 and self.dead * 4 > self.n:
+                self._compact()
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a derived structure for the effective changes (see module docstring)."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """claim_events listener: keep the snapshot current without touching SQLite."""
+        if event.get("table") != "claims" or not self.loaded:
+            return
+        with self._lock:
+            if event.get("op") == "delete":
+                if event.get("id") is None:
+                    return
+                claim_id = int(event["id"])
+                pos = self.index.get(claim_id)
+                if pos is None:
+                    return
+                old, new = self._row(pos), None
+                self.remove(claim_id)
+            else:
+                row = event.get("row") or {}
+                if row.get("id") is None:
+                    return
+                new = self._project(row)
+                pos = self.index.get(new["id"])
+                old = self._row(pos) if pos is not None else None
+                if old == new:
+                    return
+                self.upsert(row)
+            # forwarded under the lock so listeners see the changes in snapshot order
+            change = {
+                "table": "claims",
+                "op": "delete" if new is None else ("insert" if old is None else "update"),
+                "id": (new or old)["id"],
+                "row": new,
+                "old": old,
+            }
+            for listener in list(self._listeners):
+                try:
+                    listener(change)
+                except Exception:
+                    logger.exception("snapshot listener %r failed for claim %s", listener, change["id"])
+
+    def catch_up(self) -> int:
+        """
+        Apply claim changes this process has no event for (other workers, scripts, manual SQL)
+        from the claim_changes log. Cheap when nothing new was logged. Returns the number of
+        claims re-read.
+        """
+        if not self.loaded or not self.db_path:
+            return 0
+        with self._sync_lock:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            try:
+                try:
+                    entries = conn.execute(
+                        "SELECT seq, claim_id FROM claim_changes WHERE seq > ? ORDER BY seq", (self.seq,)
+                    ).fetchall()
+                    min_cursor = conn.execute("SELECT value FROM change_log_meta WHERE key = 'min_cursor'").fetchone()
+                except sqlite3.OperationalError:
+                    return 0  # no change log in this database
+                min_cursor = int(min_cursor[0]) if min_cursor else 0
+                # tombstones after our seq were compacted away: find the deletes by id instead
+                reset = self.seq < min_cursor
+                if not entries and not reset:
+                    return 0
+                ids = list(dict.fromkeys(int(e["claim_id"]) for e in entries))
+                cols = ", ".join(["id", *STRING_COLUMNS, *FLOAT_COLUMNS])
+                rows: Dict[int, Dict[str, Any]] = {}
+                for i in range(0, len(ids), _IN_CHUNK):
+                    chunk = ids[i:i + _IN_CHUNK]
+                    res = conn.execute(f"SELECT {cols} FROM claims WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                    rows.update((int(r["id"]), dict(r)) for r in res.fetchall())
+                if reset:
+                    live = {r[0] for r in conn.execute("SELECT id FROM claims")}
+                    with self._lock:
+                        ids.extend(i for i in list(self.index) if i not in live)
+            finally:
+                conn.close()
+            for claim_id in ids:
+                row = rows.get(claim_id)
+                self.apply_event({"table": "claims", "op": "update" if row else "delete", "id": claim_id, "row": row, "old": None})
+            self.seq = max(self.seq, entries[-1]["seq"] if entries else 0, min_cursor if reset else 0)
+            return len(ids)
+
+    # ---- vectorized reads ----
+    def mask(
+        self,
+        state: Optional[str] = None,
+        district: Optional[str] = None,
+        village: Optional[str] = None,
+        status: Optional[str] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        with_coords: bool = False,
+    ) -> np.ndarray:
+        """
+        Boolean mask over [0, n) for the list-endpoint filters
+        (exact state/district/status, substring village, optional bbox=(min_lon, min_lat, max_lon, max_lat)).
+        Call with the lock held.
+        """
+        n = self.n
+        m = self.alive[:n].copy()
+        if state:
+            m &= self.codes["state"][:n] == self.dicts["state"].lookup(state)
+        if district:
+            m &= self.codes["district"][:n] == self.dicts["district"].lookup(district)
+        if status:
+            m &= self.codes["status"][:n] == self.dicts["status"].lookup(status)
+        if village:
+            m &= np.isin(self.codes["village"][:n], self.dicts["village"].matching(village))
+        if with_coords or bbox:
+            lat = self.floats["lat"][:n]
+            lon = self.floats["lon"][:n]
+            m &= ~(np.isnan(lat) | np.isnan(lon))
+            if bbox:
+                min_lon, min_lat, max_lon, max_lat = bbox
+                with np.errstate(invalid="ignore"):
+                    m &= (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+        return m
+
+    def summary(self, **filters: Any) -> Dict[str, Any]:
+        """Counts (total, with coordinates, per status) and total hectares for the filtered claims."""
+        with self._lock:
+            m = self.mask(**filters)
+            n = self.n
+            codes = self.codes["status"][:n][m]
+            status_dict = self.dicts["status"]
+            by_status: Dict[str, int] = {}
+            if codes.size:
+                counts = np.bincount(codes + 1, minlength=len(status_dict.values) + 1)
+                for code, cnt in enumerate(counts.tolist()):
+                    if cnt:
+                        by_status[status_dict.values[code - 1] if code else "Unknown"] = cnt
+            lat = self.floats["lat"][:n][m]
+            lon = self.floats["lon"][:n][m]
+            area = self.floats["land_area_ha"][:n][m]
+            return {
+                "total": int(m.sum()),
+                "with_coords": int((~(np.isnan(lat) | np.isnan(lon))).sum()),
+                "by_status": by_status,
+                "total_area_ha": round(float(np.nansum(area)), 4),
+            }
+
+    def markers(self, **filters: Any) -> bytes:
+        """Serialize map markers (claims with coordinates) as a JSON array, straight from the arrays."""
+        with self._lock:
+            m = self.mask(with_coords=True, **filters)
+            idx = np.flatnonzero(m)
+            ids = self.ids[idx].tolist()
+            lats = self.floats["lat"][idx].tolist()
+            lons = self.floats["lon"][idx].tolist()
+            statuses = self.dicts["status"].decode(self.codes["status"][idx])
+            villages = self.dicts["village"].decode(self.codes["village"][idx])
+        return json.dumps(
+            [
+                {"id": i, "lat": la, "lon": lo, "status": st, "village": v}
+                for i, la, lo, st, v in zip(ids, lats, lons, statuses, villages)
+            ],
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+def _max_change_seq(conn: sqlite3.Connection) -> int:
+    try:
+        return int(conn.execute("SELECT COALESCE(MAX(seq), 0) FROM claim_changes").fetchone()[0])
+    except sqlite3.OperationalError:
+        return 0
+
+
+# Process-wide snapshot used by the read endpoints
+snapshot = ClaimsSnapshot()
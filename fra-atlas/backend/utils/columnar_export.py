@@ -0,0 +1,285 @@
+# backend/utils/columnar_export.py
+"""
+Columnar (Parquet / Arrow IPC) export of claims and villages for analytics.
+
+Record batches are built straight from sqlite3 `fetchmany` batches, with typed
+columns instead of text:
+- lat/lon as float64, land area as float64 hectares, document date as date32,
+  created_at as timestamp[us]
+- state, district and status dictionary-encoded (low cardinality)
+
+`geo=True` adds a WKB point `geometry` column plus GeoParquet "geo" metadata,
+so `geopandas.read_parquet` returns a GeoDataFrame directly.
+
+The Arrow IPC *stream* is written incrementally (one message per batch), while
+Parquet needs its footer at the end, so it is written to a spooled temp file
+first and then streamed out.
+
+pyarrow is an optional dependency; `ColumnarExportUnavailable` is raised when
+it is not installed.
+"""
+
+import datetime
+import json
+import sqlite3
+import struct
+import tempfile
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.db import build_claims_where
+from backend.utils.normalize_claims import _parse_area_hectares, _parse_date
+
+COLUMNAR_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+COLUMNAR_BATCH_SIZE = 50_000
+_SPOOL_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ColumnarExportUnavailable(RuntimeError):
+    """Raised when pyarrow is not installed."""
+
+
+def _pa():
+    try:
+        import pyarrow as pa
+    except ImportError as e:  # optional dependency
+        raise ColumnarExportUnavailable("Parquet/Arrow export requires the 'pyarrow' package") from e
+    return pa
+
+
+# ----------------------------
+# Column converters
+# ----------------------------
+def _to_float(v: Any) -> Optional[float]:
+    if v is None or v == "":
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_timestamp(v: Any) -> Optional[datetime.datetime]:
+    if not v:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(str(v))
+    except ValueError:
+        return None
+
+
+def _area_ha(typed: Any, raw: Any) -> Optional[float]:
+    # prefer the typed column written at ingest; parse the raw text for rows not yet backfilled
+    return _to_float(typed) if typed is not None else _parse_area_hectares(raw)
+
+
+def _iso_date(typed: Any, raw: Any) -> Optional[datetime.date]:
+    if typed:
+        try:
+            return datetime.date.fromisoformat(typed)
+        except ValueError:
+            pass
+    return _parse_date(raw)
+
+
+def _point_wkb(lon: Optional[float], lat: Optional[float]) -> Optional[bytes]:
+    if lon is None or lat is None:
+        return None
+    # little-endian WKB Point: byte order, geometry type 1, x, y
+    return struct.pack("<BIdd", 1, 1, lon, lat)
+
+
+# Each table: (sql column list, [(output name, arrow type factory, converter(row) -> value)])
+def _claims_spec(pa) -> Tuple[List[str], List[Tuple[str, Any, Callable[[Tuple], Any]]]]:
+    cols = ["id", "state", "district", "block", "village", "patta_holder", "address",
+            "land_area", "land_area_ha", "status", "date", "date_iso", "lat", "lon", "source", "created_at"]
+    i = {c: n for n, c in enumerate(cols)}
+    dict_str = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        ("id", pa.int64(), lambda r: r[i["id"]]),
+        ("state", dict_str, lambda r: r[i["state"]]),
+        ("district", dict_str, lambda r: r[i["district"]]),
+        ("block", pa.string(), lambda r: r[i["block"]]),
+        ("village", pa.string(), lambda r: r[i["village"]]),
+        ("patta_holder", pa.string(), lambda r: r[i["patta_holder"]]),
+        ("address", pa.string(), lambda r: r[i["address"]]),
+        ("land_area_ha", pa.float64(), lambda r: _area_ha(r[i["land_area_ha"]], r[i["land_area"]])),
+        ("status", dict_str, lambda r: r[i["status"]]),
+        ("date", pa.date32(), lambda r: _iso_date(r[i["date_iso"]], r[i["date"]])),
+        ("lat", pa.float64(), lambda r: _to_float(r[i["lat"]])),
+        ("lon", pa.float64(), lambda r: _to_float(r[i["lon"]])),
+        ("source", dict_str, lambda r: r[i["source"]]),
+        ("created_at", pa.timestamp("us"), lambda r: _to_timestamp(r[i["created_at"]])),
+    ]
+    return cols, fields
+
+
+def _villages_spec(pa) -> Tuple[List[str], List[Tuple[str, Any, Callable[[Tuple], Any]]]]:
+    cols = ["id", "state", "district", "block", "village", "lat", "lon", "created_at"]
+    i = {c: n for n, c in enumerate(cols)}
+    dict_str = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        ("id", pa.int64(), lambda r: r[i["id"]]),
+        ("state", dict_str, lambda r: r[i["state"]]),
+        ("district", dict_str, lambda r: r[i["district"]]),
+        ("block", pa.string(), lambda r: r[i["block"]]),
+        ("village", pa.string(), lambda r: r[i["village"]]),
+        ("lat", pa.float64(), lambda r: _to_float(r[i["lat"]])),
+        ("lon", pa.float64(), lambda r: _to_float(r[i["lon"]])),
+        ("created_at", pa.timestamp("us"), lambda r: _to_timestamp(r[i["created_at"]])),
+    ]
+    return cols, fields
+
+
+_SPECS = {"claims": _claims_spec, "villages": _villages_spec}
+
+
+def _geo_metadata() -> bytes:
+    # GeoParquet 1.0; omitted "crs" means OGC:CRS84 (lon/lat WGS84)
+    return json.dumps({
+        "version": "1.0.0",
+        "primary_column": "geometry",
+        "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["Point"]}},
+    }).encode("utf-8")
+
+
+def _iter_record_batches(
+    db_path: str,
+    table: str,
+    filters: Optional[Dict[str, Any]],
+    geo: bool,
+    batch_size: int,
+):
+    """Return (schema, iterator of pyarrow.RecordBatch) for `table`."""
+    pa = _pa()
+    cols, fields = _SPECS[table](pa)
+    schema_fields = [pa.field(name, typ) for name, typ, _ in fields]
+    if geo:
+        schema_fields.append(pa.field("geometry", pa.binary()))
+    metadata = {b"geo": _geo_metadata()} if geo else None
+    schema = pa.schema(schema_fields, metadata=metadata)
+
+    if table == "claims":
+        where, params = build_claims_where(filters or {})
+        sql = f"SELECT {', '.join(cols)} FROM claims{where} ORDER BY id"
+    else:
+        where, params = "", {}
+        sql = f"SELECT {', '.join(cols)} FROM villages ORDER BY id"
+
+    lat_i, lon_i = cols.index("lat"), cols.index("lon")
+
+    def _batches():
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            cur = conn.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                arrays = [pa.array([conv(r) for r in rows], type=typ) for _, typ, conv in fields]
+                if geo:
+                    arrays.append(pa.array(
+                        [_point_wkb(_to_float(r[lon_i]), _to_float(r[lat_i])) for r in rows], type=pa.binary()
+                    ))
+                yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+        finally:
+            conn.close()
+
+    return schema, _batches()
+
+
+class _ChunkSink:
+    """Minimal writable file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self.chunks)
+        self.chunks = []
+        return out
+
+
+def arrow_stream(
+    db_path: str,
+    table: str = "claims",
+    filters: Optional[Dict[str, Any]] = None,
+    geo: bool = False,
+    batch_size: int = COLUMNAR_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Yield an Arrow IPC stream, one record batch at a time."""
+    pa = _pa()
+    schema, batches = _iter_record_batches(db_path, table, filters, geo, batch_size)
+
+    def _gen():
+        sink = _ChunkSink()
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+        for batch in batches:
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+        writer.close()
+        data = sink.drain()
+        if data:
+            yield data
+
+    return _gen()
+
+
+def write_parquet(
+    db_path: str,
+    table: str = "claims",
+    filters: Optional[Dict[str, Any]] = None,
+    geo: bool = False,
+    batch_size: int = COLUMNAR_BATCH_SIZE,
+):
+    """
+    Write a (Geo)Parquet file of `table` into a spooled temp file and return it rewound.
+    Blocking; call from a worker thread.
+    """
+    pa = _pa()
+    import pyarrow.parquet as pq
+
+    schema, batches = _iter_record_batches(db_path, table, filters, geo, batch_size)
+    tmp = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+    writer = pq.ParquetWriter(pa.PythonFile(tmp, mode="w"), schema, compression="zstd")
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+    finally:
+        writer.close()
+    tmp.seek(0)
+    return tmp
+
+
+def iter_file(fh, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+    """Stream a file object in chunks and close it at the end."""
+    try:
+        while True:
+            data = fh.read(chunk_size)
+            if not data:
+                break
+            yield data
+    finally:
+        fh.close()
+
+
+def columnar_filename(table: str, fmt: str, geo: bool = False) -> str:
+    if fmt == "parquet":
+        return f"{table}.geo.parquet" if geo else f"{table}.parquet"
+    return f"{table}.arrows"
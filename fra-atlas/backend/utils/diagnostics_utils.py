@@ -7,22 +7,30 @@ rule-based scoring for demo diagnostics. It is intentionally simple
 and transparent so judges can see exactly how scores are derived.
 
 Functions:
-- compute_metrics(lat, lon, land_area) -> dict
+- compute_metrics(lat, lon, land_area, radius_km=None, coords_known=True) -> dict
 - score_schemes(metrics, claim=None) -> list[dict] (sorted by score desc)
 - generate_diagnostics(lat=None, lon=None, land_area=None, claim=None) -> dict
 """
 
 from typing import Optional, Dict, Any, List
 
+from backend.utils.claim_neighbourhood import neighbourhood_index, DEFAULT_PENDING_RATIO
 
-def compute_metrics(lat: float = 0.0, lon: float = 0.0, land_area: float = 0.0) -> Dict[str, Any]:
+
+def compute_metrics(lat: float = 0.0, lon: float = 0.0, land_area: float = 0.0,
+                    radius_km: Optional[float] = None, coords_known: bool = True) -> Dict[str, Any]:
     """
     Deterministic, repeatable computation of pseudo-metrics from lat/lon and land_area.
+    pendingClaimRatio is real data: the share of pending claims within radius_km
+    (default PENDING_RATIO_RADIUS_KM); DEFAULT_PENDING_RATIO where there are none or
+    when coords_known is False (lat/lon are placeholders, not a real location).
 
     Args:
         lat: latitude (float)
         lon: longitude (float)
         land_area: land area in hectares (float)
+        radius_km: neighbourhood radius for pendingClaimRatio (float, optional)
+        coords_known: whether lat/lon are a real location (bool)
 
     Returns:
         dict with keys:
@@ -32,6 +40,7 @@ def compute_metrics(lat: float = 0.0, lon: float = 0.0, land_area: float = 0.0)
           - gwIndex (float 0-1)
           - distanceToWaterKm (float)
           - pendingClaimRatio (float)
+          - nearbyClaims (int, claims within the radius)
           - land_area (float)
     """
     try:
@@ -53,7 +62,11 @@ def compute_metrics(lat: float = 0.0, lon: float = 0.0, land_area: float = 0.0)
     soilIndex = (seed % 61) / 60.0  # 0 - 1 scale
     gwIndex = ((seed * 7) % 97) / 96.0  # 0 - 1 scale
     distanceToWaterKm = round((100 - (seed % 100)) / 10.0, 1)  # 0.0 - 10.0 km
-    pendingClaimRatio = 0.5  # demo fixed value (placeholder)
+    if coords_known:
+        nearby = neighbourhood_index.pending_ratio(lat_n, lon_n, radius_km)
+    else:
+        nearby = {"ratio": DEFAULT_PENDING_RATIO, "claims": 0}
+    pendingClaimRatio = nearby["ratio"]
 
     return {
         "seed": int(seed),
@@ -63,6 +76,7 @@ def compute_metrics(lat: float = 0.0, lon: float = 0.0, land_area: float = 0.0)
         "gwIndex": round(gwIndex, 4),
         "distanceToWaterKm": distanceToWaterKm,
         "pendingClaimRatio": round(pendingClaimRatio, 3),
+        "nearbyClaims": nearby["claims"],
         "land_area": round(la, 4),
     }
 
@@ -87,7 +101,8 @@ def score_schemes(metrics: Dict[str, Any], claim: Optional[Dict[str, Any]] = Non
     soilIndex = float(metrics.get("soilIndex", 0.0))
     gwIndex = float(metrics.get("gwIndex", 0.0))
     distance = float(metrics.get("distanceToWaterKm", 0.0))
-    pendingClaimRatio = float(metrics.get("pendingClaimRatio", 0.5))
+    ratio = metrics.get("pendingClaimRatio")
+    pendingClaimRatio = float(ratio if ratio is not None else DEFAULT_PENDING_RATIO)
 
     # clamp helper allowing sums up to 2.0 before final normalization
     def clamp(v: float, lo: float = 0.0, hi: float = 2.0) -> float:
@@ -107,7 +122,10 @@ def score_schemes(metrics: Dict[str, Any], claim: Optional[Dict[str, Any]] = Non
         mReasons.append("Larger land area (>1.5 ha) → more scope for MGNREGA interventions (+0.05)")
     if pendingClaimRatio > 0.5:
         mScore += 0.05
-        mReasons.append("Higher pending claims in area (demo) → targeted employment programs (+0.05)")
+        mReasons.append(
+            f"Most claims nearby still pending ({pendingClaimRatio:.0%} of {metrics.get('nearbyClaims') or 0})"
+            " → targeted employment programs (+0.05)"
+        )
 
     # JJM (Jal Jeevan Mission)
     jScore = 0.20
@@ -162,11 +180,13 @@ def generate_diagnostics(lat: Optional[float] = None, lon: Optional[float] = Non
         }
     """
     # resolve inputs
-    lat_val = lat if lat is not None else (claim.get("lat") if claim and claim.get("lat") is not None else 0.0)
-    lon_val = lon if lon is not None else (claim.get("lon") if claim and claim.get("lon") is not None else 0.0)
+    lat_val = lat if lat is not None else (claim.get("lat") if claim and claim.get("lat") is not None else None)
+    lon_val = lon if lon is not None else (claim.get("lon") if claim and claim.get("lon") is not None else None)
     la_val = land_area if land_area is not None else (claim.get("land_area") if claim and claim.get("land_area") is not None else 0.0)
+    # (0, 0) stands in for missing coordinates; it must not be looked up as a neighbourhood
+    coords_known = lat_val is not None and lon_val is not None
 
-    metrics = compute_metrics(lat=lat_val, lon=lon_val, land_area=la_val)
+    metrics = compute_metrics(lat=lat_val or 0.0, lon=lon_val or 0.0, land_area=la_val, coords_known=coords_known)
     recommendations = score_schemes(metrics, claim=claim)
 
     return {
@@ -0,0 +1,219 @@
+# backend/utils/export_stream.py
+"""
+Streaming export engine for claims.
+
+Rows are pulled from a sqlite3 cursor in fixed-size batches (`fetchmany`) and
+encoded chunk by chunk, so memory stays constant no matter how many claims
+match and the first bytes go out immediately. Generators here are synchronous
+on purpose: Starlette's StreamingResponse iterates them in the threadpool, so
+the event loop never blocks on SQLite and the client socket provides backpressure.
+
+Formats:
+- csv      RFC 4180 quoting via the csv module
+- ndjson   one JSON object per line
+- geojson  FeatureCollection of Point features (geometry null when coords are missing)
+
+Any format can be gzip-compressed on the fly with `gzip_chunks`.
+
+The same machinery streams large GET /api/claims listings (`stream_claims_listing`):
+rows are encoded to JSON by SQLite (json_object, as in db.query_claims_json) and
+flushed per batch either as NDJSON or as a chunked `{"claims":[...]}` document
+with the same shape as the buffered response.
+"""
+
+import csv
+import io
+import json
+import sqlite3
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from backend.db import build_claims_where, CLAIM_COLUMNS
+from backend.utils.fast_json import json_object_sql
+
+EXPORT_COLUMNS = [
+    "id", "state", "district", "block", "village", "patta_holder", "address",
+    "land_area", "status", "date", "lat", "lon", "created_at",
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "geojson": ("application/geo+json", "geojson"),
+}
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def iter_claim_batches(
+    db_path: str,
+    filters: Dict[str, Any],
+    columns: Sequence[str] = EXPORT_COLUMNS,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Yield lists of row tuples (in `columns` order) for claims matching `filters`.
+    The connection lives only as long as the generator.
+    """
+    where, params = build_claims_where(filters)
+    sql = f"SELECT {', '.join(columns)} FROM claims{where} ORDER BY created_at DESC"
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def csv_chunks(batches: Iterable[List[Tuple[Any, ...]]], columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(["" if v is None else v for v in row] for row in rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def ndjson_chunks(batches: Iterable[List[Tuple[Any, ...]]], columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows).encode("utf-8")
+
+
+def geojson_chunks(batches: Iterable[List[Tuple[Any, ...]]], columns: Sequence[str] = EXPORT_COLUMNS) -> Iterator[bytes]:
+    cols = list(columns)
+    lat_i, lon_i, id_i = cols.index("lat"), cols.index("lon"), cols.index("id")
+    prop_idx = [(i, c) for i, c in enumerate(cols) if c not in ("lat", "lon")]
+
+    yield b'{"type":"FeatureCollection","features":['
+    first = True
+    for rows in batches:
+        parts = []
+        for row in rows:
+            lat, lon = row[lat_i], row[lon_i]
+            geometry = {"type": "Point", "coordinates": [lon, lat]} if lat is not None and lon is not None else None
+            feature = {
+                "type": "Feature",
+                "id": row[id_i],
+                "geometry": geometry,
+                "properties": {c: row[i] for i, c in prop_idx},
+            }
+            parts.append(json.dumps(feature, default=str))
+        if parts:
+            yield (("" if first else ",") + ",".join(parts)).encode("utf-8")
+            first = False
+    yield b"]}"
+
+
+_ENCODERS = {"csv": csv_chunks, "ndjson": ndjson_chunks, "geojson": geojson_chunks}
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6, sync_flush: bool = False) -> Iterator[bytes]:
+    """
+    Compress a byte stream into a single gzip member without buffering it.
+    With sync_flush every input chunk is flushed, so the client can decode it right away.
+    """
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if sync_flush:
+            out += comp.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield comp.flush()
+
+
+def export_claims_stream(
+    db_path: str,
+    filters: Dict[str, Any],
+    fmt: str = "csv",
+    gzip: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Return a byte iterator for the export of claims matching `filters` in `fmt`.
+    Raises ValueError for unknown formats.
+    """
+    encoder = _ENCODERS.get(fmt)
+    if encoder is None:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    chunks = encoder(iter_claim_batches(db_path, filters, EXPORT_COLUMNS, batch_size))
+    return gzip_chunks(chunks) if gzip else chunks
+
+
+def export_media_type(fmt: str, gzip: bool = False) -> Tuple[str, str]:
+    """Return (media_type, filename) for an export response."""
+    media_type, ext = EXPORT_FORMATS[fmt]
+    if gzip:
+        return "application/gzip", f"claims.{ext}.gz"
+    return media_type, f"claims.{ext}"
+
+
+# ----------------------------
+# Streaming listings (GET /api/claims?format=ndjson|json-stream)
+# ----------------------------
+LISTING_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json-stream": "application/json",
+}
+
+
+def iter_claim_json_batches(
+    db_path: str,
+    filters: Dict[str, Any],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[List[str]]:
+    """Yield lists of per-claim JSON object texts (encoded by SQLite), same order as the listing."""
+    where, params = build_claims_where(filters)
+    sql = f"SELECT {json_object_sql(CLAIM_COLUMNS)} FROM claims{where} ORDER BY created_at DESC"
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [r[0] for r in rows]
+    finally:
+        conn.close()
+
+
+def ndjson_text_chunks(batches: Iterable[List[str]]) -> Iterator[bytes]:
+    for objs in batches:
+        yield ("\n".join(objs) + "\n").encode("utf-8")
+
+
+def json_array_chunks(batches: Iterable[List[str]], prefix: bytes = b'{"claims":[', suffix: bytes = b"]}") -> Iterator[bytes]:
+    yield prefix
+    first = True
+    for objs in batches:
+        if objs:
+            yield (("" if first else ",") + ",".join(objs)).encode("utf-8")
+            first = False
+    yield suffix
+
+
+def stream_claims_listing(
+    db_path: str,
+    filters: Dict[str, Any],
+    fmt: str = "ndjson",
+    gzip: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Byte iterator for a streamed claims listing; raises ValueError for unknown formats."""
+    batches = iter_claim_json_batches(db_path, filters, batch_size)
+    if fmt == "ndjson":
+        chunks = ndjson_text_chunks(batches)
+    elif fmt == "json-stream":
+        chunks = json_array_chunks(batches)
+    else:
+        raise ValueError(f"Unsupported listing format: {fmt}")
+    return gzip_chunks(chunks, sync_flush=True) if gzip else chunks
@@ -0,0 +1,71 @@
+# backend/utils/geo_grid.py
+"""
+Web Mercator grid helpers shared by the map-side indexes (clusters, tiles, heatmaps).
+
+World coordinates are normalized Mercator: x, y in [0, 1), origin top-left,
+so at zoom z a 256px tile covers 1 / 2**z of the world on each axis. All
+functions accept scalars or NumPy arrays.
+"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+TILE_SIZE = 256
+# Mercator is undefined at the poles; clamp like every slippy map does
+MAX_LAT = 85.05112878
+
+
+def lonlat_to_world(lon, lat):
+    """Normalized Mercator (x, y) in [0, 1) for lon/lat degrees."""
+    lat = np.clip(lat, -MAX_LAT, MAX_LAT)
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0
+    s = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + s) / (1 - s)) / (4 * np.pi)
+    return np.clip(x, 0.0, 1.0 - 1e-12), np.clip(y, 0.0, 1.0 - 1e-12)
+
+
+def world_to_lonlat(x, y):
+    """Inverse of lonlat_to_world."""
+    lon = np.asarray(x, dtype=np.float64) * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y, dtype=np.float64)))))
+    return lon, lat
+
+
+def cell_size(zoom: int, cell_px: float) -> float:
+    """Width of a grid cell of `cell_px` screen pixels at `zoom`, in world units."""
+    return cell_px / (TILE_SIZE * (2 ** zoom))
+
+
+def cells_per_axis(zoom: int, cell_px: float) -> int:
+    return int(math.ceil(1.0 / cell_size(zoom, cell_px)))
+
+
+def bbox_to_world(bbox: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) -> (min_x, min_y, max_x, max_y) in world units (y grows southwards)."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    x0, y1 = lonlat_to_world(min_lon, min_lat)
+    x1, y0 = lonlat_to_world(max_lon, max_lat)
+    return float(x0), float(y0), float(x1), float(y1)
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """World-unit bounds (min_x, min_y, max_x, max_y) of slippy tile z/x/y."""
+    n = 2 ** z
+    return x / n, y / n, (x + 1) / n, (y + 1) / n
+
+
+def tile_bbox(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """lon/lat bbox (min_lon, min_lat, max_lon, max_lat) of slippy tile z/x/y."""
+    x0, y0, x1, y1 = tile_bounds(z, x, y)
+    min_lon, max_lat = world_to_lonlat(x0, y0)
+    max_lon, min_lat = world_to_lonlat(x1, y1)
+    return float(min_lon), float(min_lat), float(max_lon), float(max_lat)
+
+
+def cell_keys(x, y, size: float, axis: int):
+    """Integer cell ids (row-major over an axis x axis grid) for world coords."""
+    cx = np.minimum((np.asarray(x) / size).astype(np.int64), axis - 1)
+    cy = np.minimum((np.asarray(y) / size).astype(np.int64), axis - 1)
+    return cx * axis + cy
@@ -0,0 +1,192 @@
+# backend/utils/http_cache.py
+"""
+Conditional GET (strong ETags + If-None-Match -> 304) and negotiated
+compression for large JSON listings.
+
+The ETag is derived from the per-table change counters (db.table_versions,
+bumped by triggers) plus the request path and query, so it changes exactly
+when a listed table changes. An unchanged reload therefore costs one counter
+lookup and a ~200 byte 304 response instead of the full body.
+
+Bodies are compressed with brotli (when the optional `brotli` package is
+installed) or gzip according to Accept-Encoding, and the encoded bytes for hot
+responses are kept in a small LRU keyed by (ETag, negotiated encoding), so
+repeated full fetches are not recompressed. Each encoding gets its own strong
+tag ("<hash>", "<hash>-gzip", "<hash>-br"), as required for strong validators.
+
+The counters are shared by all workers (and bumped by writes that bypass the
+API), while the bodies often come from per-process state (query caches, the
+claims snapshot). So `build_body` receives the versions behind the tag to key
+its own caches by, and a body is only put in the LRU when the versions are
+unchanged after it was built, i.e. it was built at exactly that tag.
+
+Clients are told `Cache-Control: no-cache`, so browsers revalidate every time
+and the frontend picks up the 304s without any code changes.
+"""
+
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from backend.db import get_table_versions
+
+logger = logging.getLogger(__name__)
+
+try:  # optional dependency
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+# bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+# precompressed body cache budget
+BODY_CACHE_MAX_ENTRIES = 64
+BODY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_ENCODING_SUFFIX = {"br": "-br", "gzip": "-gzip", "identity": ""}
+
+
+class _BodyCache:
+    """LRU of encoded response bodies, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (tag, negotiated encoding) -> (encoding actually used, body); small bodies stay identity
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Tuple[str, str], encoding: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[key] = (encoding, body)
+            self._bytes += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[1])
+
+
+body_cache = _BodyCache(BODY_CACHE_MAX_ENTRIES, BODY_CACHE_MAX_BYTES)
+
+
+def choose_encoding(accept_encoding: Optional[str], offered: Tuple[str, ...] = ("br", "gzip")) -> str:
+    """
+    Pick br > gzip > identity from an Accept-Encoding header (q=0 means refused),
+    among the `offered` encodings (e.g. ("gzip",) for streams compressed on the fly).
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token)
+    if "br" in offered and brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in offered and ("gzip" in accepted or "*" in accepted):
+        return "gzip"
+    return "identity"
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """best=True: maximum compression, for static bodies that are encoded once and kept."""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else 5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if best else 6)
+    return body
+
+
+def etag_matches(if_none_match: Optional[str], base_tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for suffix in ("-br", "-gzip"):
+            if tag.endswith(suffix):
+                tag = tag[: -len(suffix)]
+                break
+        if tag == base_tag:
+            return True
+    return False
+
+
+async def read_versions(tables: List[str]) -> Optional[Dict[str, int]]:
+    """Current counters of `tables`, or None when they are unavailable."""
+    try:
+        return await get_table_versions(tables)
+    except Exception:
+        logger.debug("table_versions unavailable; serving without ETag", exc_info=True)
+        return None
+
+
+def compute_etag(request: Request, versions: Dict[str, int]) -> str:
+    """Base (unquoted) tag for this request at the given table versions."""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    key = f"{request.url.path}?{query}|" + ",".join(f"{t}:{versions[t]}" for t in sorted(versions))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]
+
+
+async def conditional_response(
+    request: Request,
+    tables: List[str],
+    build_body: Callable[[Optional[Dict[str, int]]], Awaitable[bytes]],
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Serve `build_body(versions)` with ETag / If-None-Match handling and negotiated compression.
+    `build_body` is only awaited when the client's copy is stale and no encoded body is cached;
+    it gets the table versions behind the tag (None without counters) to validate its own caches.
+    """
+    versions = await read_versions(tables)
+    base_tag = compute_etag(request, versions) if versions is not None else None
+    headers: Dict[str, str] = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    requested = choose_encoding(request.headers.get("accept-encoding"))
+
+    if base_tag is not None:
+        if etag_matches(request.headers.get("if-none-match"), base_tag):
+            headers["ETag"] = f'"{base_tag}{_ENCODING_SUFFIX[requested]}"'
+            return Response(status_code=304, headers=headers)
+        cached = body_cache.get((base_tag, requested))
+        if cached is not None:
+            return _encoded_response(cached[1], cached[0], base_tag, headers, media_type)
+
+    body = await build_body(versions)
+    encoding = requested if len(body) >= MIN_COMPRESS_BYTES else "identity"
+    encoded = compress(body, encoding)
+    # a write that landed while building may or may not be in `body`: serve it, don't keep it
+    if base_tag is not None and await read_versions(tables) == versions:
+        body_cache.set((base_tag, requested), encoding, encoded)
+    return _encoded_response(encoded, encoding, base_tag, headers, media_type)
+
+
+def _encoded_response(body: bytes, encoding: str, base_tag: Optional[str], headers: Dict[str, str], media_type: str) -> Response:
+    if base_tag is not None:
+        headers["ETag"] = f'"{base_tag}{_ENCODING_SUFFIX[encoding]}"'
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
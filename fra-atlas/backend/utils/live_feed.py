@@ -0,0 +1,155 @@
+# backend/utils/live_feed.py
+"""
+Fan-out of claim change events to live clients (SSE and WebSocket).
+
+`on_change` is a claim_events listener. Each event is reduced to a compact
+message ({"op", "id", "row"}) and encoded ONCE; the same bytes are queued for
+every matching subscriber, so fan-out cost per client is a filter check and a
+queue put.
+
+Subscribers are indexed by their state filter, so an event only visits clients
+watching that state (or no state at all); district and bbox are checked on the
+candidates. Both the row before and after the change are matched, so a client
+watching Odisha also hears about a claim that moved out of Odisha.
+
+Backpressure: every subscriber has a bounded asyncio.Queue. A client too slow to
+drain it is dropped (its queue receives a final `None` sentinel and the
+endpoint closes the connection); the client is expected to reconnect and catch
+up through /api/claims/changes.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+from backend.utils.fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "256"))
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+
+# columns sent with each change (the rest is fetched on demand by the client)
+LIVE_COLUMNS = ("id", "state", "district", "village", "patta_holder", "status", "lat", "lon", "land_area", "land_area_ha", "date")
+
+
+class Subscriber:
+    def __init__(
+        self,
+        state: Optional[str] = None,
+        district: Optional[str] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        maxsize: int = LIVE_QUEUE_SIZE,
+    ):
+        self.state = state or None
+        self.district = district or None
+        self.bbox = bbox
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+    def matches(self, row: Optional[Dict[str, Any]]) -> bool:
+        if not row:
+            return False
+        if self.state and row.get("state") != self.state:
+            return False
+        if self.district and row.get("district") != self.district:
+            return False
+        if self.bbox:
+            try:
+                lat, lon = float(row.get("lat")), float(row.get("lon"))
+            except (TypeError, ValueError):
+                return False
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+                return False
+        return True
+
+
+class LiveFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # state filter (None = all states) -> subscribers
+        self._by_state: Dict[Optional[str], Set[Subscriber]] = {}
+        self.sent = 0
+        self.dropped = 0
+
+    def subscribe(self, **filters: Any) -> Subscriber:
+        sub = Subscriber(**filters)
+        with self._lock:
+            self._by_state.setdefault(sub.state, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            subs = self._by_state.get(sub.state)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_state[sub.state]
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._by_state.values())
+
+    @staticmethod
+    def encode(event: Dict[str, Any]) -> bytes:
+        row = event.get("row")
+        compact = {k: row.get(k) for k in LIVE_COLUMNS} if row else None
+        return dumps({"table": event.get("table"), "op": event.get("op"), "id": event.get("id"), "row": compact})
+
+    def broadcast(self, event: Dict[str, Any]) -> int:
+        """Queue the encoded event for every matching subscriber; returns how many got it."""
+        row, old = event.get("row"), event.get("old")
+        states = {None}
+        for r in (row, old):
+            if r:
+                states.add(r.get("state"))
+        with self._lock:
+            candidates = [s for st in states for s in self._by_state.get(st, ())]
+        if not candidates:
+            return 0
+
+        message: Optional[bytes] = None
+        delivered = 0
+        for sub in candidates:
+            if sub.dropped:
+                continue
+            if not (sub.matches(row) or sub.matches(old)):
+                continue
+            if message is None:
+                message = self.encode(event)
+            try:
+                sub.queue.put_nowait(message)
+                delivered += 1
+            except asyncio.QueueFull:
+                self._drop(sub)
+        self.sent += delivered
+        return delivered
+
+    def _drop(self, sub: Subscriber) -> None:
+        sub.dropped = True
+        self.dropped += 1
+        self.unsubscribe(sub)
+        # make room for the close sentinel so the consumer wakes up and exits
+        try:
+            while True:
+                sub.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        sub.queue.put_nowait(None)
+        logger.info("live feed: dropped slow subscriber (state=%s district=%s)", sub.state, sub.district)
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscribers": self.count(), "sent": self.sent, "dropped": self.dropped}
+
+
+# Process-wide feed used by /api/claims/live and /api/claims/ws
+live_feed = LiveFeed()
+
+
+def on_change(event: Dict[str, Any]) -> None:
+    """claim_events listener (runs on the event loop, like every request handler)."""
+    if event.get("table") == "claims":
+        live_feed.broadcast(event)
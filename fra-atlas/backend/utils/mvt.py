@@ -0,0 +1,176 @@
+# backend/utils/mvt.py
+"""
+Minimal Mapbox Vector Tile (spec v2.1) encoder.
+
+Writes the protobuf wire format directly (no protobuf / mapbox-vector-tile
+dependency): a tile is a list of layers, each with features whose geometry is
+already in tile coordinates (0..extent, y down). Supported geometry types are
+Point / MultiPoint and Polygon / MultiPolygon, which is all the map layers need.
+
+Usage:
+    layer = MVTLayer("claims")
+    layer.add_point(42, [(x, y)], {"status": "Pending"})
+    layer.add_polygon(7, [[exterior, hole, ...], ...], {"name": "Koraput"})
+    tile_bytes = encode_tile([layer])
+"""
+
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+EXTENT = 4096
+
+_POINT, _LINESTRING, _POLYGON = 1, 2, 3
+_MOVE_TO, _LINE_TO, _CLOSE_PATH = 1, 2, 7
+
+Ring = Sequence[Tuple[int, int]]
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _len_delimited(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values: Sequence[int]) -> bytes:
+    return _len_delimited(field, b"".join(_varint(v) for v in values))
+
+
+def _command(cmd: int, count: int) -> int:
+    return (cmd & 0x7) | (count << 3)
+
+
+def _encode_value(v: Any) -> bytes:
+    if isinstance(v, bool):
+        return _key(7, 0) + _varint(int(v))
+    if isinstance(v, int):
+        return _key(6, 0) + _varint(_zigzag(v)) if v < 0 else _key(5, 0) + _varint(v)
+    if isinstance(v, float):
+        return _key(3, 1) + struct.pack("<d", v)
+    return _len_delimited(1, str(v).encode("utf-8"))
+
+
+def ring_area(ring: Ring) -> float:
+    """Surveyor's formula in tile coordinates (positive = exterior ring per the MVT spec)."""
+    a = 0
+    for (x1, y1), (x2, y2) in zip(ring, list(ring[1:]) + [ring[0]]):
+        a += x1 * y2 - x2 * y1
+    return a / 2.0
+
+
+class MVTLayer:
+    def __init__(self, name: str, extent: int = EXTENT):
+        self.name = name
+        self.extent = extent
+        self._features: List[bytes] = []
+        self._keys: Dict[str, int] = {}
+        self._values: Dict[Tuple[type, Any], int] = {}
+        self._value_list: List[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def _tags(self, props: Optional[Dict[str, Any]]) -> List[int]:
+        tags: List[int] = []
+        for k, v in (props or {}).items():
+            if v is None:
+                continue
+            ki = self._keys.setdefault(k, len(self._keys))
+            vk = (type(v), v)
+            vi = self._values.get(vk)
+            if vi is None:
+                vi = self._values[vk] = len(self._value_list)
+                self._value_list.append(_encode_value(v))
+            tags += [ki, vi]
+        return tags
+
+    def _add(self, fid: Optional[int], geom_type: int, geometry: List[int], props: Optional[Dict[str, Any]]) -> None:
+        body = b""
+        if fid is not None and fid >= 0:
+            body += _key(1, 0) + _varint(int(fid))
+        tags = self._tags(props)
+        if tags:
+            body += _packed(2, tags)
+        body += _key(3, 0) + _varint(geom_type)
+        body += _packed(4, geometry)
+        self._features.append(body)
+
+    def add_point(self, fid: Optional[int], points: Sequence[Tuple[int, int]], props: Optional[Dict[str, Any]] = None) -> None:
+        if not points:
+            return
+        geom = [_command(_MOVE_TO, len(points))]
+        cx = cy = 0
+        for x, y in points:
+            geom += [_zigzag(x - cx), _zigzag(y - cy)]
+            cx, cy = x, y
+        self._add(fid, _POINT, geom, props)
+
+    def add_polygon(self, fid: Optional[int], polygons: Sequence[Sequence[Ring]], props: Optional[Dict[str, Any]] = None) -> None:
+        """
+        polygons: [[exterior, hole, ...], ...] with rings as (x, y) tile coordinates, open or closed.
+        Winding is fixed up here (exterior positive area, holes negative); degenerate rings are dropped.
+        """
+        geom: List[int] = []
+        cx = cy = 0
+        for rings in polygons:
+            for i, ring in enumerate(rings):
+                pts = list(ring)
+                if len(pts) > 1 and pts[0] == pts[-1]:
+                    pts = pts[:-1]
+                # drop consecutive duplicates produced by quantization
+                pts = [p for j, p in enumerate(pts) if j == 0 or p != pts[j - 1]]
+                if len(pts) < 3:
+                    if i == 0:
+                        break  # no exterior -> skip the whole polygon
+                    continue
+                area = ring_area(pts)
+                if area == 0:
+                    if i == 0:
+                        break
+                    continue
+                if (i == 0) != (area > 0):
+                    pts.reverse()
+                x, y = pts[0]
+                geom += [_command(_MOVE_TO, 1), _zigzag(x - cx), _zigzag(y - cy)]
+                cx, cy = x, y
+                geom.append(_command(_LINE_TO, len(pts) - 1))
+                for x, y in pts[1:]:
+                    geom += [_zigzag(x - cx), _zigzag(y - cy)]
+                    cx, cy = x, y
+                geom.append(_command(_CLOSE_PATH, 1))
+        if geom:
+            self._add(fid, _POLYGON, geom, props)
+
+    def encode(self) -> bytes:
+        body = _key(15, 0) + _varint(2)
+        body += _len_delimited(1, self.name.encode("utf-8"))
+        for f in self._features:
+            body += _len_delimited(2, f)
+        for k in self._keys:
+            body += _len_delimited(3, k.encode("utf-8"))
+        for v in self._value_list:
+            body += _len_delimited(4, v)
+        body += _key(5, 0) + _varint(self.extent)
+        return body
+
+
+def encode_tile(layers: Sequence[MVTLayer]) -> bytes:
+    """Serialize layers into one tile; empty layers are omitted."""
+    return b"".join(_len_delimited(3, layer.encode()) for layer in layers if len(layer))
@@ -2,6 +2,7 @@
 from typing import Any, Dict, List, Optional, Tuple
 import re
 import logging
+import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,123 @@ def _parse_area(area_raw: Optional[str]) -> Optional[Number]:
         return None
 
 
+# Hectares per unit; matched against the text after the number (lowercased, dots/spaces removed).
+# Regional units use their common FRA-document meaning (guntha: Telangana, decimal: Odisha).
+_AREA_UNITS_HA = [
+    (("hectares", "hectare", "hect", "ha"), 1.0),
+    (("sqkm", "km2", "squarekilometres", "squarekilometers"), 100.0),
+    (("acres", "acre", "ac"), 0.40468564),
+    (("sqm", "m2", "sqmt", "sqmtr", "sqmetre", "sqmeter", "squaremetres", "squaremeters"), 0.0001),
+    (("sqft", "ft2", "squarefeet", "squarefoot"), 0.0000092903),
+    (("gunthas", "guntha", "gunta"), 0.01011714),
+    (("decimals", "decimal", "dec", "cents", "cent"), 0.0040468564),
+]
+
+
+# bumped whenever _parse_area_hectares changes its results, so stored land_area_ha is re-derived
+AREA_PARSER_VERSION = 2
+
+_AREA_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\d])")
+_AREA_WORD_RE = re.compile(r"\s*([a-z][a-z.]*\d?)")
+
+
+def _area_unit(text: str) -> Optional[float]:
+    """Hectares per unit for the unit word(s) at the start of `text` (None when unrecognised)."""
+    joined = ""
+    pos = 0
+    for _ in range(3):  # "ha", "sq. m", "square metres"
+        m = _AREA_WORD_RE.match(text, pos)
+        if not m:
+            break
+        pos = m.end()
+        joined += m.group(1).replace(".", "")
+        for names, factor in _AREA_UNITS_HA:
+            if joined in names:
+                return factor
+    return None
+
+
+def _parse_area_hectares(area_raw: Optional[Any]) -> Optional[Number]:
+    """
+    Parse a land area value to hectares. The value and its unit come from the same number:
+    the first number followed by a recognised unit, converted. With no unit anywhere the first
+    number is taken as hectares (as are plain floats from ClaimUpdate); a number followed only
+    by an unrecognised unit ("5 bigha") gives None rather than a guess.
+    Examples: "1.2 ha" -> 1.2, "2 acres" -> 0.809, "1200 sq.m" -> 0.12, 3.5 -> 3.5,
+    "Plot 12 - 1.5 ha" -> 1.5, "Survey No. 45, 2 acres" -> 0.809
+    """
+    if area_raw is None or area_raw == "":
+        return None
+    if isinstance(area_raw, (int, float)) and not isinstance(area_raw, bool):
+        return float(area_raw)
+    s = str(area_raw).lower()
+    s = re.sub(r"(?<=\d),(?=\d{3}(?!\d))", "", s)  # thousands separators
+    first: Optional[float] = None
+    unknown_unit = False
+    for m in _AREA_NUMBER_RE.finditer(s):
+        value = float(m.group(0))
+        rest = s[m.end():].lstrip()
+        factor = _area_unit(rest)
+        if factor is not None:
+            return round(value * factor, 6)
+        if first is None:
+            first = value
+        if rest[:1].isalpha():
+            unknown_unit = True
+    if first is None or unknown_unit:
+        return None
+    return first
+
+
+def typed_claim_columns(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive the typed claim columns from raw `land_area` / `date` values:
+      land_area_ha (float hectares) and date_iso ("YYYY-MM-DD").
+    Only keys present in `values` are derived, so this works for partial updates.
+    """
+    typed: Dict[str, Any] = {}
+    if "land_area" in values:
+        typed["land_area_ha"] = _parse_area_hectares(values.get("land_area"))
+    if "date" in values:
+        d = _parse_date(values.get("date"))
+        typed["date_iso"] = d.isoformat() if d else None
+    return typed
+
+
+# Day-first formats are tried before month-first ones (Indian documents are dd-mm-yyyy).
+_DATE_FORMATS = [
+    "%Y-%m-%d", "%d-%b-%Y", "%d-%B-%Y", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y",
+    "%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y", "%Y/%m/%d", "%d-%m-%y", "%d/%m/%y",
+]
+
+
+def _parse_date(date_raw: Optional[Any]) -> Optional[datetime.date]:
+    """
+    Parse a document date string to a datetime.date (best-effort).
+    Examples it handles: "2025-09-10", "10-Sep-2025", "10/09/2025", "10 September 2025",
+    "2025-09-10T14:54:04" (time part ignored).
+    Returns None on failure.
+    """
+    if date_raw is None or date_raw == "":
+        return None
+    if isinstance(date_raw, datetime.datetime):
+        return date_raw.date()
+    if isinstance(date_raw, datetime.date):
+        return date_raw
+    s = re.sub(r"\s+", " ", str(date_raw).strip())
+    # ISO timestamps: keep only the date part
+    m = re.match(r"^(\d{4}-\d{2}-\d{2})[T ]", s)
+    if m:
+        s = m.group(1)
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    logger.debug("parse_date failed for %r", date_raw)
+    return None
+
+
 def _extract_coords(entities: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
     """
     Extract lat/lon if present in entities.
@@ -0,0 +1,281 @@
+# backend/utils/query_cache.py
+"""
+Query-result cache for the claims and villages list endpoints.
+
+Entries are keyed by the normalized filter set, expire after a TTL and are
+evicted LRU-first once `max_entries` is reached. Invalidation is driven by the
+claim change events (backend/utils/claim_events.py):
+
+- claims: an entry is dropped only if the changed row (before OR after the
+  change) matches that entry's filters, so editing a claim in Odisha leaves
+  cached Telangana listings alone.
+- villages: the listing is unfiltered, so any village insert clears it.
+
+A miss records `generation` before running its query and passes it to
+`set()`; any invalidation bumps the generation, so a result computed before a
+concurrent write is returned to its caller but never cached.
+
+Events only come from this process. Writes by other workers, scripts or manual
+SQL are folded in by `sync_claims()` / `sync_villages()`, which the listing
+routes call with the db.table_versions counter they already read for the ETag:
+only when it moved since the last sync does the claims cache read the claim
+change log (backend/utils/change_log.py) and drop the entries a logged claim
+touches - its current row matches the entry's filters, or the entry's cached
+result contains it (claims entries keep their claim ids for this). The
+villages listing is simply cleared.
+
+Hit / miss / eviction / invalidation counters are exposed through `stats()`.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils import change_log
+
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "300"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+# change-log entries read per page by sync_claims()
+CHANGE_LOG_PAGE = 1000
+
+# filters compared case-insensitively (SQLite LIKE semantics)
+_CASE_INSENSITIVE = {"village", "q"}
+
+_MISSING = object()
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, str], ...]:
+    """Canonical, hashable form of a filter dict (empty values dropped, order-independent)."""
+    items = []
+    for k, v in (filters or {}).items():
+        if v is None or v == "":
+            continue
+        v = str(v)
+        if k in _CASE_INSENSITIVE:
+            v = v.lower()
+        items.append((k, v))
+    return tuple(sorted(items))
+
+
+def _contains(haystack: Any, needle: str) -> bool:
+    return haystack is not None and needle.lower() in str(haystack).lower()
+
+
+def _num(v: Any) -> Optional[float]:
+    try:
+        return float(v) if v is not None and v != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def claim_matches(filters: Dict[str, Any], row: Optional[Dict[str, Any]]) -> bool:
+    """
+    Python mirror of db.build_claims_where: would `row` be selected by `filters`?
+    limit/offset are ignored (a matching change can shift any page).
+    """
+    if not row:
+        return False
+    if filters.get("state") and row.get("state") != filters["state"]:
+        return False
+    if filters.get("district") and row.get("district") != filters["district"]:
+        return False
+    if filters.get("status") and row.get("status") != filters["status"]:
+        return False
+    if filters.get("village") and not _contains(row.get("village"), filters["village"]):
+        return False
+    if filters.get("q") and not any(_contains(row.get(c), filters["q"]) for c in ("village", "patta_holder", "address")):
+        return False
+    area = _num(row.get("land_area_ha"))
+    if filters.get("min_area") is not None and (area is None or area < float(filters["min_area"])):
+        return False
+    if filters.get("max_area") is not None and (area is None or area > float(filters["max_area"])):
+        return False
+    if filters.get("bbox"):
+        lat, lon = _num(row.get("lat")), _num(row.get("lon"))
+        min_lon, min_lat, max_lon, max_lat = (float(x) for x in str(filters["bbox"]).split(","))
+        if lat is None or lon is None or not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            return False
+    if filters.get("ids") and str(row.get("id")) not in str(filters["ids"]).split(","):
+        return False
+    date_iso = row.get("date_iso")
+    if filters.get("date_from") and (not date_iso or date_iso < str(filters["date_from"])):
+        return False
+    if filters.get("date_to") and (not date_iso or date_iso > str(filters["date_to"])):
+        return False
+    return True
+
+
+class QueryCache:
+    def __init__(self, name: str, max_entries: int = QUERY_CACHE_MAX_ENTRIES, ttl: float = QUERY_CACHE_TTL):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expires_at, filters, value, sorted claim ids in value or None)
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any], Any, Optional[np.ndarray]]]" = OrderedDict()
+        # bumped by every invalidation (see set())
+        self.generation = 0
+        # table version and change-log seq the last sync_* call brought this cache up to
+        self.synced_version: Optional[int] = None
+        self.seq: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, filters: Optional[Dict[str, Any]] = None, default: Any = None) -> Any:
+        key = normalize_filters(filters)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not _MISSING:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def set(
+        self,
+        filters: Optional[Dict[str, Any]],
+        value: Any,
+        generation: Optional[int] = None,
+        ids: Optional[Iterable[int]] = None,
+    ) -> Any:
+        """
+        Cache `value` and return it. Pass the `generation` read before computing the value:
+        if an invalidation ran since, the value may predate that write and is not stored.
+        `ids` (claim ids in `value`) lets sync_claims() keep the entry when unrelated claims change.
+        """
+        key = normalize_filters(filters)
+        id_arr = None if ids is None else np.unique(np.fromiter(ids, dtype=np.int64))
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return value
+            self._entries[key] = (time.monotonic() + self.ttl, dict(filters or {}), value, id_arr)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def invalidate_rows(self, *rows: Optional[Dict[str, Any]]) -> int:
+        """Drop entries whose filters match any of `rows`; returns how many were dropped."""
+        rows = [r for r in rows if r]
+        if not rows:
+            return 0
+        with self._lock:
+            self.generation += 1
+            stale = [k for k, (_, f, _, _) in self._entries.items() if any(claim_matches(f, r) for r in rows)]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def invalidate_logged(self, rows: List[Dict[str, Any]], claim_ids: List[int]) -> int:
+        """
+        Drop entries touched by claims changed elsewhere: `rows` are their current rows (for the
+        filter test), `claim_ids` every changed or deleted id (for entries that listed them before).
+        Entries without recorded ids are dropped. Returns how many were dropped.
+        """
+        if not rows and not claim_ids:
+            return 0
+        changed = np.unique(np.asarray(claim_ids, dtype=np.int64))
+        with self._lock:
+            self.generation += 1
+            stale = [
+                k for k, (_, f, _, ids) in self._entries.items()
+                if ids is None or np.isin(changed, ids, assume_unique=True).any() or any(claim_matches(f, r) for r in rows)
+            ]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Process-wide caches used by the list endpoints
+claims_cache = QueryCache("claims")
+villages_cache = QueryCache("villages")
+
+
+def on_change(event: Dict[str, Any]) -> None:
+    """claim_events listener: precise invalidation from the write paths."""
+    table = event.get("table")
+    if table == "claims":
+        if event.get("row") is None and event.get("old") is None:
+            claims_cache.clear()  # change of unknown shape: be safe
+        else:
+            claims_cache.invalidate_rows(event.get("old"), event.get("row"))
+    elif table == "villages":
+        villages_cache.clear()
+
+
+async def sync_claims(version: Optional[int]) -> None:
+    """
+    Fold claim writes made outside this process into claims_cache, given the current claims
+    table version; a no-op while it is unchanged since the last call.
+    """
+    cache = claims_cache
+    if version is None or version == cache.synced_version:
+        return
+    if cache.seq is None:
+        # first sync: nothing is cached from before, start at the end of the log
+        cache.seq = await change_log.latest_seq()
+        cache.synced_version = version
+        return
+    since = cache.seq
+    while True:
+        page = await change_log.get_changes(since=since, limit=CHANGE_LOG_PAGE)
+        if page["reset"]:
+            # tombstones we never saw were compacted away
+            cache.clear()
+            since = await change_log.latest_seq()
+            break
+        rows = page["changes"]
+        cache.invalidate_logged(rows, [r["id"] for r in rows] + list(page["deleted"]))
+        since = page["cursor"]
+        if not page["has_more"]:
+            break
+    cache.seq = max(cache.seq, since)
+    cache.synced_version = version
+
+
+def sync_villages(version: Optional[int]) -> None:
+    """Clear villages_cache when the villages table version moved (any writer) since the last call."""
+    cache = villages_cache
+    if version is None or version == cache.synced_version:
+        return
+    if cache.synced_version is not None:
+        cache.clear()
+    cache.synced_version = version
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {"claims": claims_cache.stats(), "villages": villages_cache.stats()}
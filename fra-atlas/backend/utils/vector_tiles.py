@@ -0,0 +1,475 @@
+# backend/utils/vector_tiles.py
+"""
+On-demand Mapbox Vector Tiles for the map layers, with a two-level tile cache.
+
+Layers:
+- claims     zoom < CLAIMS_POINT_MIN_ZOOM: one point per grid cluster (from the
+             cluster index) with count / pending / granted properties;
+             higher zooms: one point per claim (id, status, village), read from
+             the columnar snapshot
+- villages   village points from SQLite through the villages R*Tree; below
+             VILLAGES_POINT_MIN_ZOOM thinned to one point per
+             VILLAGE_CLUSTER_UNITS grid cell (centroid + count, name only for
+             single villages), so low-zoom tiles stay bounded as the gazetteer grows
+- districts, states
+             boundary polygons (backend/utils/boundaries.py), clipped to the
+             tile plus a small buffer and simplified to ~1 tile unit
+
+Cache: an in-memory LRU in front of a disk cache (TILE_CACHE_DIR/{layer}/{z}/{x}/{y}.mvt).
+Point-layer tiles are invalidated per change: for the old and new position of a
+changed claim or village, the tiles that can contain it at every zoom are
+evicted (at clustered claim zooms, every tile its cluster cell overlaps), so a
+write only costs the ~21 tiles above it. Claim changes come from the snapshot's
+listener, which also carries writes caught up from other workers; catch-up and
+the villages table_versions check run at most once per TILE_SYNC_SECONDS, and a
+villages counter that moved further than this process's own events clears that
+layer. An invalidation during a render keeps that render out of the cache. Disk
+deletes run on a background thread. Boundary tiles never change. Point layers
+are wiped from disk at startup, in case the database was replaced while the
+process was down.
+"""
+
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.db import bbox_where_sql
+from backend.utils.boundaries import load_boundaries
+from backend.utils.claim_clusters import cluster_index
+from backend.utils.claims_snapshot import snapshot
+from backend.utils.geo_grid import cell_size, lonlat_to_world, tile_bbox, tile_bounds
+from backend.utils.mvt import EXTENT, MVTLayer, encode_tile
+
+logger = logging.getLogger(__name__)
+
+TILE_LAYERS = ("claims", "villages", "districts", "states")
+POINT_LAYERS = ("claims", "villages")
+TILE_MAX_ZOOM = 20
+CLAIMS_POINT_MIN_ZOOM = 11
+TILE_BUFFER = 64  # tile units of polygon overdraw so strokes do not show seams
+TILE_CACHE_DIR = Path(os.getenv("TILE_CACHE_DIR") or Path(__file__).resolve().parents[1] / "tile_cache")
+TILE_MEMORY_CACHE_ENTRIES = int(os.getenv("TILE_MEMORY_CACHE_ENTRIES", "4096"))
+VILLAGES_POINT_MIN_ZOOM = 10
+VILLAGE_CLUSTER_UNITS = 256  # tile units per village grid cell below VILLAGES_POINT_MIN_ZOOM (<= 256 points/tile)
+# how often a tile request may look for writes made outside this process
+TILE_SYNC_SECONDS = float(os.getenv("TILE_SYNC_SECONDS", "1.0"))
+# SQLite's default max host parameters is 999 on older builds
+_IN_CHUNK = 500
+
+# (layer, z, x, y)
+TileKey = Tuple[str, int, int, int]
+# tile-unit slack for points on a tile edge (the renderer's bbox test is inclusive)
+_EDGE_EPS = 1e-6
+
+
+class TileCache:
+    """LRU of encoded tiles in memory, backed by files on disk."""
+
+    def __init__(self, directory: Path, max_entries: int = TILE_MEMORY_CACHE_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        # per layer, bumped by every invalidation: a render that saw a bump is not stored
+        self._generations: Dict[str, int] = {}
+        # keys whose disk file is queued for deletion (not read back from disk meanwhile)
+        self._doomed: Dict[TileKey, int] = {}
+        self._deletes: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._deleter: Optional[threading.Thread] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _path(self, key: TileKey) -> Path:
+        layer, z, x, y = key
+        return self.directory / layer / str(z) / str(x) / f"{y}.mvt"
+
+    def generation(self, layer: str) -> int:
+        with self._lock:
+            return self._generations.get(layer, 0)
+
+    def get(self, key: TileKey) -> Optional[bytes]:
+        with self._lock:
+            body = self._memory.get(key)
+            if body is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return body
+            doomed = key in self._doomed
+        if doomed:
+            self.misses += 1
+            return None
+        try:
+            body = self._path(key).read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, body)
+        return body
+
+    def set(self, key: TileKey, body: bytes, generation: Optional[int] = None) -> bool:
+        """Store a tile; skipped (False) when `key`'s layer was invalidated since `generation` was read."""
+        with self._lock:
+            if generation is not None and self._generations.get(key[0], 0) != generation:
+                return False
+        self._remember(key, body)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+        except OSError:
+            logger.debug("tile cache: could not write %s", path, exc_info=True)
+        return True
+
+    def _remember(self, key, body: bytes) -> None:
+        with self._lock:
+            self._memory[key] = body
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def invalidate(self, keys: List[TileKey]) -> None:
+        """Drop tiles from memory now and from disk on the background deleter."""
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._generations[key[0]] = self._generations.get(key[0], 0) + 1
+                self._memory.pop(key, None)
+                self._doomed[key] = self._doomed.get(key, 0) + 1
+        for key in keys:
+            self._queue_delete("tile", key)
+
+    def clear(self, layer: str, wait: bool = False) -> None:
+        """Drop every tile of `layer`; the directory is moved aside at once and removed in the background."""
+        with self._lock:
+            self._generations[layer] = self._generations.get(layer, 0) + 1
+            for key in [k for k in self._memory if k[0] == layer]:
+                del self._memory[key]
+        src = self.directory / layer
+        if wait:
+            shutil.rmtree(src, ignore_errors=True)
+            return
+        trash = self.directory / f".{layer}.stale-{uuid.uuid4().hex}"
+        try:
+            os.replace(src, trash)
+        except OSError:
+            return
+        self._queue_delete("tree", trash)
+
+    def _queue_delete(self, kind: str, target: Any) -> None:
+        self._deletes.put((kind, target))
+        with self._lock:
+            if self._deleter is None or not self._deleter.is_alive():
+                self._deleter = threading.Thread(target=self._delete_loop, name="tile-cache-deleter", daemon=True)
+                self._deleter.start()
+
+    def _delete_loop(self) -> None:
+        while True:
+            kind, target = self._deletes.get()
+            try:
+                if kind == "tree":
+                    shutil.rmtree(target, ignore_errors=True)
+                    continue
+                try:
+                    self._path(target).unlink()
+                    self.invalidations += 1
+                except OSError:
+                    pass
+                with self._lock:
+                    left = self._doomed.get(target, 0) - 1
+                    if left > 0:
+                        self._doomed[target] = left
+                    else:
+                        self._doomed.pop(target, None)
+            except Exception:
+                logger.debug("tile cache: delete of %s failed", target, exc_info=True)
+            finally:
+                self._deletes.task_done()
+
+    def flush(self) -> None:
+        """Wait until queued disk deletes are done (shutdown, tests)."""
+        self._deletes.join()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = len(self._memory)
+        return {"memory_entries": size, "hits": self.hits, "disk_hits": self.disk_hits,
+                "misses": self.misses, "invalidations": self.invalidations}
+
+
+class TileService:
+    def __init__(self, db_path: Optional[str] = None, cache_dir: Path = TILE_CACHE_DIR):
+        self.db_path = db_path
+        self.cache = TileCache(cache_dir)
+        self._boundary_lock = threading.Lock()
+        self._boundaries: Optional[Dict[str, Tuple[list, Any]]] = None
+        self._sync_lock = threading.Lock()
+        self._synced: Dict[str, float] = {}
+        # villages table_versions counter at the last check + village events seen since
+        self._villages_version: Optional[int] = None
+        self._villages_events = 0
+
+    # ---- public ----
+    def get_tile(self, layer: str, z: int, x: int, y: int) -> bytes:
+        if layer in POINT_LAYERS:
+            self._sync(layer)
+        key = (layer, z, x, y)
+        body = self.cache.get(key)
+        if body is None:
+            generation = self.cache.generation(layer)
+            body = self.render(layer, z, x, y)
+            # a change during the render may or may not be in `body`: serve it, don't store it
+            self.cache.set(key, body, generation)
+        return body
+
+    def _sync(self, layer: str) -> None:
+        """Fold in writes made outside this process, at most once per TILE_SYNC_SECONDS per layer."""
+        now = time.monotonic()
+        with self._sync_lock:
+            if now - self._synced.get(layer, float("-inf")) < TILE_SYNC_SECONDS:
+                return
+            self._synced[layer] = now
+        if layer == "claims":
+            # re-read changes reach on_claim_change through the snapshot listener
+            snapshot.catch_up()
+            return
+        version = self._table_version("villages")
+        with self._sync_lock:
+            expected = None if self._villages_version is None else self._villages_version + self._villages_events
+            self._villages_version, self._villages_events = version, 0
+        if expected is not None and version is not None and version > expected:
+            # villages written elsewhere: no positions to go by, drop the layer
+            self.cache.clear("villages")
+
+    def _table_version(self, table: str) -> Optional[int]:
+        if not self.db_path:
+            return None
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT version FROM table_versions WHERE name = ?", (table,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            conn.close()
+        return int(row[0]) if row else 0
+
+    def render(self, layer: str, z: int, x: int, y: int) -> bytes:
+        if layer == "claims":
+            mvt = self._claims_layer(z, x, y)
+        elif layer == "villages":
+            mvt = self._villages_layer(z, x, y)
+        elif layer in ("districts", "states"):
+            mvt = self._boundary_layer(layer, z, x, y)
+        else:
+            raise ValueError(f"unknown tile layer: {layer}")
+        return encode_tile([mvt])
+
+    # ---- point layers ----
+    @staticmethod
+    def _to_tile(z: int, x: int, y: int, wx: np.ndarray, wy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        scale = (2 ** z) * EXTENT
+        return np.floor(wx * scale - x * EXTENT).astype(np.int64), np.floor(wy * scale - y * EXTENT).astype(np.int64)
+
+    def _claims_layer(self, z: int, x: int, y: int) -> MVTLayer:
+        mvt = MVTLayer("claims")
+        if not snapshot.loaded:
+            return mvt
+        bbox = tile_bbox(z, x, y)
+        if z < CLAIMS_POINT_MIN_ZOOM:
+            clusters = cluster_index.clusters(snapshot, z, bbox)["clusters"]
+            if not clusters:
+                return mvt
+            wx, wy = lonlat_to_world(np.array([c["lon"] for c in clusters]), np.array([c["lat"] for c in clusters]))
+            tx, ty = self._to_tile(z, x, y, wx, wy)
+            for c, px, py in zip(clusters, tx.tolist(), ty.tolist()):
+                # each cluster is drawn only by the tile that contains its centroid
+                if not (0 <= px < EXTENT and 0 <= py < EXTENT):
+                    continue
+                by = c["by_status"]
+                props = {"count": c["count"], "pending": by.get("Pending", 0), "granted": by.get("Granted", 0)}
+                if "id" in c:
+                    props["claim_id"] = c["id"]
+                mvt.add_point(None, [(px, py)], props)
+            return mvt
+
+        with snapshot._lock:
+            m = snapshot.mask(with_coords=True, bbox=bbox)
+            idx = np.flatnonzero(m)
+            ids = snapshot.ids[idx].tolist()
+            lat = snapshot.floats["lat"][idx]
+            lon = snapshot.floats["lon"][idx]
+            statuses = snapshot.dicts["status"].decode(snapshot.codes["status"][idx])
+            villages = snapshot.dicts["village"].decode(snapshot.codes["village"][idx])
+        wx, wy = lonlat_to_world(lon, lat)
+        tx, ty = self._to_tile(z, x, y, wx, wy)
+        for cid, px, py, st, v in zip(ids, tx.tolist(), ty.tolist(), statuses, villages):
+            mvt.add_point(cid, [(min(px, EXTENT - 1), min(py, EXTENT - 1))], {"status": st, "village": v})
+        return mvt
+
+    def _villages_layer(self, z: int, x: int, y: int) -> MVTLayer:
+        mvt = MVTLayer("villages")
+        if not self.db_path:
+            return mvt
+        params: Dict[str, Any] = {}
+        where = bbox_where_sql("villages", tile_bbox(z, x, y), params)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if z >= VILLAGES_POINT_MIN_ZOOM:
+                rows = conn.execute("SELECT id, village, district, state, lat, lon FROM villages WHERE 1=1" + where, params).fetchall()
+                if not rows:
+                    return mvt
+                wx, wy = lonlat_to_world(np.array([r[5] for r in rows], dtype=float), np.array([r[4] for r in rows], dtype=float))
+                tx, ty = self._to_tile(z, x, y, wx, wy)
+                for r, px, py in zip(rows, tx.tolist(), ty.tolist()):
+                    mvt.add_point(r[0], [(min(px, EXTENT - 1), min(py, EXTENT - 1))], {"village": r[1], "district": r[2], "state": r[3]})
+                return mvt
+
+            # thinned: one point per grid cell at the cell's centroid
+            pts = np.array(conn.execute("SELECT id, lat, lon FROM villages WHERE 1=1" + where, params).fetchall(), dtype=float).reshape(-1, 3)
+            pts = pts[~np.isnan(pts).any(axis=1)]
+            if not len(pts):
+                return mvt
+            wx, wy = lonlat_to_world(pts[:, 2], pts[:, 1])
+            tx, ty = self._to_tile(z, x, y, wx, wy)
+            tx, ty = np.clip(tx, 0, EXTENT - 1), np.clip(ty, 0, EXTENT - 1)
+            per_axis = EXTENT // VILLAGE_CLUSTER_UNITS
+            cells, inv, counts = np.unique((ty // VILLAGE_CLUSTER_UNITS) * per_axis + tx // VILLAGE_CLUSTER_UNITS,
+                                           return_inverse=True, return_counts=True)
+            cx = np.bincount(inv, weights=tx, minlength=len(cells)) / counts
+            cy = np.bincount(inv, weights=ty, minlength=len(cells)) / counts
+            single_ids = pts[:, 0][counts[inv] == 1].astype(np.int64).tolist()
+            names: Dict[int, Tuple[str, str, str]] = {}
+            for i in range(0, len(single_ids), _IN_CHUNK):
+                chunk = single_ids[i:i + _IN_CHUNK]
+                res = conn.execute(f"SELECT id, village, district, state FROM villages WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                names.update((r[0], r[1:]) for r in res.fetchall())
+        finally:
+            conn.close()
+        first = np.full(len(cells), -1, dtype=np.int64)
+        first[inv[::-1]] = pts[::-1, 0].astype(np.int64)  # lowest-index village of each cell
+        for n, px, py, vid in zip(counts.tolist(), cx.tolist(), cy.tolist(), first.tolist()):
+            point = [(int(px), int(py))]
+            if n == 1 and vid in names:
+                village, district, state = names[vid]
+                mvt.add_point(vid, point, {"village": village, "district": district, "state": state, "count": 1})
+            else:
+                mvt.add_point(None, point, {"count": n})
+        return mvt
+
+    # ---- boundary layers ----
+    def _boundary_index(self, level: str) -> Tuple[list, Any]:
+        with self._boundary_lock:
+            if self._boundaries is None:
+                import shapely
+                from shapely.strtree import STRtree
+
+                def to_world(coords: np.ndarray) -> np.ndarray:
+                    wx, wy = lonlat_to_world(coords[:, 0], coords[:, 1])
+                    return np.column_stack([wx, wy])
+
+                built: Dict[str, Tuple[list, Any]] = {}
+                for lvl in ("state", "district"):
+                    items = [b for b in load_boundaries() if b["level"] == lvl]
+                    geoms = [shapely.transform(b["geometry"], to_world) for b in items]
+                    built[lvl + "s"] = (list(zip(items, geoms)), STRtree(geoms) if geoms else None)
+                self._boundaries = built
+            return self._boundaries[level]
+
+    def _boundary_layer(self, layer: str, z: int, x: int, y: int) -> MVTLayer:
+        import shapely
+        from shapely.geometry import box
+
+        mvt = MVTLayer(layer)
+        items, tree = self._boundary_index(layer)
+        if tree is None:
+            return mvt
+        x0, y0, x1, y1 = tile_bounds(z, x, y)
+        pad = (x1 - x0) * TILE_BUFFER / EXTENT
+        clip = (x0 - pad, y0 - pad, x1 + pad, y1 + pad)
+        scale = (2 ** z) * EXTENT
+        for i in tree.query(box(*clip)).tolist():
+            meta, geom = items[i]
+            part = shapely.clip_by_rect(geom, *clip)
+            if part.is_empty:
+                continue
+            part = shapely.transform(part, lambda c: np.column_stack([c[:, 0] * scale - x * EXTENT, c[:, 1] * scale - y * EXTENT]))
+            part = part.simplify(1.0, preserve_topology=True)
+            polygons = []
+            for poly in getattr(part, "geoms", [part]):
+                if poly.geom_type != "Polygon" or poly.is_empty:
+                    continue
+                rings = [poly.exterior, *poly.interiors]
+                polygons.append([[(int(round(px)), int(round(py))) for px, py in r.coords] for r in rings])
+            props = {"name": meta["name"], "state": meta["state"]}
+            if meta.get("code"):
+                props["code"] = meta["code"]
+            mvt.add_polygon(i, polygons, props)
+        return mvt
+
+    # ---- invalidation ----
+    def _point_tiles(self, layer: str, row: Optional[Dict[str, Any]]) -> List[TileKey]:
+        """Keys of the `layer` tiles, at every zoom, that can draw the point of `row`."""
+        if not row:
+            return []
+        try:
+            wx, wy = lonlat_to_world(float(row.get("lon")), float(row.get("lat")))
+        except (TypeError, ValueError):
+            return []
+        wx, wy = float(wx), float(wy)
+        keys: List[TileKey] = []
+        for z in range(TILE_MAX_ZOOM + 1):
+            n = 2 ** z
+            if layer == "claims" and z < CLAIMS_POINT_MIN_ZOOM:
+                # the cluster cell's centroid can land in any tile the cell overlaps
+                size = cell_size(z, cluster_index.cell_px)
+                cx0, cy0 = int(wx / size) * size, int(wy / size) * size
+                xs = range(int(cx0 * n), min(int((cx0 + size) * n), n - 1) + 1)
+                ys = range(int(cy0 * n), min(int((cy0 + size) * n), n - 1) + 1)
+            else:
+                fx, fy = wx * n, wy * n
+                xs = {min(max(int(fx + d), 0), n - 1) for d in (-_EDGE_EPS, _EDGE_EPS)}
+                ys = {min(max(int(fy + d), 0), n - 1) for d in (-_EDGE_EPS, _EDGE_EPS)}
+            keys += [(layer, z, tx, ty) for tx in xs for ty in ys]
+        return keys
+
+    def on_claim_change(self, change: Dict[str, Any]) -> None:
+        """Snapshot listener: drop the claims tiles around the old and new position."""
+        keys = self._point_tiles("claims", change.get("old")) + self._point_tiles("claims", change.get("row"))
+        self.cache.invalidate(list(dict.fromkeys(keys)))
+
+    def on_village_change(self, event: Dict[str, Any]) -> None:
+        """claim_events listener: drop the villages tiles around the old and new position."""
+        if event.get("table") != "villages":
+            return
+        with self._sync_lock:
+            self._villages_events += 1
+        keys = self._point_tiles("villages", event.get("old")) + self._point_tiles("villages", event.get("row"))
+        self.cache.invalidate(list(dict.fromkeys(keys)))
+
+    # ---- maintenance ----
+    def reset_point_layers(self) -> None:
+        for layer in POINT_LAYERS:
+            self.cache.clear(layer, wait=True)
+        # directories moved aside by a clear the previous process did not finish deleting
+        for trash in self.cache.directory.glob(".*.stale-*"):
+            shutil.rmtree(trash, ignore_errors=True)
+        self._villages_version, self._villages_events = self._table_version("villages"), 0
+
+
+# Process-wide tile service used by /tiles/...
+tile_service = TileService()
@@ -0,0 +1,449 @@
+# backend/utils/village_geocoder.py
+"""
+Fuzzy geocoding of (OCR'd) village names against the villages table.
+
+Names are normalized before indexing and lookup (`normalize_name`): accents,
+punctuation and spaces are stripped, words like "Village" / "Gram" dropped, and common
+romanization variants folded (oo/u, ee/i, w/v, z/j, doubled letters, aspirated
+consonants: "Chhindwara" and "Chindwara" normalize alike). The normalized names
+go into an in-memory trigram index (CSR posting arrays, one per trigram).
+
+A lookup
+- takes exact normalized matches directly,
+- otherwise gathers candidates from the rarest query trigrams only (enough of
+  them that any name reaching GEOCODE_MIN_SIMILARITY must share one), counts
+  shared trigrams with NumPy and scores the best few by trigram Dice similarity,
+- restricts / re-ranks by district and state when given (those are themselves
+  matched fuzzily against the small district vocabulary).
+
+The confidence is the name similarity adjusted for agreement with the given
+district/state and lowered when several equally good villages remain.
+The index is loaded at startup and kept current from villages change events.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from backend.utils.boundaries import canonical_district, canonical_state, is_unknown
+
+logger = logging.getLogger(__name__)
+
+# minimum name similarity for a candidate to be returned at all
+GEOCODE_MIN_SIMILARITY = 0.5
+# minimum confidence for ingestion to take the coordinates without review
+GEOCODE_MIN_CONFIDENCE = float(os.getenv("GEOCODE_MIN_CONFIDENCE", "0.75"))
+# how many candidates (by estimated similarity) get exact shared-trigram counts
+_RERANK = 48
+
+_STOPWORDS = {"village", "vill", "vil", "gram", "grama", "mauza", "mouza", "po", "ps", "gp", "at"}
+_FOLDS = (("oo", "u"), ("ou", "u"), ("ee", "i"), ("ii", "i"), ("aa", "a"), ("w", "v"), ("z", "j"), ("q", "k"), ("ph", "f"))
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_REPEATS = re.compile(r"([a-z])\1+")
+_ASPIRATES = re.compile(r"([bcdgjkpst])h")
+
+
+def normalize_name(name: Any) -> str:
+    """Canonical form used for matching (see module docstring)."""
+    if name is None:
+        return ""
+    s = str(name)
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    s = s.lower()
+    words = [w for w in _NON_ALNUM.sub(" ", s).split() if w not in _STOPWORDS]
+    s = "".join(words)  # "Naya Gaon" / "Nayagaon"
+    for a, b in _FOLDS:
+        s = s.replace(a, b)
+    s = _REPEATS.sub(r"\1", s)
+    return _ASPIRATES.sub(r"\1", s)
+
+
+def _padded(norm: str) -> str:
+    return f"  {norm} "
+
+
+def trigrams(norm: str) -> Set[str]:
+    if not norm:
+        return set()
+    padded = _padded(norm)
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a: Set[Any], b: Set[Any]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+def trigram_codes(norms: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct (name index, trigram code) pairs for normalized (ASCII) names, vectorized:
+    the padded names become one uint8 matrix and every 3-byte window one 24-bit code.
+    """
+    if not norms:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    padded = [_padded(n).encode("ascii") for n in norms]
+    lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=len(padded))
+    width = int(lengths.max())
+    mat = np.frombuffer(b"".join(p.ljust(width, b"\0") for p in padded), dtype=np.uint8).reshape(len(padded), width)
+    mat = mat.astype(np.int64)
+    codes = (mat[:, :-2] << 16) | (mat[:, 1:-1] << 8) | mat[:, 2:]
+    valid = np.arange(width - 2)[None, :] < (lengths - 2)[:, None]
+    valid &= lengths[:, None] > 3  # empty names have no trigrams
+    rows = np.broadcast_to(np.arange(len(padded))[:, None], codes.shape)[valid]
+    pairs = np.sort((rows << 24) | codes[valid])
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    return pairs >> 24, pairs & 0xFFFFFF
+
+
+def _csr(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group values by key: (distinct keys, offsets, values ordered by key)."""
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order]
+    uniq, starts = np.unique(keys, return_index=True)
+    return uniq, np.append(starts, len(keys)).astype(np.int64), values
+
+
+class VillageGeocoder:
+    """
+    Trigram index over the distinct normalized village names; each name maps to the
+    village rows carrying it (real gazetteers repeat names like "Rampur" thousands of times).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        # per village row
+        self.ids: List[int] = []
+        self.ids_array = np.zeros(0, dtype=np.int64)
+        self.names: List[str] = []            # as stored
+        self.states: List[Optional[str]] = []
+        self.districts: List[Optional[str]] = []
+        self.lat = np.zeros(0, dtype=np.float64)
+        self.lon = np.zeros(0, dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.district_code = np.zeros(0, dtype=np.int32)
+        self.row_name = np.zeros(0, dtype=np.int64)
+        self.index: Dict[int, int] = {}
+        # per distinct normalized name
+        self.norms: List[str] = []
+        self._norm_ids: Dict[str, int] = {}
+        self._ntri = np.zeros(0, dtype=np.int64)
+        # name id -> row positions: _nr_rows[_nr_offsets[n]:_nr_offsets[n + 1]] + _nr_extra[n]
+        self._nr_offsets = np.zeros(1, dtype=np.int64)
+        self._nr_rows = np.zeros(0, dtype=np.int64)
+        self._nr_extra: Dict[int, List[int]] = {}
+        # trigram code -> name ids: _postings[_offsets[i]:_offsets[i + 1]] for _codes[i]
+        self._codes = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._postings = np.zeros(0, dtype=np.int64)
+        # postings of names added after the last build
+        self._extra: Dict[int, List[int]] = {}
+        # (canonical state, normalized district) <-> code
+        self._district_codes: Dict[Tuple[Optional[str], str], int] = {}
+        self._district_keys: List[Tuple[Optional[str], str]] = []
+        self._district_tris: List[Set[str]] = []
+        # memos: raw (state, district) -> code, raw village -> normalized, query scope resolution
+        self._raw_districts: Dict[Tuple[Any, Any], int] = {}
+        self._raw_norms: Dict[Any, str] = {}
+        self._scopes: Dict[Tuple[Any, Any], Tuple[Optional[np.ndarray], Optional[str]]] = {}
+        # district code -> name ids of its villages (CSR from the last build + later additions)
+        self._dn_codes = np.zeros(0, dtype=np.int64)
+        self._dn_offsets = np.zeros(1, dtype=np.int64)
+        self._dn_names = np.zeros(0, dtype=np.int64)
+        self._dn_extra: Dict[int, List[int]] = {}
+
+    # ---- building ----
+    def _district(self, state: Optional[str], district: Optional[str]) -> int:
+        code = self._raw_districts.get((state, district))
+        if code is not None:
+            return code
+        key = (canonical_state(state), normalize_name(canonical_district(district)))
+        code = self._district_codes.get(key)
+        if code is None:
+            code = self._district_codes[key] = len(self._district_keys)
+            self._district_keys.append(key)
+            self._district_tris.append(trigrams(key[1]))
+            self._scopes.clear()
+        self._raw_districts[(state, district)] = code
+        return code
+
+    def _name_id(self, village: Any) -> int:
+        norm = self._raw_norms.get(village)
+        if norm is None:
+            norm = self._raw_norms[village] = normalize_name(village)
+        name_id = self._norm_ids.get(norm)
+        if name_id is None:
+            name_id = self._norm_ids[norm] = len(self.norms)
+            self.norms.append(norm)
+        return name_id
+
+    def _name_rows(self, name_id: int) -> np.ndarray:
+        rows = self._nr_rows[self._nr_offsets[name_id]:self._nr_offsets[name_id + 1]] if name_id + 1 < len(self._nr_offsets) else self._nr_rows[:0]
+        extra = self._nr_extra.get(name_id)
+        return np.concatenate([rows, np.asarray(extra, dtype=np.int64)]) if extra else rows
+
+    def load(self, db_path: str) -> int:
+        """(Re)build the index from SQLite. Returns the number of villages indexed."""
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            rows = conn.execute(
+                "SELECT id, state, district, village, lat, lon FROM villages "
+                "WHERE village IS NOT NULL AND lat IS NOT NULL AND lon IS NOT NULL ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            self._reset()
+            n = len(rows)
+            self.ids = [r[0] for r in rows]
+            self.names = [r[3] for r in rows]
+            self.states = [r[1] for r in rows]
+            self.districts = [r[2] for r in rows]
+            self.index = {vid: pos for pos, vid in enumerate(self.ids)}
+            self.ids_array = np.asarray(self.ids, dtype=np.int64)
+            self.lat = np.fromiter((r[4] for r in rows), dtype=np.float64, count=n)
+            self.lon = np.fromiter((r[5] for r in rows), dtype=np.float64, count=n)
+            self.alive = np.ones(n, dtype=bool)
+            self.district_code = np.fromiter((self._district(r[1], r[2]) for r in rows), dtype=np.int32, count=n)
+            self.row_name = np.fromiter((self._name_id(v) for v in self.names), dtype=np.int64, count=n)
+
+            names = max(1, len(self.norms))
+            _, self._nr_offsets, self._nr_rows = _csr(self.row_name, np.arange(n, dtype=np.int64))
+            name_idx, tri = trigram_codes(self.norms)
+            self._ntri = np.bincount(name_idx, minlength=len(self.norms)).astype(np.int64)
+            self._codes, self._offsets, self._postings = _csr(tri, name_idx)
+            pairs = np.unique(self.district_code.astype(np.int64) * names + self.row_name)
+            self._dn_codes, self._dn_offsets, self._dn_names = _csr(pairs // names, pairs % names)
+            self.loaded = True
+            return n
+
+    def _append(self, row: Dict[str, Any]) -> None:
+        try:
+            lat, lon = float(row.get("lat")), float(row.get("lon"))
+        except (TypeError, ValueError):
+            return
+        if not row.get("village") or row.get("id") is None:
+            return
+        known_names = len(self.norms)
+        name_id = self._name_id(row["village"])
+        pos = len(self.ids)
+        self.ids.append(int(row["id"]))
+        self.names.append(row["village"])
+        self.states.append(row.get("state"))
+        self.districts.append(row.get("district"))
+        self.index[int(row["id"])] = pos
+        self.ids_array = np.append(self.ids_array, int(row["id"]))
+        self.lat = np.append(self.lat, lat)
+        self.lon = np.append(self.lon, lon)
+        self.alive = np.append(self.alive, True)
+        code = self._district(row.get("state"), row.get("district"))
+        self.district_code = np.append(self.district_code, np.int32(code))
+        self.row_name = np.append(self.row_name, name_id)
+        self._nr_extra.setdefault(name_id, []).append(pos)
+        self._dn_extra.setdefault(code, []).append(name_id)
+        if name_id >= known_names:
+            _, tri = trigram_codes([self.norms[name_id]])
+            self._ntri = np.append(self._ntri, len(tri))
+            for c in tri.tolist():
+                self._extra.setdefault(c, []).append(name_id)
+
+    def _remove(self, village_id: Any) -> None:
+        pos = self.index.pop(int(village_id), None) if village_id is not None else None
+        if pos is not None:
+            self.alive[pos] = False
+
+    def on_change(self, event: Dict[str, Any]) -> None:
+        """claim_events listener for the villages table."""
+        if event.get("table") != "villages" or not self.loaded:
+            return
+        with self._lock:
+            self._remove(event.get("id"))
+            if event.get("op") != "delete" and event.get("row"):
+                self._append(event["row"])
+
+    # ---- lookup ----
+    def _postings_for(self, code: int) -> Tuple[np.ndarray, List[int]]:
+        """(sorted name ids from the last build, name ids added since) for one trigram code."""
+        i = int(np.searchsorted(self._codes, code))
+        if i < len(self._codes) and self._codes[i] == code:
+            base = self._postings[self._offsets[i]:self._offsets[i + 1]]
+        else:
+            base = np.zeros(0, dtype=np.int64)
+        return base, self._extra.get(code) or []
+
+    def _resolve_districts(self, district: Optional[str], state: Optional[str]) -> Tuple[Optional[np.ndarray], Optional[str]]:
+        """Codes of the district(s) matching the (possibly misspelled) name, and the canonical state."""
+        cached = self._scopes.get((district, state))
+        if cached is not None:
+            return cached
+        st = None if is_unknown(state) else canonical_state(state)
+        scope = None
+        if is_unknown(district):
+            if st is not None:
+                scope = [c for c, (s, _) in enumerate(self._district_keys) if s == st]
+        else:
+            qt = trigrams(normalize_name(canonical_district(district)))
+            scored = [
+                (dice(qt, tris), c) for c, ((s, _), tris) in enumerate(zip(self._district_keys, self._district_tris))
+                if st is None or s == st
+            ]
+            best = max((sc for sc, _ in scored), default=0.0)
+            if best >= 0.6:
+                scope = [c for sc, c in scored if sc >= best - 1e-9]
+        result = (np.asarray(scope, dtype=np.int32) if scope is not None else None, st)
+        if len(self._scopes) >= 4096:
+            self._scopes.clear()
+        self._scopes[(district, state)] = result
+        return result
+
+    def _scope_mask(self, scope: np.ndarray) -> np.ndarray:
+        """Boolean mask over name ids: names of villages in the given districts."""
+        mask = np.zeros(len(self.norms), dtype=bool)
+        starts = np.searchsorted(self._dn_codes, scope)
+        for code, i in zip(scope.tolist(), starts.tolist()):
+            if i < len(self._dn_codes) and self._dn_codes[i] == code:
+                mask[self._dn_names[self._dn_offsets[i]:self._dn_offsets[i + 1]]] = True
+            extra = self._dn_extra.get(code)
+            if extra:
+                mask[extra] = True
+        return mask
+
+    def _match_names(
+        self, qn: str, qcodes: np.ndarray, rerank: int, name_mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(name ids, Dice similarity) of the names (within name_mask) most similar to the normalized query."""
+        name_id = self._norm_ids.get(qn)
+        if name_id is not None and (name_mask is None or name_mask[name_id]):
+            return np.array([name_id], dtype=np.int64), np.array([1.0])
+        lists = sorted((self._postings_for(c) for c in qcodes.tolist()), key=lambda l: len(l[0]) + len(l[1]))
+        # a name with Dice >= s shares at least s*|q|/(2-s) trigrams with the query, so
+        # scanning all but that many-minus-one of the most common lists cannot miss it
+        need = max(1, int(np.ceil(GEOCODE_MIN_SIMILARITY * len(qcodes) / (2 - GEOCODE_MIN_SIMILARITY))))
+        head, tail = lists[:len(qcodes) - need + 1], lists[len(qcodes) - need + 1:]
+        parts = [base for base, _ in head] + [np.asarray(extra, dtype=np.int64) for _, extra in head if extra]
+        scanned = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        if name_mask is not None:
+            scanned = scanned[name_mask[scanned]]
+        if not len(scanned):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        names, counts = np.unique(scanned, return_counts=True)
+        if name_id is not None and name_id not in names:
+            names, counts = np.append(names, name_id), np.append(counts, len(qcodes))
+        if len(names) > rerank:
+            # Dice upper bound from the scanned lists favours names of similar length
+            keep = np.argpartition(-(counts / (self._ntri[names] + len(qcodes))), rerank)[:rerank]
+            names, counts = names[keep], counts[keep]
+        # complete the shared-trigram counts with the common lists (sorted: binary search)
+        for base, extra in tail:
+            if len(base):
+                i = np.minimum(np.searchsorted(base, names), len(base) - 1)
+                counts = counts + (base[i] == names)
+            if extra:
+                counts = counts + np.isin(names, extra)
+        return names, 2.0 * counts / (self._ntri[names] + len(qcodes))
+
+    def geocode(
+        self,
+        village: Optional[str],
+        district: Optional[str] = None,
+        state: Optional[str] = None,
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """Best matching villages, highest confidence first (empty when nothing is similar enough)."""
+        qn = normalize_name(village)
+        if not qn:
+            return []
+        with self._lock:
+            scope, st = self._resolve_districts(district, state)
+            qcodes = trigram_codes([qn])[1]
+            names, sims = np.zeros(0, dtype=np.int64), np.zeros(0)
+            if scope is not None:
+                # villages of the given district / state first; the whole gazetteer when none is close
+                names, sims = self._match_names(qn, qcodes, _RERANK, self._scope_mask(scope))
+                keep = sims >= GEOCODE_MIN_SIMILARITY
+                names, sims = names[keep], sims[keep]
+            if not len(names):
+                names, sims = self._match_names(qn, qcodes, _RERANK)
+                keep = sims >= GEOCODE_MIN_SIMILARITY
+                names, sims = names[keep], sims[keep]
+            if not len(names):
+                return []
+            names = names.tolist()
+            rows = [self._name_rows(n) for n in names]
+            pos = np.concatenate(rows)
+            sim = np.repeat(sims, [len(r) for r in rows])
+            live = self.alive[pos]
+            pos, sim = pos[live], sim[live]
+            if not len(pos):
+                return []
+            conf = sim
+            if scope is not None:
+                conf = np.where(np.isin(self.district_code[pos], scope), 0.85 * sim + 0.15, 0.8 * sim)
+            ids = self.ids_array[pos]
+            order = np.lexsort((ids, -conf))[:max(1, limit) + 1]
+            # equally good matches in different places: none of them can be trusted blindly
+            if len(order) > 1 and conf[order[1]] >= conf[order[0]] - 1e-9:
+                conf = conf * 0.7
+            return [
+                {
+                    "village_id": int(ids[i]),
+                    "village": self.names[p],
+                    "district": self.districts[p],
+                    "state": self.states[p],
+                    "lat": float(self.lat[p]),
+                    "lon": float(self.lon[p]),
+                    "confidence": round(float(conf[i]), 3),
+                    "similarity": round(float(sim[i]), 3),
+                    "match": "exact" if sim[i] == 1.0 else "fuzzy",
+                }
+                for i, p in ((i, int(pos[i])) for i in order[:max(1, limit)].tolist())
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "villages": int(self.alive.sum()),
+                "names": len(self.norms),
+                "trigrams": int(len(self._codes)),
+                "postings": int(len(self._postings)) + sum(len(v) for v in self._extra.values()),
+                "districts": len(self._district_keys),
+            }
+
+
+# Process-wide index
+village_geocoder = VillageGeocoder()
+
+
+def geocode_claim(values: Dict[str, Any], min_confidence: float = GEOCODE_MIN_CONFIDENCE) -> Optional[Dict[str, Any]]:
+    """
+    Give a claim dict without coordinates the lat/lon of its best matching village when the
+    confidence reaches min_confidence; missing / "Unknown" state and district are taken from
+    the village too. Returns the best candidate (applied or not), or None.
+    """
+    if values.get("lat") is not None and values.get("lon") is not None:
+        return None
+    if not village_geocoder.loaded or not values.get("village"):
+        return None
+    matches = village_geocoder.geocode(values.get("village"), values.get("district"), values.get("state"), limit=1)
+    if not matches:
+        return None
+    best = dict(matches[0])
+    best["applied"] = best["confidence"] >= min_confidence
+    if best["applied"]:
+        values["lat"], values["lon"] = best["lat"], best["lon"]
+        for field in ("state", "district"):
+            if is_unknown(values.get(field)) and best.get(field):
+                values[field] = best[field]
+    return best
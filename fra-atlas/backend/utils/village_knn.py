@@ -0,0 +1,371 @@
+# backend/utils/village_knn.py
+"""
+k-nearest-neighbour lookup over village coordinates.
+
+Villages are stored as 3D unit vectors, so the Euclidean (chord) distance is
+monotonic in the great-circle distance and a plain KD-tree gives exact
+haversine neighbours without special cases at high latitudes or the antimeridian;
+distances are converted back with d = 2R asin(chord / 2).
+
+- The tree is built once from SQLite (NumPy arrays, median splits on the axis
+  of largest spread, LEAF_SIZE points per leaf).
+- Villages inserted later go to an append buffer that every query also scans
+  (brute force, vectorized); the tree is rebuilt from tree + buffer when the
+  buffer outgrows REBUILD_FRACTION of the tree. Deletes are tombstoned: the
+  tree keeps a live flag per point (in leaf order) and both searches skip dead
+  points while scanning leaves, so tombstones never widen a query.
+- `nearest` runs a best-first search for one point; `nearest_many` snaps whole
+  batches without a per-point tree walk: all queries descend to their leaf at
+  once, the k-th distance within that leaf bounds the search radius, every
+  leaf box within that radius is collected level by level for all queries
+  together, and the candidate points are ranked with one lexsort.
+"""
+
+import heapq
+import logging
+import math
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 32
+REBUILD_FRACTION = 0.05
+_MIN_REBUILD = 1024
+_BATCH_CHUNK = 8192
+
+
+def to_unit(lat, lon) -> np.ndarray:
+    """(n, 3) unit vectors for lat/lon degrees."""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    c = np.cos(lat)
+    return np.stack([c * np.cos(lon), c * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(d2) -> np.ndarray:
+    """Great-circle km for squared chord distances between unit vectors."""
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(np.maximum(d2, 0.0)) / 2.0))
+
+
+class _KDTree:
+    """Static KD-tree over (n, 3) points; node arrays, leaves are contiguous runs of `order`."""
+
+    def __init__(self, pts: np.ndarray, leaf_size: int = LEAF_SIZE):
+        n = len(pts)
+        self.order = np.arange(n, dtype=np.int64)
+        lo_l, hi_l, dim_l, val_l, left_l, right_l, mins_l, maxs_l = [], [], [], [], [], [], [], []
+
+        def new_node(lo: int, hi: int) -> int:
+            seg = pts[self.order[lo:hi]]
+            lo_l.append(lo)
+            hi_l.append(hi)
+            dim_l.append(-1)
+            val_l.append(0.0)
+            left_l.append(-1)
+            right_l.append(-1)
+            mins_l.append(seg.min(axis=0) if hi > lo else np.full(3, np.inf))
+            maxs_l.append(seg.max(axis=0) if hi > lo else np.full(3, -np.inf))
+            return len(lo_l) - 1
+
+        stack = [new_node(0, n)]
+        while stack:
+            node = stack.pop()
+            lo, hi = lo_l[node], hi_l[node]
+            if hi - lo <= leaf_size:
+                continue
+            dim = int(np.argmax(maxs_l[node] - mins_l[node]))
+            mid = (lo + hi) // 2
+            idx = self.order[lo:hi]
+            part = np.argpartition(pts[idx, dim], mid - lo)
+            self.order[lo:hi] = idx[part]
+            dim_l[node] = dim
+            val_l[node] = float(pts[self.order[mid], dim])
+            left_l[node] = new_node(lo, mid)
+            right_l[node] = new_node(mid, hi)
+            stack += [left_l[node], right_l[node]]
+
+        self.pts = pts[self.order]          # points in leaf order
+        self.live = np.ones(n, dtype=bool)  # per point in leaf order; cleared by kill()
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[self.order] = np.arange(n)  # input index -> leaf-order position
+        self.lo = np.asarray(lo_l, dtype=np.int64)
+        self.hi = np.asarray(hi_l, dtype=np.int64)
+        self.dim = np.asarray(dim_l, dtype=np.int64)
+        self.val = np.asarray(val_l, dtype=np.float64)
+        self.left = np.asarray(left_l, dtype=np.int64)
+        self.right = np.asarray(right_l, dtype=np.int64)
+        self.mins = np.asarray(mins_l, dtype=np.float64).reshape(-1, 3)
+        self.maxs = np.asarray(maxs_l, dtype=np.float64).reshape(-1, 3)
+        # plain-Python copies for the scalar best-first search (cheaper than tiny NumPy ops)
+        self._boxes = list(zip(self.mins.tolist(), self.maxs.tolist()))
+        self._children = list(zip(self.left.tolist(), self.right.tolist()))
+
+    def kill(self, i: int) -> None:
+        """Tombstone input point `i`: later searches skip it."""
+        self.live[self.rank[i]] = False
+
+    def _box_d2(self, node: int, q: Sequence[float]) -> float:
+        mins, maxs = self._boxes[node]
+        d2 = 0.0
+        for a, lo, hi in zip(q, mins, maxs):
+            if a < lo:
+                d2 += (lo - a) ** 2
+            elif a > hi:
+                d2 += (a - hi) ** 2
+        return d2
+
+    def query(self, q: np.ndarray, k: int, bound: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """(squared chord distances, positions in leaf order) of the k nearest points, ascending."""
+        best_d = np.zeros(0)
+        best_i = np.zeros(0, dtype=np.int64)
+        if not len(self.pts):
+            return best_d, best_i
+        qv = q.tolist()
+        heap = [(self._box_d2(0, qv), 0)]
+        while heap:
+            d2, node = heapq.heappop(heap)
+            if d2 > bound:
+                break
+            left, right = self._children[node]
+            if left < 0:
+                lo, hi = self.lo[node], self.hi[node]
+                live = np.flatnonzero(self.live[lo:hi]) + lo
+                diff = self.pts[live] - q
+                dist = np.einsum("ij,ij->i", diff, diff)
+                best_d = np.concatenate([best_d, dist])
+                best_i = np.concatenate([best_i, live])
+                if len(best_d) > k:
+                    keep = np.argpartition(best_d, k - 1)[:k]
+                    best_d, best_i = best_d[keep], best_i[keep]
+                if len(best_d) == k:
+                    bound = min(bound, float(best_d.max()))
+                continue
+            for child in (left, right):
+                cd = self._box_d2(child, qv)
+                if cd <= bound:
+                    heapq.heappush(heap, (cd, child))
+        order = np.argsort(best_d, kind="stable")
+        return best_d[order], best_i[order]
+
+    def leaf_of(self, qs: np.ndarray) -> np.ndarray:
+        """Leaf node reached by descending the split planes, for every query (vectorized)."""
+        node = np.zeros(len(qs), dtype=np.int64)
+        active = self.dim[node] >= 0
+        while active.any():
+            a = np.flatnonzero(active)
+            n = node[a]
+            go_left = qs[a, self.dim[n]] < self.val[n]
+            node[a] = np.where(go_left, self.left[n], self.right[n])
+            active[a] = self.dim[node[a]] >= 0
+        return node
+
+    def leaves_within(self, qs: np.ndarray, r2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(query index, leaf node) pairs for every leaf box within squared distance r2 of its query."""
+        qi = np.arange(len(qs))
+        node = np.zeros(len(qs), dtype=np.int64)
+        out_q, out_leaf = [], []
+        while len(qi):
+            d = np.maximum(0.0, np.maximum(self.mins[node] - qs[qi], qs[qi] - self.maxs[node]))
+            keep = np.einsum("ij,ij->i", d, d) <= r2[qi]
+            qi, node = qi[keep], node[keep]
+            leaf = self.dim[node] < 0
+            out_q.append(qi[leaf])
+            out_leaf.append(node[leaf])
+            qi, node = np.repeat(qi[~leaf], 2), np.stack([self.left[node[~leaf]], self.right[node[~leaf]]], axis=1).ravel()
+        return np.concatenate(out_q), np.concatenate(out_leaf)
+
+    def _leaf_points(self, leaves: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions (-1 for padding and dead points) of each leaf's points, and live counts per leaf."""
+        lo, hi = self.lo[leaves], self.hi[leaves]
+        cols = lo[:, None] + np.arange(int((hi - lo).max()) if len(leaves) else 0)[None, :]
+        cols = np.where(cols < hi[:, None], cols, -1)
+        cols = np.where((cols >= 0) & self.live[np.maximum(cols, 0)], cols, -1)
+        return cols, (cols >= 0).sum(axis=1)
+
+    def query_many(self, qs: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """query() for a batch: own-leaf k-th distance as radius, then all leaves in reach at once."""
+        if not len(self.pts) or not k:
+            return [(np.zeros(0), np.zeros(0, dtype=np.int64))] * len(qs)
+        own = self.leaf_of(qs)
+        cols, sizes = self._leaf_points(own)
+        diff = self.pts[np.maximum(cols, 0)] - qs[:, None, :]
+        d2 = np.where(cols >= 0, np.einsum("ijk,ijk->ij", diff, diff), np.inf)
+        r2 = np.full(len(qs), np.inf)
+        enough = sizes >= k
+        if enough.any():
+            r2[enough] = np.partition(d2[enough], k - 1, axis=1)[:, k - 1]
+        out: List[Tuple[np.ndarray, np.ndarray]] = [None] * len(qs)
+        # leaves with fewer than k live points give no radius: plain search for those
+        for i in np.flatnonzero(~enough).tolist():
+            out[i] = self.query(qs[i], k)
+        sub = np.flatnonzero(enough)
+        if len(sub):
+            pq, leaves = self.leaves_within(qs[sub], r2[sub])
+            cols, _ = self._leaf_points(leaves)
+            pq = np.broadcast_to(pq[:, None], cols.shape)[cols >= 0]
+            pos = cols[cols >= 0]
+            diff = self.pts[pos] - qs[sub][pq]
+            dist = np.einsum("ij,ij->i", diff, diff)
+            order = np.lexsort((dist, pq))
+            pq, pos, dist = pq[order], pos[order], dist[order]
+            starts = np.searchsorted(pq, np.arange(len(sub) + 1))
+            for j, i in enumerate(sub.tolist()):
+                a = starts[j]
+                b = min(starts[j + 1], a + k)
+                out[i] = (dist[a:b], pos[a:b])
+        return out
+
+
+class VillageKNN:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self.ids: List[int] = []
+        self.rows: List[Tuple[Any, Any, Any]] = []     # (village, district, state)
+        self.lat = np.zeros(0)
+        self.lon = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+        self.index: Dict[int, int] = {}
+        self.tree = _KDTree(np.zeros((0, 3)))
+        self.tree_size = 0                              # rows [0, tree_size) are in the tree
+        self.buffer = np.zeros((0, 3))                  # unit vectors of rows [tree_size, n)
+        self.dead = 0
+
+    # ---- building / maintenance ----
+    def load(self, db_path: str) -> int:
+        """(Re)build from SQLite. Returns the number of villages indexed."""
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            rows = conn.execute(
+                "SELECT id, village, district, state, lat, lon FROM villages "
+                "WHERE lat IS NOT NULL AND lon IS NOT NULL ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            self._reset()
+            self.ids = [r[0] for r in rows]
+            self.rows = [(r[1], r[2], r[3]) for r in rows]
+            self.index = {vid: pos for pos, vid in enumerate(self.ids)}
+            self.lat = np.fromiter((r[4] for r in rows), dtype=np.float64, count=len(rows))
+            self.lon = np.fromiter((r[5] for r in rows), dtype=np.float64, count=len(rows))
+            self.alive = np.ones(len(rows), dtype=bool)
+            self._rebuild()
+            self.loaded = True
+            return len(rows)
+
+    def _rebuild(self) -> None:
+        if self.dead:
+            keep = np.flatnonzero(self.alive)
+            self.ids = [self.ids[i] for i in keep.tolist()]
+            self.rows = [self.rows[i] for i in keep.tolist()]
+            self.index = {vid: pos for pos, vid in enumerate(self.ids)}
+            self.lat, self.lon = self.lat[keep], self.lon[keep]
+            self.alive = np.ones(len(keep), dtype=bool)
+            self.dead = 0
+        self.tree = _KDTree(to_unit(self.lat, self.lon).reshape(-1, 3))
+        self.tree_size = len(self.ids)
+        self.buffer = np.zeros((0, 3))
+
+    def _maybe_rebuild(self) -> None:
+        limit = max(_MIN_REBUILD, REBUILD_FRACTION * self.tree_size)
+        if len(self.buffer) > limit or self.dead > limit:
+            self._rebuild()
+
+    def _append(self, row: Dict[str, Any]) -> None:
+        try:
+            lat, lon = float(row.get("lat")), float(row.get("lon"))
+        except (TypeError, ValueError):
+            return
+        if row.get("id") is None or math.isnan(lat) or math.isnan(lon):
+            return
+        self.index[int(row["id"])] = len(self.ids)
+        self.ids.append(int(row["id"]))
+        self.rows.append((row.get("village"), row.get("district"), row.get("state")))
+        self.lat = np.append(self.lat, lat)
+        self.lon = np.append(self.lon, lon)
+        self.alive = np.append(self.alive, True)
+        self.buffer = np.vstack([self.buffer, to_unit(lat, lon).reshape(1, 3)])
+
+    def on_change(self, event: Dict[str, Any]) -> None:
+        """claim_events listener for the villages table (the rebuild itself happens on the next query)."""
+        if event.get("table") != "villages" or not self.loaded:
+            return
+        with self._lock:
+            pos = self.index.pop(int(event["id"]), None) if event.get("id") is not None else None
+            if pos is not None:
+                self.alive[pos] = False
+                self.dead += 1
+                if pos < self.tree_size:
+                    self.tree.kill(pos)
+            if event.get("op") != "delete" and event.get("row"):
+                self._append(event["row"])
+
+    # ---- queries ----
+    def _merge(self, d2: np.ndarray, pos: np.ndarray, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Add the append buffer to one query's tree result, drop tombstones, keep k."""
+        if len(self.buffer):
+            diff = self.buffer - q
+            d2 = np.concatenate([d2, np.einsum("ij,ij->i", diff, diff)])
+            pos = np.concatenate([pos, np.arange(self.tree_size, self.tree_size + len(self.buffer))])
+        live = self.alive[pos]
+        d2, pos = d2[live], pos[live]
+        order = np.argsort(d2, kind="stable")[:k]
+        return d2[order], pos[order]
+
+    def _result(self, d2: np.ndarray, pos: np.ndarray, max_km: Optional[float]) -> List[Dict[str, Any]]:
+        km = chord_to_km(d2)
+        out = []
+        for dist, p in zip(km.tolist(), pos.tolist()):
+            if max_km is not None and dist > max_km:
+                break
+            village, district, state = self.rows[p]
+            out.append({
+                "village_id": self.ids[p], "village": village, "district": district, "state": state,
+                "lat": float(self.lat[p]), "lon": float(self.lon[p]), "distance_km": round(dist, 3),
+            })
+        return out
+
+    def nearest(self, lat: float, lon: float, k: int = 5, max_km: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The k nearest villages to one point, closest first."""
+        return self.nearest_many([lat], [lon], k, max_km)[0]
+
+    def nearest_many(
+        self, lats: Sequence[float], lons: Sequence[float], k: int = 5, max_km: Optional[float] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """nearest() for a batch of points (see module docstring for the vectorized leaf pass)."""
+        qs = to_unit(lats, lons).reshape(-1, 3)
+        with self._lock:
+            self._maybe_rebuild()
+            results: List[Tuple[np.ndarray, np.ndarray]] = []
+            for start in range(0, len(qs), _BATCH_CHUNK):
+                chunk = qs[start:start + _BATCH_CHUNK]
+                results += [self.tree.query(chunk[0], k)] if len(chunk) == 1 else self.tree.query_many(chunk, k)
+            out = []
+            for i, (d2, tpos) in enumerate(results):
+                d2, pos = self._merge(d2, self.tree.order[tpos], qs[i], k)
+                out.append(self._result(d2, pos, max_km))
+            return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "villages": int(self.alive.sum()),
+                "tree_size": self.tree_size,
+                "tree_nodes": int(len(self.tree.lo)),
+                "buffered": int(len(self.buffer)),
+                "tombstones": self.dead,
+            }
+
+
+# Process-wide index
+village_knn = VillageKNN()
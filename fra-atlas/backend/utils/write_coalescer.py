@@ -0,0 +1,214 @@
+# backend/utils/write_coalescer.py
+"""
+Group-commit write coalescer for SQLite.
+
+Every claim insert/update used to open its own connection and COMMIT, so
+concurrent officers were serialized on SQLite's write lock with one fsync
+per write. The coalescer queues writes from all request handlers and flushes
+them from a single writer thread inside ONE transaction, either every
+`WRITE_COALESCE_MS` milliseconds or as soon as `WRITE_COALESCE_MAX_OPS`
+operations are waiting.
+
+Each queued operation is a plain function `fn(conn, *args)` that runs against
+the shared sqlite3 connection. Operations are isolated from each other with a
+SAVEPOINT, so one failing write rolls back only itself and its caller gets the
+exception, while every other caller's future resolves with its own result.
+
+Durability is left at SQLite's defaults (rollback journal, synchronous=FULL):
+a write whose future resolved survives a power loss. Two opt-in env settings
+trade that away for throughput, and both change the database for every process:
+- WRITE_COALESCE_WAL=1 switches the file to WAL (persistent), so readers keep
+  going while a group commit is in flight;
+- WRITE_COALESCE_SYNCHRONOUS=NORMAL (only safe together with WAL) skips the
+  fsync per commit; the last commits before a power loss can then roll back.
+
+Usage:
+    coalescer = get_coalescer(db_path)
+    row = await coalescer.submit(_insert_claim_sync, params)
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# flush window (ms) and max operations per transaction; both tunable from env
+WRITE_COALESCE_MS = float(os.getenv("WRITE_COALESCE_MS", "2"))
+WRITE_COALESCE_MAX_OPS = int(os.getenv("WRITE_COALESCE_MAX_OPS", "256"))
+# opt-in durability / concurrency trade-offs (see module docstring); off by default
+WRITE_COALESCE_WAL = os.getenv("WRITE_COALESCE_WAL") == "1"
+WRITE_COALESCE_SYNCHRONOUS = (os.getenv("WRITE_COALESCE_SYNCHRONOUS") or "").upper()
+_SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+WriteOp = Tuple[Callable[..., Any], tuple, "asyncio.Future"]
+
+
+class WriteCoalescer:
+    """
+    Queue writes for one SQLite file and commit them in batches.
+    All flushes run on a dedicated single-thread executor, which owns the connection.
+    """
+
+    def __init__(self, db_path: str, window_ms: float = WRITE_COALESCE_MS, max_ops: int = WRITE_COALESCE_MAX_OPS):
+        self.db_path = db_path
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_ops = max(1, int(max_ops))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # simple counters, handy when tuning window/max_ops
+        self.stats = {"flushes": 0, "ops": 0, "errors": 0}
+
+    # ---- public API ----
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Queue `fn(conn, *args)` for the next group commit and wait for its result.
+        Raises whatever `fn` raised (only that operation is rolled back).
+        """
+        self._ensure_started()
+        fut = self._loop.create_future()
+        await self._queue.put((fn, args, fut))
+        return await fut
+
+    async def close(self) -> None:
+        """Flush anything still queued, stop the flush task and close the connection."""
+        if self._task is not None and not self._task.done():
+            if self._queue is not None and self._loop is asyncio.get_running_loop():
+                await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close_conn)
+
+    # ---- internals ----
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            # (re)bind to the current loop, e.g. after a test client restarted the app
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = self._loop
+        while True:
+            batch: List[WriteOp] = [await queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_ops:
+                while len(batch) < self.max_ops and not queue.empty():
+                    batch.append(queue.get_nowait())
+                remaining = deadline - loop.time()
+                if len(batch) >= self.max_ops or remaining <= 0:
+                    break
+                await asyncio.sleep(remaining)
+
+            try:
+                results = await loop.run_in_executor(self._executor, self._flush, batch)
+            except Exception as e:  # pragma: no cover - _flush already traps errors
+                results = [(False, e)] * len(batch)
+
+            for (_, _, fut), (ok, value) in zip(batch, results):
+                if not fut.done():
+                    if ok:
+                        fut.set_result(value)
+                    else:
+                        fut.set_exception(value)
+                queue.task_done()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            try:
+                if WRITE_COALESCE_WAL:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                if WRITE_COALESCE_SYNCHRONOUS in _SYNCHRONOUS_LEVELS:
+                    conn.execute(f"PRAGMA synchronous={WRITE_COALESCE_SYNCHRONOUS}")
+                conn.execute("PRAGMA busy_timeout=5000")
+            except Exception:
+                logger.debug("could not set pragmas on %s", self.db_path, exc_info=True)
+            self._conn = conn
+        return self._conn
+
+    def _close_conn(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+    def _flush(self, batch: List[WriteOp]) -> List[Tuple[bool, Any]]:
+        """Run all ops of the batch in one transaction (runs on the writer thread)."""
+        results: List[Tuple[bool, Any]] = []
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            logger.exception("write coalescer could not open a transaction on %s", self.db_path)
+            self._close_conn()
+            self.stats["errors"] += len(batch)
+            return [(False, e)] * len(batch)
+
+        for fn, args, fut in batch:
+            if fut.cancelled():
+                results.append((False, asyncio.CancelledError()))
+                continue
+            conn.execute("SAVEPOINT coalesced_op")
+            try:
+                value = fn(conn, *args)
+                conn.execute("RELEASE coalesced_op")
+                results.append((True, value))
+            except Exception as e:
+                conn.execute("ROLLBACK TO coalesced_op")
+                conn.execute("RELEASE coalesced_op")
+                self.stats["errors"] += 1
+                results.append((False, e))
+
+        try:
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.exception("write coalescer commit failed on %s", self.db_path)
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            self.stats["errors"] += len(batch)
+            return [(False, e)] * len(batch)
+
+        self.stats["flushes"] += 1
+        self.stats["ops"] += len(batch)
+        return results
+
+
+# ----------------------------
+# Registry: one coalescer per database file
+# ----------------------------
+_coalescers: Dict[str, WriteCoalescer] = {}
+
+
+def get_coalescer(db_path: str) -> WriteCoalescer:
+    key = os.path.abspath(db_path)
+    coalescer = _coalescers.get(key)
+    if coalescer is None:
+        coalescer = WriteCoalescer(key)
+        _coalescers[key] = coalescer
+    return coalescer
+
+
+async def close_coalescers() -> None:
+    """Flush and close every coalescer (call from app shutdown)."""
+    for coalescer in list(_coalescers.values()):
+        try:
+            await coalescer.close()
+        except Exception:
+            logger.exception("failed to close write coalescer for %s", coalescer.db_path)
@@ -1,5 +1,5 @@
 // src/components/MapPanel.jsx
-import React, { useEffect, useMemo, useRef } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import {
   MapContainer,
   TileLayer,
@@ -14,21 +14,13 @@ import {
 import "leaflet/dist/leaflet.css";
 import L from "leaflet";
 
-import mpBoundary from "../geojson/mp.json";
-import tripuraBoundary from "../geojson/tripura.json";
-import odishaBoundary from "../geojson/odisha.json";
-import telanganaBoundary from "../geojson/telangana.json";
-
-import mpShivpuri from "../geojson/districts/mp_shivpuri.json";
-import mpChhindwara from "../geojson/districts/mp_chhindwara.json";
-import odKoraput from "../geojson/districts/odisha_koraput.json";
-import odKandhamal from "../geojson/districts/odisha_kandhamal.json";
-import tgWarangal from "../geojson/districts/telangana_warangal.json";
-import tgAdilabad from "../geojson/districts/telangana_adilabad.json";
-import trWest from "../geojson/districts/tripura_west.json";
+import useBoundaries from "../hooks/useBoundaries";
 
 import { grantedIcon, pendingIcon, villageIcon, villageIconActive } from "../utils/mapIcons";
 
+const STATE_COLORS = { "Madhya Pradesh": "blue", Tripura: "red", Odisha: "green", Telangana: "orange" };
+const DISTRICT_COLORS = { "Madhya Pradesh": "#6b46c1", Odisha: "#b7791f", Telangana: "#dd6b20", Tripura: "#e53e3e" };
+
 /* Small helpers */
 function MapResetter({ resetKey, center, zoom }) {
   const map = useMap();
@@ -37,6 +29,10 @@ function MapResetter({ resetKey, center, zoom }) {
   }, [resetKey, center, zoom, map]);
   return null;
 }
+function ZoomTracker({ onZoom }) {
+  useMapEvent("zoomend", (e) => onZoom(e.target.getZoom()));
+  return null;
+}
 function MapClickHandler({ onMapClick }) {
   useMapEvent("click", (e) => {
     onMapClick && onMapClick({ lat: e.latlng.lat, lon: e.latlng.lng });
@@ -68,18 +64,9 @@ export default function MapPanel({
 }) {
   const localMapRef = useRef(null);
 
-  const districtLayers = useMemo(
-    () => [
-      { data: mpShivpuri, color: "#6b46c1" },
-      { data: mpChhindwara, color: "#6b46c1" },
-      { data: odKoraput, color: "#b7791f" },
-      { data: odKandhamal, color: "#b7791f" },
-      { data: tgWarangal, color: "#dd6b20" },
-      { data: tgAdilabad, color: "#dd6b20" },
-      { data: trWest, color: "#e53e3e" },
-    ],
-    []
-  );
+  // boundaries come from the backend, simplified for the current zoom
+  const [zoom, setZoom] = useState(defaultZoom);
+  const boundaries = useBoundaries(zoom);
 
   function getStateName(feature) {
     return (
@@ -155,6 +142,7 @@ export default function MapPanel({
       <MapContainer center={defaultCenter} zoom={defaultZoom} scrollWheelZoom={true} className="h-full w-full" whenCreated={handleCreated}>
         <MapResetter resetKey={resetTick} center={defaultCenter} zoom={defaultZoom} />
         <MapClickHandler onMapClick={onMapClick} />
+        <ZoomTracker onZoom={setZoom} />
 
         <LayersControl position="topright">
           <LayersControl.BaseLayer name="OpenStreetMap" checked>
@@ -170,10 +158,14 @@ export default function MapPanel({
           {showStates && (
             <LayersControl.Overlay name="State Boundaries" checked>
               <div>
-                <GeoJSON data={mpBoundary} style={{ color: "blue", weight: 2 }} onEachFeature={onEachState} />
-                <GeoJSON data={tripuraBoundary} style={{ color: "red", weight: 2 }} onEachFeature={onEachState} />
-                <GeoJSON data={odishaBoundary} style={{ color: "green", weight: 2 }} onEachFeature={onEachState} />
-                <GeoJSON data={telanganaBoundary} style={{ color: "orange", weight: 2 }} onEachFeature={onEachState} />
+                {boundaries.states && (
+                  <GeoJSON
+                    key={`states-${boundaries.tier}`}
+                    data={boundaries.states}
+                    style={(f) => ({ color: STATE_COLORS[f?.properties?.state] || "blue", weight: 2 })}
+                    onEachFeature={onEachState}
+                  />
+                )}
               </div>
             </LayersControl.Overlay>
           )}
@@ -181,9 +173,14 @@ export default function MapPanel({
           {showDistricts && (
             <LayersControl.Overlay name="District Boundaries" checked>
               <div>
-                {districtLayers.map((d, idx) => (
-                  <GeoJSON key={idx} data={d.data} style={{ color: d.color, weight: 1.5, fillOpacity: 0.05 }} onEachFeature={onEachDistrict} />
-                ))}
+                {boundaries.districts && (
+                  <GeoJSON
+                    key={`districts-${boundaries.tier}`}
+                    data={boundaries.districts}
+                    style={(f) => ({ color: DISTRICT_COLORS[f?.properties?.state] || "#6b46c1", weight: 1.5, fillOpacity: 0.05 })}
+                    onEachFeature={onEachDistrict}
+                  />
+                )}
               </div>
             </LayersControl.Overlay>
           )}
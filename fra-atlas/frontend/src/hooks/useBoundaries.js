@@ -0,0 +1,73 @@
+// src/hooks/useBoundaries.js
+import { useEffect, useState } from "react";
+import { API_BASE } from "../config";
+
+/**
+ * State / district boundaries from the backend, at the detail tier for the current zoom.
+ * Returns { tier, states, districts } (FeatureCollections, null until loaded).
+ *
+ * The tier table and data version come from GET /boundaries once; layer URLs carry
+ * ?v=<version>, so the browser caches them for good and each tier is fetched at most
+ * once per session (kept in a module-level cache across zoom changes).
+ */
+const layerCache = new Map();
+let indexPromise = null;
+
+// API_BASE already ends in /api
+function apiBase() {
+  return String(API_BASE || "").replace(/\/$/, "") || "/api";
+}
+
+function loadIndex() {
+  if (!indexPromise) {
+    indexPromise = fetch(`${apiBase()}/boundaries`)
+      .then((res) => (res.ok ? res.json() : Promise.reject(new Error(`boundaries index ${res.status}`))))
+      .catch((err) => {
+        indexPromise = null;
+        throw err;
+      });
+  }
+  return indexPromise;
+}
+
+function loadLayer(level, tier, version) {
+  const key = `${level}:${tier}:${version}`;
+  if (!layerCache.has(key)) {
+    const p = fetch(`${apiBase()}/boundaries/${level}.geojson?tier=${tier}&v=${encodeURIComponent(version)}`)
+      .then((res) => (res.ok ? res.json() : Promise.reject(new Error(`${level} boundaries ${res.status}`))))
+      .catch((err) => {
+        layerCache.delete(key);
+        throw err;
+      });
+    layerCache.set(key, p);
+  }
+  return layerCache.get(key);
+}
+
+function tierForZoom(tiers, zoom) {
+  const hit = tiers.find((t) => t.max_zoom == null || zoom <= t.max_zoom);
+  return hit ? hit.tier : tiers.length - 1;
+}
+
+export default function useBoundaries(zoom) {
+  const [layers, setLayers] = useState({ tier: null, states: null, districts: null });
+
+  useEffect(() => {
+    let cancelled = false;
+    loadIndex()
+      .then((index) => {
+        const tier = tierForZoom(index.tiers || [], zoom);
+        return Promise.all([loadLayer("state", tier, index.version), loadLayer("district", tier, index.version)]).then(
+          ([states, districts]) => {
+            if (!cancelled) setLayers((prev) => (prev.tier === tier ? prev : { tier, states, districts }));
+          }
+        );
+      })
+      .catch((err) => console.error("Boundary load failed:", err));
+    return () => {
+      cancelled = true;
+    };
+  }, [zoom]);
+
+  return layers;
+}
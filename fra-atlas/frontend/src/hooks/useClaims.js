@@ -18,6 +18,7 @@ import sampleClaims from "../data/sample_claims_demo.json";
  * - Normalizes lat/lon and land_area to numbers (or null).
  * - Stores data under both original and lowercased village keys to allow case-insensitive lookup.
  * - getCountForVillage reads /claims/count endpoint and caches count.
+ * - getCountsForVillages fetches many counts in one POST /claims/counts call (use it for map markers).
  * - Falls back to local sample_claims_demo.json when backend is unavailable.
  * - Exposes upsertClaim/removeClaim helpers so created/updated/deleted claims can be reflected in the cache.
  */
@@ -299,9 +300,55 @@ export default function useClaims() {
     }
   }
 
+  /**
+   * getCountsForVillages
+   * - One POST /claims/counts request for every village not cached yet
+   * - Returns { [village]: count } and fills the same cache as getCountForVillage
+   */
+  async function getCountsForVillages(villages, { force = false } = {}) {
+    const names = Array.from(new Set((villages || []).map((v) => (v == null ? "" : String(v).trim())).filter(Boolean)));
+    const out = {};
+    const missing = [];
+    for (const name of names) {
+      const hit = cacheRef.current[name] || cacheRef.current[name.toLowerCase()];
+      if (!force && hit && typeof hit.count === "number") out[name] = hit.count;
+      else missing.push(name);
+    }
+    if (missing.length === 0) return out;
+
+    try {
+      const base = String(API_BASE || "").replace(/\/$/, "");
+      const url = base ? base + "/claims/counts" : "/api/claims/counts";
+      const res = await authFetch(url, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ villages: missing }),
+      });
+      if (!res.ok) throw new Error(`Failed to fetch counts: ${res.status}`);
+      const j = await res.json().catch(() => null);
+      // one group per (state, district, village); this cache is keyed by name only, so
+      // same-named villages in different districts are added up here
+      const groups = (j && j.villages) || [];
+      for (const name of missing) {
+        const cnt = groups.filter((g) => g.village === name).reduce((sum, g) => sum + Number(g.count || 0), 0);
+        out[name] = Number.isFinite(cnt) ? cnt : 0;
+        for (const k of new Set([name, name.toLowerCase()])) {
+          cacheRef.current[k] = cacheRef.current[k] || {};
+          cacheRef.current[k].count = out[name];
+          cacheRef.current[k].source = "backend";
+        }
+      }
+    } catch (err) {
+      console.warn("useClaims.getCountsForVillages error, falling back to per-village counts:", err);
+      for (const name of missing) out[name] = await getCountForVillage(name, { force });
+    }
+    return out;
+  }
+
   return {
     getClaimsForVillage,
     getCountForVillage,
+    getCountsForVillages,
     upsertClaim, // call this after creating/updating a claim so UI cache stays in sync
     removeClaimById, // call this after deleting a claim to keep cache clean
     cacheRef,